@@ -11,6 +11,7 @@ import yaml
 import time
 import asyncio
 import requests
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
@@ -35,6 +36,12 @@ MODEL_POOL = [
 
 TEMPLATE_FILE = RESEARCH_DIR / "aws-agent-transformation-template.yaml"
 
+# Preloads are checked against free RAM with the Model Orchestrator's monitor
+sys.path.insert(0, str(BASE_DIR / "Model Orchestrator"))
+from ram_monitor import RAMMonitor
+
+GB = 1024 ** 3
+
 # Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -59,7 +66,13 @@ class FastOrchestrator:
             self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
             self.logger.info("✓ OpenAI initialized")
         
+        # Free RAM for preloads, and preloaded models: {model_name: agents still to run}
+        self.ram_monitor = RAMMonitor()
+        self.preloaded: Dict[str, set] = {}
+        self.preload_lock = threading.Lock()
+        
         # Check Ollama availability
+        self.ollama_sizes: Dict[str, float] = {}
         self.ollama_available = self.check_ollama()
         self.ollama_models = self.get_available_ollama_models() if self.ollama_available else []
         
@@ -81,11 +94,85 @@ class FastOrchestrator:
             response = requests.get("http://localhost:11434/api/tags", timeout=2)
             if response.status_code == 200:
                 data = response.json()
+                self.ollama_sizes = {m['name']: m.get('size', 0) / GB for m in data.get('models', [])}
                 return [m['name'] for m in data.get('models', [])]
         except:
             pass
         return []
     
+    def get_loaded_ollama_models(self) -> List[str]:
+        """Get list of models Ollama currently has in memory"""
+        try:
+            response = requests.get("http://localhost:11434/api/ps", timeout=2)
+            if response.status_code == 200:
+                return [m['name'] for m in response.json().get('models', [])]
+        except:
+            pass
+        return []
+    
+    def preload_local_models(self, category: str, agent_names: List[str]) -> Dict[str, int]:
+        """Start loading the local models the queued agents will route to, while they fit in free RAM
+        Returns: {model_name: queued agents} for the models being preloaded
+        """
+        queued: Dict[str, List[str]] = {}
+        for agent_name in agent_names:
+            if f"{category}/{agent_name}" in self.progress['completed']:
+                continue
+            v1_file = V1_AGENTS_DIR / category / "yaml" / f"{agent_name}-definition.yaml"
+            try:
+                complexity = self.analyze_complexity(v1_file.read_text())
+            except OSError:
+                continue
+            model_name, model_type = self.select_model(complexity)
+            if model_type == "ollama":
+                queued.setdefault(model_name, []).append(agent_name)
+        
+        def load(model_name: str):
+            # Prompt-less request: Ollama loads the model without generating
+            try:
+                requests.post("http://localhost:11434/api/generate",
+                              json={"model": model_name, "keep_alive": "10m"}, timeout=300)
+            except Exception as e:
+                self.logger.warning(f"⚠ Preload of {model_name} failed: {str(e)[:100]}")
+        
+        loaded = self.get_loaded_ollama_models()
+        headroom_gb = self.ram_monitor.get_model_budget_gb()
+        preloading = {}
+        # Most wanted first while they fit; already resident models need no preload
+        for model_name, agents in sorted(queued.items(), key=lambda item: len(item[1]), reverse=True):
+            if model_name in loaded:
+                continue
+            size_gb = self.ollama_sizes.get(model_name, 0.0)
+            if size_gb > headroom_gb:
+                self.logger.info(f"⊘ Not preloading {model_name}: {size_gb:.1f}GB > {headroom_gb:.1f}GB free")
+                continue
+            headroom_gb -= size_gb
+            with self.preload_lock:
+                self.preloaded[model_name] = set(agents)
+            self.logger.info(f"🔥 Preloading {model_name} for {len(agents)} queued agents")
+            threading.Thread(target=load, args=(model_name,), daemon=True).start()
+            preloading[model_name] = len(agents)
+        return preloading
+    
+    def release_preload(self, agent_name: str):
+        """An agent is done with its local model; unload preloads no queued agent still needs"""
+        with self.preload_lock:
+            idle = []
+            for model_name, agents in self.preloaded.items():
+                agents.discard(agent_name)
+                if not agents:
+                    idle.append(model_name)
+            for model_name in idle:
+                del self.preloaded[model_name]
+        
+        for model_name in idle:
+            try:
+                requests.post("http://localhost:11434/api/generate",
+                              json={"model": model_name, "keep_alive": 0}, timeout=10)
+                self.logger.info(f"💤 Unloaded preloaded {model_name}: no queued agents left")
+            except Exception as e:
+                self.logger.warning(f"⚠ Unload of {model_name} failed: {str(e)[:100]}")
+    
     def load_progress(self) -> Dict:
         """Load transformation progress"""
         if PROGRESS_FILE.exists():
@@ -277,6 +364,7 @@ OUTPUT COMPLETE V2 YAML NOW:"""
             transformed_content = self.call_ollama(model_name, prompt)
             if not transformed_content and self.openai_client:
                 self.logger.warning(f"⚠ {agent_name}: Local failed, falling back to cloud")
+                self.release_preload(agent_name)
                 transformed_content = self.call_openai("gpt-4o-mini", prompt)
         else:
             transformed_content = self.call_openai(model_name, prompt)
@@ -344,6 +432,9 @@ OUTPUT COMPLETE V2 YAML NOW:"""
         
         self.logger.info(f"📋 Found {len(agent_names)} agents")
         
+        # Local models load while the first prompts are read and built
+        self.preload_local_models(category, agent_names)
+        
         results = {"success": 0, "failed": 0, "skipped": 0}
         
         # Process with thread pool
@@ -369,6 +460,7 @@ OUTPUT COMPLETE V2 YAML NOW:"""
                 except Exception as e:
                     results['failed'] += 1
                     self.logger.error(f"✗ Exception: {agent_name}: {e}")
+                self.release_preload(agent_name)
         
         # Print summary
         elapsed = time.time() - self.stats['start_time']
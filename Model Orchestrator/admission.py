@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Admission control for local models
+Each local model gets as many concurrent slots as Ollama runs in parallel
+(OLLAMA_NUM_PARALLEL) and a bounded priority queue in front of them, so
+excess requests wait here, visibly, or are turned away for the router to
+send elsewhere, instead of piling up inside Ollama.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from model_footprint import DEFAULT_NUM_PARALLEL
+
+
+class AdmissionRejected(Exception):
+    """A local model's queue is full or its expected wait too long"""
+
+    def __init__(self, model: str, reason: str, expected_wait_ms: float):
+        super().__init__(f"{model}: {reason}")
+        self.model = model
+        self.reason = reason
+        self.expected_wait_ms = expected_wait_ms
+
+
+class ModelGate:
+    """
+    Slots and a bounded priority queue for one model
+
+    Waiters are served lowest `priority` first, FIFO within a priority. A
+    released slot passes straight to the next waiter. Expected wait is the
+    number of slot turnovers ahead of a new request times the smoothed
+    service time.
+    """
+
+    ALPHA = 0.2
+    SERVICE_MS = 5000.0  # Service-time guess until the first request completes
+
+    def __init__(self, model: str, slots: int, max_queue: int):
+        self.model = model
+        self.slots = max(1, slots)
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.service_ms = self.SERVICE_MS
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "wait_ms": 0.0}
+
+        self._waiters: List[tuple] = []  # (priority, seq, future)
+        self._seq = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait_ms(self) -> float:
+        """Wait a request arriving now would see before getting a slot"""
+        ahead = self.in_flight + self.queue_depth - self.slots + 1
+        if ahead <= 0:
+            return 0.0
+        return -(-ahead // self.slots) * self.service_ms
+
+    def check(self, max_wait_ms: Optional[float] = None):
+        """Raise AdmissionRejected if a new request would be turned away"""
+        if self.in_flight < self.slots and not self._waiters:
+            return
+        expected = self.expected_wait_ms()
+        if self.queue_depth >= self.max_queue:
+            raise AdmissionRejected(self.model, f"queue full ({self.queue_depth} waiting)", expected)
+        if max_wait_ms is not None and expected > max_wait_ms:
+            raise AdmissionRejected(self.model, f"expected wait {expected:.0f}ms > {max_wait_ms:.0f}ms", expected)
+
+    async def acquire(self, priority: int = 0, max_wait_ms: Optional[float] = None) -> float:
+        """Take a slot, queueing if needed; returns milliseconds waited"""
+        try:
+            self.check(max_wait_ms)
+        except AdmissionRejected:
+            self.stats["rejected"] += 1
+            raise
+
+        self.stats["admitted"] += 1
+        if self.in_flight < self.slots and not self._waiters:
+            self.in_flight += 1
+            return 0.0
+
+        self.stats["queued"] += 1
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # Granted just as we were cancelled: pass it on
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+        waited_ms = (time.perf_counter() - start) * 1000
+        self.stats["wait_ms"] += waited_ms
+        return waited_ms
+
+    def release(self, service_ms: Optional[float] = None):
+        """Free a slot (handing it to the next waiter) and fold in the service time"""
+        if service_ms is not None:
+            self.service_ms += self.ALPHA * (service_ms - self.service_ms)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "slots": self.slots,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "expected_wait_ms": round(self.expected_wait_ms(), 1),
+            "service_ms": round(self.service_ms, 1),
+            **self.stats,
+        }
+
+
+class AdmissionController:
+    """Per-model gates, created on first use"""
+
+    MAX_QUEUE = 8
+    MAX_WAIT_MS = 30000.0
+
+    def __init__(self,
+                 slots: Optional[int] = None,
+                 max_queue: int = MAX_QUEUE,
+                 max_wait_ms: Optional[float] = MAX_WAIT_MS,
+                 model_slots: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            slots: Parallel requests per model (defaults to $OLLAMA_NUM_PARALLEL, then 1)
+            max_queue: Requests allowed to wait per model; more are rejected
+            max_wait_ms: Reject when the expected wait exceeds this (None = only queue length)
+            model_slots: Per-model overrides of `slots`
+        """
+        self.slots = slots or int(os.getenv("OLLAMA_NUM_PARALLEL", DEFAULT_NUM_PARALLEL))
+        self.max_queue = max_queue
+        self.max_wait_ms = max_wait_ms
+        self.model_slots = dict(model_slots or {})
+        self.gates: Dict[str, ModelGate] = {}
+
+    def gate(self, model: str) -> ModelGate:
+        gate = self.gates.get(model)
+        if gate is None:
+            gate = self.gates[model] = ModelGate(model, self.model_slots.get(model, self.slots), self.max_queue)
+        return gate
+
+    # ------------------------------------------------------------------------
+    # Router signals
+    # ------------------------------------------------------------------------
+
+    def queue_depth(self, model: str) -> int:
+        gate = self.gates.get(model)
+        return gate.queue_depth if gate else 0
+
+    def expected_wait_ms(self, model: str) -> float:
+        gate = self.gates.get(model)
+        return gate.expected_wait_ms() if gate else 0.0
+
+    def would_admit(self, model: str, max_wait_ms: Optional[float] = None) -> bool:
+        """True if a request sent now would get a slot or a place in the queue"""
+        gate = self.gates.get(model)
+        if gate is None:
+            return True
+        try:
+            gate.check(self.max_wait_ms if max_wait_ms is None else max_wait_ms)
+        except AdmissionRejected:
+            return False
+        return True
+
+    # ------------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self, model: str, priority: int = 0,
+                   max_wait_ms: Optional[float] = None) -> AsyncIterator[float]:
+        """Hold one of the model's slots; yields milliseconds spent queued"""
+        gate = self.gate(model)
+        waited_ms = await gate.acquire(priority, self.max_wait_ms if max_wait_ms is None else max_wait_ms)
+        start = time.perf_counter()
+        completed = False
+        try:
+            yield waited_ms
+            completed = True
+        finally:
+            gate.release((time.perf_counter() - start) * 1000 if completed else None)
+
+    def status(self) -> Dict[str, Dict]:
+        return {model: gate.to_dict() for model, gate in self.gates.items()}
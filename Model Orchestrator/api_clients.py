@@ -8,68 +8,187 @@ import os
 import json
 import time
 import asyncio
-from typing import Dict, List, Optional, Any, Union, AsyncIterator
-from dataclasses import dataclass
-import aiohttp
+from typing import Dict, List, Optional, Any, Union, Tuple, AsyncIterator
 import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 import logging
 
+from transports import Transport, get_transport, transport_for_provider, DEFAULT_TRANSPORT
+from tracing import child_span
+from profiling import stage_timers
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+RETAIN_RAW_ENV_VAR = "ORCHESTRATOR_RETAIN_RAW"
+
 class APIResponse:
-    """Standardized API response format"""
-    content: str
-    model: str
-    provider: str
-    usage: Dict[str, int]  # input_tokens, output_tokens
-    latency_ms: int
-    raw_response: Optional[Dict] = None
-    error: Optional[str] = None
+    """
+    Standardized API response format
+    
+    Slotted and lean: token counts are stored as ints and the provider payload
+    is only kept (as raw bytes) when the client retains it, then decoded on
+    first access to raw_response.
+    """
+    
+    __slots__ = ("content", "model", "provider", "input_tokens", "output_tokens",
+                 "latency_ms", "error", "timings", "raw_body", "_raw_response")
+    
+    def __init__(self,
+                 content: str,
+                 model: str,
+                 provider: str,
+                 usage: Dict[str, int],  # input_tokens, output_tokens
+                 latency_ms: int,
+                 raw_response: Optional[Dict] = None,
+                 error: Optional[str] = None,
+                 timings: Optional[Dict[str, float]] = None,  # dns_ms, connect_ms, ttfb_ms, ... (+ load_ms, eval_ms for Ollama)
+                 raw_body: Optional[bytes] = None):
+        self.content = content
+        self.model = model
+        self.provider = provider
+        self.input_tokens = usage.get('input_tokens', 0)
+        self.output_tokens = usage.get('output_tokens', 0)
+        self.latency_ms = latency_ms
+        self.error = error
+        self.timings = timings
+        self.raw_body = raw_body
+        self._raw_response = raw_response
+    
+    @property
+    def usage(self) -> Dict[str, int]:
+        return {'input_tokens': self.input_tokens, 'output_tokens': self.output_tokens}
+    
+    @property
+    def raw_response(self) -> Optional[Dict]:
+        """Provider payload, decoded from raw_body on first access"""
+        if self._raw_response is None and self.raw_body is not None:
+            self._raw_response = json.loads(self.raw_body)
+        return self._raw_response
+    
+    def __eq__(self, other):
+        if not isinstance(other, APIResponse):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in
+                   ("content", "model", "provider", "input_tokens", "output_tokens", "latency_ms", "error"))
+    
+    def __repr__(self):
+        return (f"APIResponse(content={self.content!r}, model={self.model!r}, provider={self.provider!r}, "
+                f"usage={self.usage!r}, latency_ms={self.latency_ms!r}, error={self.error!r})")
 
 class BaseAPIClient:
     """Base class for all API clients"""
     
-    def __init__(self, api_key: str, base_url: str):
+    def __init__(self, api_key: str, base_url: str, transport: Union[str, Transport, None] = None):
         self.api_key = api_key
         self.base_url = base_url
-        self.session = None
+        self.transport_name = DEFAULT_TRANSPORT
+        self.transport: Optional[Transport] = None
+        self.set_transport(transport)
+        # Keep raw response bodies on APIResponse.raw_body (off by default to save memory)
+        self.retain_raw = os.getenv(RETAIN_RAW_ENV_VAR, "").lower() in ("1", "true", "yes")
+    
+    def set_transport(self, transport: Union[str, Transport, None]):
+        """Select the HTTP transport by name ('aiohttp', 'httpx', 'http2') or instance"""
+        if isinstance(transport, Transport):
+            self.transport = transport
+            self.transport_name = transport.name
+        elif transport:
+            self.transport_name = transport
+            self.transport = None
+    
+    def _get_transport(self) -> Transport:
+        if self.transport is None:
+            self.transport = get_transport(self.transport_name)
+        return self.transport
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self._get_transport()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        await self.close()
+    
+    async def close(self):
+        """Release the transport's pooled connections"""
+        if self.transport:
+            await self.transport.close()
+    
+    @property
+    def idle_timeout(self) -> float:
+        """Seconds an idle pooled connection is kept open"""
+        return self._get_transport().idle_timeout
+    
+    def warm_up_urls(self) -> List[str]:
+        """URLs whose hosts should hold pre-opened connections"""
+        return [self.base_url]
+    
+    async def warm_up(self, connections: int = 1) -> int:
+        """Pre-open keep-alive connections to this client's hosts"""
+        transport = self._get_transport()
+        opened = await asyncio.gather(*[
+            transport.warm_up(url, connections) for url in self.warm_up_urls()
+        ])
+        return sum(opened)
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     async def _make_request(self, 
                            method: str, 
                            endpoint: str, 
                            headers: Dict, 
-                           payload: Dict) -> Dict:
-        """Make API request with retry logic"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-            
+                           payload: Dict) -> Tuple[Dict, int, Dict[str, float], Optional[bytes]]:
+        """
+        Make API request with retry logic
+        
+        Returns the decoded body, end-to-end latency in ms (including retries,
+        body transfer and decode), the timing breakdown of the final attempt
+        plus retry_ms / attempts, and the raw body if retain_raw is set.
+        """
+        start_time = time.perf_counter()
+        attempts: List[Dict[str, float]] = []
+        
+        data, body = await self._send_request(method, endpoint, headers, payload, attempts)
+        
+        total_ms = (time.perf_counter() - start_time) * 1000
+        if stage_timers.enabled:
+            stage_timers.record("make_request", int(total_ms * 1e6))
+        timings = attempts[-1]
+        timings["retry_ms"] = total_ms - timings.pop("attempt_ms")
+        timings["attempts"] = len(attempts)
+        return data, int(total_ms), timings, body if self.retain_raw else None
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    async def _send_request(self,
+                            method: str,
+                            endpoint: str,
+                            headers: Dict,
+                            payload: Dict,
+                            attempts: List[Dict[str, float]]) -> Tuple[Dict, bytes]:
+        """Single attempt; appends its timing breakdown to attempts"""
+        transport = self._get_transport()
         url = f"{self.base_url}/{endpoint}"
-        start_time = time.time()
+        
+        timings: Dict[str, float] = {}
+        attempts.append(timings)
+        start_time = time.perf_counter()
         
         try:
-            async with self.session.request(method, url, headers=headers, json=payload) as response:
-                latency_ms = int((time.time() - start_time) * 1000)
+            with child_span("http_request", endpoint=endpoint, attempt=len(attempts)) as span:
+                response = await transport.request(method, url, headers=headers, json=payload, timings=timings)
+                span.set_attribute("status", response.status)
                 
                 if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"API Error {response.status}: {error_text}")
+                    raise Exception(f"API Error {response.status}: {response.text()}")
                 
-                data = await response.json()
-                return data, latency_ms
+                decode_start = time.perf_counter()
+                data = response.json()
+                timings["decode_ms"] = (time.perf_counter() - decode_start) * 1000
+                if stage_timers.enabled:
+                    stage_timers.record("parse_response", int(timings["decode_ms"] * 1e6))
+                timings["attempt_ms"] = (time.perf_counter() - start_time) * 1000
+                span.set_attributes(timings)
+            return data, response.body
                 
         except Exception as e:
-            logger.error(f"Request failed: {e}")
+            logger.error("Request to %s failed (attempt %d): %s", endpoint, len(attempts), e)
             raise
 
 class GrokAPIClient(BaseAPIClient):
@@ -109,7 +228,7 @@ class GrokAPIClient(BaseAPIClient):
         if stream:
             return self._stream_completion(headers, payload)
         
-        data, latency_ms = await self._make_request("POST", "chat/completions", headers, payload)
+        data, latency_ms, timings, raw_body = await self._make_request("POST", "chat/completions", headers, payload)
         
         return APIResponse(
             content=data['choices'][0]['message']['content'],
@@ -120,30 +239,29 @@ class GrokAPIClient(BaseAPIClient):
                 'output_tokens': data['usage']['completion_tokens']
             },
             latency_ms=latency_ms,
-            raw_response=data
+            raw_body=raw_body,
+            timings=timings
         )
     
     async def _stream_completion(self, headers: Dict, payload: Dict) -> AsyncIterator[str]:
         """Stream completion responses"""
         payload['stream'] = True
         
-        async with self.session.post(
+        async for line in self._get_transport().stream_lines(
+            "POST",
             f"{self.base_url}/chat/completions",
             headers=headers,
             json=payload
-        ) as response:
-            async for line in response.content:
-                if line:
-                    line = line.decode('utf-8').strip()
-                    if line.startswith("data: ") and line != "data: [DONE]":
-                        try:
-                            chunk = json.loads(line[6:])
-                            if 'choices' in chunk and chunk['choices']:
-                                delta = chunk['choices'][0].get('delta', {})
-                                if 'content' in delta:
-                                    yield delta['content']
-                        except json.JSONDecodeError:
-                            continue
+        ):
+            if line.startswith("data: ") and line != "data: [DONE]":
+                try:
+                    chunk = json.loads(line[6:])
+                    if 'choices' in chunk and chunk['choices']:
+                        delta = chunk['choices'][0].get('delta', {})
+                        if 'content' in delta:
+                            yield delta['content']
+                except json.JSONDecodeError:
+                    continue
 
 class OpenAIAPIClient(BaseAPIClient):
     """OpenAI API client"""
@@ -178,7 +296,7 @@ class OpenAIAPIClient(BaseAPIClient):
         if max_tokens:
             payload["max_tokens"] = max_tokens
             
-        data, latency_ms = await self._make_request("POST", "chat/completions", headers, payload)
+        data, latency_ms, timings, raw_body = await self._make_request("POST", "chat/completions", headers, payload)
         
         return APIResponse(
             content=data['choices'][0]['message']['content'],
@@ -189,7 +307,8 @@ class OpenAIAPIClient(BaseAPIClient):
                 'output_tokens': data['usage']['completion_tokens']
             },
             latency_ms=latency_ms,
-            raw_response=data
+            raw_body=raw_body,
+            timings=timings
         )
 
 class GoogleAPIClient(BaseAPIClient):
@@ -233,7 +352,7 @@ class GoogleAPIClient(BaseAPIClient):
             payload["generationConfig"]["maxOutputTokens"] = max_tokens
             
         endpoint = f"models/{model}:generateContent?key={self.api_key}"
-        data, latency_ms = await self._make_request("POST", endpoint, headers, payload)
+        data, latency_ms, timings, raw_body = await self._make_request("POST", endpoint, headers, payload)
         
         return APIResponse(
             content=data['candidates'][0]['content']['parts'][0]['text'],
@@ -244,7 +363,8 @@ class GoogleAPIClient(BaseAPIClient):
                 'output_tokens': data['usageMetadata']['candidatesTokenCount']
             },
             latency_ms=latency_ms,
-            raw_response=data
+            raw_body=raw_body,
+            timings=timings
         )
 
 class AzureOpenAIClient(BaseAPIClient):
@@ -281,7 +401,7 @@ class AzureOpenAIClient(BaseAPIClient):
             
         # Azure OpenAI uses deployment names in the endpoint
         endpoint = f"openai/deployments/{model}/chat/completions?api-version=2024-02-15-preview"
-        data, latency_ms = await self._make_request("POST", endpoint, headers, payload)
+        data, latency_ms, timings, raw_body = await self._make_request("POST", endpoint, headers, payload)
         
         return APIResponse(
             content=data['choices'][0]['message']['content'],
@@ -292,7 +412,8 @@ class AzureOpenAIClient(BaseAPIClient):
                 'output_tokens': data['usage']['completion_tokens']
             },
             latency_ms=latency_ms,
-            raw_response=data
+            raw_body=raw_body,
+            timings=timings
         )
 
 class BedrockAPIClient(BaseAPIClient):
@@ -379,7 +500,7 @@ class LocalAPIClient(BaseAPIClient):
             "stream": False
         }
             
-        data, latency_ms = await self._make_request("POST", "v1/chat/completions", headers, payload)
+        data, latency_ms, timings, raw_body = await self._make_request("POST", "v1/chat/completions", headers, payload)
         
         return APIResponse(
             content=data['choices'][0]['message']['content'],
@@ -390,7 +511,8 @@ class LocalAPIClient(BaseAPIClient):
                 'output_tokens': data.get('usage', {}).get('completion_tokens', 0)
             },
             latency_ms=latency_ms,
-            raw_response=data
+            raw_body=raw_body,
+            timings=timings
         )
 
 # API client factory function
@@ -408,7 +530,7 @@ def get_api_client(provider: str, **kwargs):
         'azure': AzureOpenAIClient,
         'bedrock': BedrockAPIClient,
         'local': LocalAPIClient,
-        'ollama': LocalAPIClient,
+        'ollama': OllamaAPIClient,
     }
     
     client_class = clients.get(provider.lower())
@@ -460,7 +582,7 @@ class AnthropicAPIClient(BaseAPIClient):
             if max_tokens:
                 payload["max_tokens"] = max_tokens
                 
-            data, latency_ms = await self._make_request("POST", "chat/completions", headers, payload)
+            data, latency_ms, timings, raw_body = await self._make_request("POST", "chat/completions", headers, payload)
             
             return APIResponse(
                 content=data['choices'][0]['message']['content'],
@@ -471,7 +593,8 @@ class AnthropicAPIClient(BaseAPIClient):
                     'output_tokens': data['usage']['completion_tokens']
                 },
                 latency_ms=latency_ms,
-                raw_response=data
+                raw_body=raw_body,
+                timings=timings
             )
         else:
             # Direct Anthropic API
@@ -505,7 +628,7 @@ class AnthropicAPIClient(BaseAPIClient):
             if system_msg:
                 payload["system"] = system_msg
                 
-            data, latency_ms = await self._make_request("POST", "messages", headers, payload)
+            data, latency_ms, timings, raw_body = await self._make_request("POST", "messages", headers, payload)
             
             return APIResponse(
                 content=data['content'][0]['text'],
@@ -516,7 +639,8 @@ class AnthropicAPIClient(BaseAPIClient):
                     'output_tokens': data['usage']['output_tokens']
                 },
                 latency_ms=latency_ms,
-                raw_response=data
+                raw_body=raw_body,
+                timings=timings
             )
 
 class LocalModelClient(BaseAPIClient):
@@ -548,7 +672,7 @@ class LocalModelClient(BaseAPIClient):
             payload["max_tokens"] = max_tokens
             
         try:
-            data, latency_ms = await self._make_request("POST", "chat/completions", headers, payload)
+            data, latency_ms, timings, raw_body = await self._make_request("POST", "chat/completions", headers, payload)
             
             return APIResponse(
                 content=data['choices'][0]['message']['content'],
@@ -559,34 +683,184 @@ class LocalModelClient(BaseAPIClient):
                     'output_tokens': data.get('usage', {}).get('completion_tokens', 0)
                 },
                 latency_ms=latency_ms,
-                raw_response=data
+                raw_body=raw_body,
+                timings=timings
             )
         except Exception as e:
-            # Fallback for Ollama format
+            # Fallback to the native Ollama chat endpoint with the full conversation
             try:
-                ollama_payload = {
-                    "model": model,
-                    "prompt": messages[-1]["content"],
-                    "temperature": temperature,
-                }
-                
-                async with self.session.post(f"{self.base_url}/api/generate", json=ollama_payload) as response:
-                    data = await response.json()
-                    
-                return APIResponse(
-                    content=data['response'],
+                ollama_url = self.base_url[:-3] if self.base_url.endswith('/v1') else self.base_url
+                ollama = OllamaAPIClient(ollama_url, transport=self._get_transport())
+                ollama.retain_raw = self.retain_raw
+                return await ollama.chat_completion(
                     model=model,
-                    provider="local",
-                    usage={'input_tokens': 0, 'output_tokens': 0},
-                    latency_ms=0,
-                    raw_response=data
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
                 )
-            except:
+            except Exception:
                 raise e
 
+class OllamaAPIClient(BaseAPIClient):
+    """Native Ollama client using /api/chat with keep_alive and real token/timing stats"""
+    
+    DEFAULT_KEEP_ALIVE = "5m"
+    
+    def __init__(self,
+                 base_url: Optional[str] = None,
+                 keep_alive: Optional[Union[str, int]] = None,
+                 num_ctx: Optional[int] = None,
+                 transport: Union[str, Transport, None] = None):
+        base_url = base_url or os.getenv('OLLAMA_HOST', 'http://localhost:11434')
+        if not base_url.startswith('http'):
+            base_url = f"http://{base_url}"
+        # No API key needed for local models
+        super().__init__("", base_url.rstrip('/'), transport)
+        self.keep_alive = keep_alive if keep_alive is not None else self.DEFAULT_KEEP_ALIVE
+        self.num_ctx = num_ctx
+        # Ollama reloads a model whenever num_ctx changes, so the context size
+        # used for each model is remembered and reused unless overridden
+        self._model_num_ctx: Dict[str, int] = {}
+        self.last_stream_response: Optional[APIResponse] = None
+    
+    def _build_payload(self,
+                       model: str,
+                       messages: List[Dict[str, str]],
+                       temperature: float,
+                       max_tokens: Optional[int],
+                       stream: bool,
+                       keep_alive: Optional[Union[str, int]],
+                       num_ctx: Optional[int],
+                       options: Optional[Dict[str, Any]]) -> Dict:
+        """Build an /api/chat payload, pinning num_ctx per model to avoid reloads"""
+        num_ctx = num_ctx or self._model_num_ctx.get(model) or self.num_ctx
+        
+        payload_options = {"temperature": temperature}
+        if max_tokens:
+            payload_options["num_predict"] = max_tokens
+        if num_ctx:
+            payload_options["num_ctx"] = num_ctx
+            self._model_num_ctx[model] = num_ctx
+        if options:
+            payload_options.update(options)
+        
+        return {
+            "model": model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": keep_alive if keep_alive is not None else self.keep_alive,
+            "options": payload_options
+        }
+    
+    @staticmethod
+    def parse_timings(data: Dict) -> Dict[str, float]:
+        """Convert Ollama nanosecond durations into millisecond timings"""
+        ns_to_ms = 1e-6
+        eval_count = data.get('eval_count', 0)
+        eval_ms = data.get('eval_duration', 0) * ns_to_ms
+        prompt_eval_count = data.get('prompt_eval_count', 0)
+        prompt_eval_ms = data.get('prompt_eval_duration', 0) * ns_to_ms
+        
+        return {
+            "load_ms": data.get('load_duration', 0) * ns_to_ms,
+            "prompt_eval_ms": prompt_eval_ms,
+            "eval_ms": eval_ms,
+            "total_ms": data.get('total_duration', 0) * ns_to_ms,
+            "prompt_tokens_per_second": prompt_eval_count / (prompt_eval_ms / 1000) if prompt_eval_ms else 0.0,
+            "tokens_per_second": eval_count / (eval_ms / 1000) if eval_ms else 0.0,
+        }
+    
+    def _to_response(self,
+                     model: str,
+                     content: str,
+                     data: Dict,
+                     latency_ms: int,
+                     timings: Optional[Dict[str, float]] = None,
+                     raw_body: Optional[bytes] = None) -> APIResponse:
+        # Network breakdown from the transport plus Ollama's server-side stats
+        return APIResponse(
+            content=content,
+            model=model,
+            provider="local",
+            usage={
+                'input_tokens': data.get('prompt_eval_count', 0),
+                'output_tokens': data.get('eval_count', 0)
+            },
+            latency_ms=latency_ms,
+            raw_body=raw_body,
+            timings={**(timings or {}), **self.parse_timings(data)}
+        )
+    
+    async def chat_completion(self,
+                             model: str,
+                             messages: List[Dict[str, str]],
+                             temperature: float = 0.7,
+                             max_tokens: Optional[int] = None,
+                             stream: bool = False,
+                             keep_alive: Optional[Union[str, int]] = None,
+                             num_ctx: Optional[int] = None,
+                             options: Optional[Dict[str, Any]] = None,
+                             **kwargs) -> APIResponse:
+        """Send chat request to Ollama's native /api/chat endpoint"""
+        
+        if stream:
+            return self._stream_completion(model, messages, temperature=temperature,
+                                           max_tokens=max_tokens, keep_alive=keep_alive,
+                                           num_ctx=num_ctx, options=options)
+        
+        headers = {"Content-Type": "application/json"}
+        payload = self._build_payload(model, messages, temperature, max_tokens,
+                                      False, keep_alive, num_ctx, options)
+        
+        data, latency_ms, timings, raw_body = await self._make_request("POST", "api/chat", headers, payload)
+        
+        return self._to_response(model, data['message']['content'], data, latency_ms, timings, raw_body)
+    
+    async def stream_chat(self,
+                          model: str,
+                          messages: List[Dict[str, str]],
+                          temperature: float = 0.7,
+                          max_tokens: Optional[int] = None,
+                          keep_alive: Optional[Union[str, int]] = None,
+                          num_ctx: Optional[int] = None,
+                          options: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict]:
+        """Stream raw NDJSON chunks; the final chunk (done=True) carries token and timing stats"""
+        payload = self._build_payload(model, messages, temperature, max_tokens,
+                                      True, keep_alive, num_ctx, options)
+        
+        async for line in self._get_transport().stream_lines("POST", f"{self.base_url}/api/chat", json=payload):
+            if line:
+                yield json.loads(line)
+    
+    async def _stream_completion(self,
+                                 model: str,
+                                 messages: List[Dict[str, str]],
+                                 **kwargs) -> AsyncIterator[str]:
+        """Stream content deltas, recording final stats in last_stream_response"""
+        start_time = time.time()
+        parts = []
+        
+        async for chunk in self.stream_chat(model, messages, **kwargs):
+            content = chunk.get('message', {}).get('content', '')
+            if content:
+                parts.append(content)
+                yield content
+            if chunk.get('done'):
+                latency_ms = int((time.time() - start_time) * 1000)
+                self.last_stream_response = self._to_response(model, "".join(parts), chunk, latency_ms)
+
 # Factory function to get appropriate client
-def get_api_client(provider: str, **kwargs) -> BaseAPIClient:
-    """Factory function to get the appropriate API client"""
+def get_api_client(provider: str,
+                   transport: Union[str, Transport, None] = None,
+                   retain_raw: Optional[bool] = None,
+                   **kwargs) -> BaseAPIClient:
+    """
+    Factory function to get the appropriate API client
+    
+    The transport defaults to ORCHESTRATOR_TRANSPORT_<PROVIDER> or
+    ORCHESTRATOR_TRANSPORT from the environment (aiohttp if unset).
+    retain_raw keeps raw response bodies (default: ORCHESTRATOR_RETAIN_RAW).
+    """
     
     clients = {
         'xai': GrokAPIClient,
@@ -595,9 +869,14 @@ def get_api_client(provider: str, **kwargs) -> BaseAPIClient:
         'anthropic': AnthropicAPIClient,
         'dial': lambda: AnthropicAPIClient(use_dial=True),
         'local': LocalModelClient,
+        'ollama': OllamaAPIClient,
     }
     
     if provider not in clients:
         raise ValueError(f"Unknown provider: {provider}")
     
-    return clients[provider](**kwargs)
+    client = clients[provider](**kwargs)
+    client.set_transport(transport or transport_for_provider(provider))
+    if retain_raw is not None:
+        client.retain_raw = retain_raw
+    return client
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Routing Throughput vs Logging Benchmark
+Runs select_model in a tight loop with logging off (level WARNING, so the
+per-routing DEBUG record is skipped at the level check), with a synchronous
+StreamHandler on the root logger (what logging.basicConfig installs) and with
+the queued text and JSON handlers from log_config.
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import importlib.util
+from pathlib import Path
+from typing import Dict
+
+from log_config import configure_logging, stop_logging, TEXT_FORMAT
+
+spec = importlib.util.spec_from_file_location(
+    "model_orchestrator", Path(__file__).parent / "model-orchestrator.py"
+)
+model_orchestrator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(model_orchestrator)
+
+PROMPTS = [
+    "Write a Python function to calculate fibonacci",
+    "Reason through this complex math problem step by step",
+    "Debug this code and find the error",
+    "Translate this text to Spanish",
+    "Generate a creative story about space exploration",
+]
+
+
+# ============================================================================
+# Logging Modes
+# ============================================================================
+
+def use_off(sink, level):
+    stop_logging()
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def use_sync(sink, level):
+    stop_logging()
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+    return handler
+
+
+def use_queued_text(sink, level):
+    configure_logging(level, json_format=False, stream=sink)
+
+
+def use_queued_json(sink, level):
+    configure_logging(level, json_format=True, stream=sink)
+
+
+MODES = {
+    "off": use_off,
+    "sync": use_sync,
+    "queued-text": use_queued_text,
+    "queued-json": use_queued_json,
+}
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def routings_per_second(orchestrator, seconds: float) -> float:
+    routed = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for prompt in PROMPTS:
+            orchestrator.select_model(prompt)
+        routed += len(PROMPTS)
+    return routed / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark routing throughput with logging on and off")
+    parser.add_argument("--seconds", "-s", type=float, default=3.0, help="Seconds per mode")
+    parser.add_argument("--trials", "-t", type=int, default=3, help="Runs per mode (best is reported)")
+    parser.add_argument("--sink", default=os.devnull, help="Where log lines go (default: discard)")
+    parser.add_argument("--level", default="DEBUG", help="Level for the logging-on modes")
+    parser.add_argument("--json", action="store_true", help="Also print JSON results")
+    args = parser.parse_args()
+
+    # Model loading logs go to stderr; only the timed loop writes to the sink
+    logging.getLogger().setLevel(logging.WARNING)
+    orchestrator = model_orchestrator.ModelOrchestrator()
+
+    # Warm up caches and the allocator before the first timed mode
+    routings_per_second(orchestrator, args.seconds)
+
+    results: Dict[str, float] = {}
+    with open(args.sink, "w") as sink:
+        for mode, setup in MODES.items():
+            best = 0.0
+            for _ in range(args.trials):
+                handler = setup(sink, args.level)
+                best = max(best, routings_per_second(orchestrator, args.seconds))
+                stop_logging()
+                if handler is not None:
+                    logging.getLogger().removeHandler(handler)
+            results[mode] = best
+
+    print("=" * 60)
+    print(f"Routing throughput: {args.seconds:g}s x {args.trials} trials per mode, "
+          f"level {args.level}, sink {args.sink}")
+    print("=" * 60)
+    print(f"{'Logging':<14} {'Routings/s':>14} {'vs off':>10}")
+    print("-" * 60)
+    for mode, rate in results.items():
+        print(f"{mode:<14} {rate:>14,.0f} {rate / results['off']:>9.0%}")
+
+    if args.json:
+        print()
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
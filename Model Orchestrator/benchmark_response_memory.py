@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+APIResponse Memory Benchmark
+Measures the memory held by N stored responses: the old dataclass that kept
+the decoded provider payload versus the slotted APIResponse with and without
+raw body retention
+"""
+
+import json
+import argparse
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict, Optional, Callable
+
+from api_clients import APIResponse
+
+
+@dataclass
+class LegacyAPIResponse:
+    """Previous response format: a regular dataclass holding the decoded payload"""
+    content: str
+    model: str
+    provider: str
+    usage: Dict[str, int]
+    latency_ms: int
+    raw_response: Optional[Dict] = None
+    error: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None
+
+
+def provider_body(i: int) -> bytes:
+    """OpenAI-style chat completion body, as it arrives off the wire"""
+    return json.dumps({
+        "id": f"chatcmpl-{i:08d}",
+        "object": "chat.completion",
+        "created": 1730000000 + i,
+        "model": "gpt-4o-mini",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": f"Response number {i}: the answer is {i % 97}."},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 120 + i % 50, "completion_tokens": 40 + i % 30, "total_tokens": 160 + i % 80},
+        "system_fingerprint": "fp_0123456789",
+    }).encode()
+
+
+def build_legacy(i: int, body: bytes):
+    data = json.loads(body)
+    return LegacyAPIResponse(
+        content=data["choices"][0]["message"]["content"],
+        model=data["model"],
+        provider="openai",
+        usage={"input_tokens": data["usage"]["prompt_tokens"], "output_tokens": data["usage"]["completion_tokens"]},
+        latency_ms=200 + i % 100,
+        raw_response=data,
+    )
+
+
+def build_lean(i: int, body: bytes, retain_raw: bool = False):
+    data = json.loads(body)
+    return APIResponse(
+        content=data["choices"][0]["message"]["content"],
+        model=data["model"],
+        provider="openai",
+        usage={"input_tokens": data["usage"]["prompt_tokens"], "output_tokens": data["usage"]["completion_tokens"]},
+        latency_ms=200 + i % 100,
+        raw_body=body if retain_raw else None,
+    )
+
+
+def measure(build: Callable, count: int) -> float:
+    """Bytes retained per stored response"""
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    responses = [build(i, provider_body(i)) for i in range(count)]
+    # Bodies not kept alive by a response are already freed
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(responses) == count
+    return (current - baseline) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory held by stored API responses")
+    parser.add_argument("--count", "-n", type=int, default=100_000, help="Responses to store")
+    args = parser.parse_args()
+
+    modes = [
+        ("legacy dataclass + raw dict", build_legacy),
+        ("slotted (default)", build_lean),
+        ("slotted + raw bytes", lambda i, body: build_lean(i, body, retain_raw=True)),
+    ]
+
+    print("=" * 70)
+    print(f"Memory held by {args.count:,} stored responses")
+    print("=" * 70)
+    print(f"{'Format':<30} {'Bytes/response':>16} {'Total (MB)':>12}")
+    print("-" * 70)
+    for label, build in modes:
+        per_response = measure(build, args.count)
+        print(f"{label:<30} {per_response:>16.0f} {per_response * args.count / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Transport Benchmark
+Compares aiohttp (HTTP/1.1) and httpx (HTTP/2) transports for throughput and
+connection count against local mock servers that simulate provider latency
+"""
+
+import json
+import time
+import asyncio
+import argparse
+from typing import Dict
+
+from aiohttp import web
+
+from api_clients import OpenAIAPIClient
+from transports import get_transport, HTTP2_AVAILABLE
+
+MOCK_RESPONSE = json.dumps({
+    "choices": [{"message": {"role": "assistant", "content": "ok"}}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 2},
+}).encode()
+
+
+# ============================================================================
+# Mock Servers
+# ============================================================================
+
+async def start_http1_server(delay: float, stats: Dict) -> web.AppRunner:
+    """OpenAI-compatible HTTP/1.1 mock counting distinct client connections"""
+    connections = set()
+
+    async def handler(request):
+        connections.add(id(request.transport))
+        stats["connections"] = len(connections)
+        await asyncio.sleep(delay)
+        return web.Response(body=MOCK_RESPONSE, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner
+
+
+class H2MockProtocol(asyncio.Protocol):
+    """Minimal HTTP/2 (h2c prior knowledge) mock answering every stream with MOCK_RESPONSE"""
+
+    def __init__(self, delay: float, stats: Dict):
+        import h2.config
+        import h2.connection
+
+        self.delay = delay
+        self.stats = stats
+        self.conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.stats["connections"] += 1
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data):
+        import h2.events
+
+        for event in self.conn.receive_data(data):
+            if isinstance(event, h2.events.DataReceived):
+                self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+            elif isinstance(event, h2.events.StreamEnded):
+                asyncio.get_running_loop().create_task(self._respond(event.stream_id))
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.transport.close()
+        self.transport.write(self.conn.data_to_send())
+
+    async def _respond(self, stream_id: int):
+        await asyncio.sleep(self.delay)
+        self.conn.send_headers(stream_id, [
+            (":status", "200"),
+            ("content-type", "application/json"),
+            ("content-length", str(len(MOCK_RESPONSE))),
+        ])
+        self.conn.send_data(stream_id, MOCK_RESPONSE, end_stream=True)
+        self.transport.write(self.conn.data_to_send())
+
+
+async def start_http2_server(delay: float, stats: Dict) -> asyncio.AbstractServer:
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(lambda: H2MockProtocol(delay, stats), "127.0.0.1", 0)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+async def run_load(client: OpenAIAPIClient, num_requests: int, concurrency: int) -> float:
+    """Fire num_requests chat completions with bounded concurrency; returns elapsed seconds"""
+    semaphore = asyncio.Semaphore(concurrency)
+    messages = [{"role": "user", "content": "ping"}]
+
+    async def one_call():
+        async with semaphore:
+            await client.chat_completion(model="mock", messages=messages)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*[one_call() for _ in range(num_requests)])
+    return time.perf_counter() - start_time
+
+
+async def benchmark_transport(name: str, num_requests: int, concurrency: int, delay: float) -> Dict:
+    stats = {"connections": 0}
+
+    if name == "http2":
+        server = await start_http2_server(delay, stats)
+        port = server.sockets[0].getsockname()[1]
+        # Plain-text local server, so force HTTP/2 prior knowledge
+        transport = get_transport("http2", http1=False)
+    else:
+        server = await start_http1_server(delay, stats)
+        port = server.addresses[0][1]
+        transport = get_transport(name, **({"limit": concurrency} if name == "aiohttp" else
+                                           {"max_connections": concurrency,
+                                            "max_keepalive_connections": concurrency}))
+
+    client = OpenAIAPIClient(api_key="benchmark")
+    client.base_url = f"http://127.0.0.1:{port}/v1"
+    client.set_transport(transport)
+
+    try:
+        elapsed = await run_load(client, num_requests, concurrency)
+    finally:
+        await client.close()
+        if name == "http2":
+            server.close()
+            await server.wait_closed()
+        else:
+            await server.cleanup()
+
+    return {
+        "transport": name,
+        "requests": num_requests,
+        "elapsed_s": elapsed,
+        "throughput_rps": num_requests / elapsed,
+        "connections": stats["connections"],
+    }
+
+
+async def main_async(args):
+    transports = ["aiohttp", "httpx"]
+    if HTTP2_AVAILABLE:
+        transports.append("http2")
+    else:
+        print("⚠️  h2 not installed - skipping HTTP/2 (pip install h2)")
+
+    results = []
+    for name in transports:
+        results.append(await benchmark_transport(
+            name, args.requests, args.concurrency, args.latency_ms / 1000
+        ))
+
+    print("=" * 70)
+    print(f"Transport Benchmark: {args.requests} requests, "
+          f"concurrency {args.concurrency}, {args.latency_ms}ms server latency")
+    print("=" * 70)
+    print(f"{'Transport':<12} {'Elapsed (s)':>12} {'Throughput (req/s)':>20} {'Connections':>12}")
+    print("-" * 70)
+    for result in results:
+        print(f"{result['transport']:<12} {result['elapsed_s']:>12.2f} "
+              f"{result['throughput_rps']:>20.1f} {result['connections']:>12}")
+
+    if args.json:
+        print()
+        print(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API client transports")
+    parser.add_argument("--requests", "-n", type=int, default=1000, help="Total requests")
+    parser.add_argument("--concurrency", "-c", type=int, default=100, help="Concurrent requests")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated server latency")
+    parser.add_argument("--json", action="store_true", help="Also print JSON results")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Startup Warm-up Benchmark
+Compares first-request latency with and without connection pre-warming.
+A local relay adds a per-connection handshake delay that stands in for the
+DNS + TCP + TLS setup cost of a remote provider.
+"""
+
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List
+
+from aiohttp import web
+
+from api_clients import OpenAIAPIClient
+from connection_warmer import ConnectionWarmer
+
+MOCK_RESPONSE = {
+    "choices": [{"message": {"role": "assistant", "content": "ok"}}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 2},
+}
+
+
+# ============================================================================
+# Mock Provider
+# ============================================================================
+
+async def start_mock_server(delay: float) -> web.AppRunner:
+    async def chat_handler(request):
+        await asyncio.sleep(delay)
+        return web.json_response(MOCK_RESPONSE)
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner
+
+
+async def start_handshake_relay(target_port: int, handshake_delay: float) -> asyncio.AbstractServer:
+    """TCP relay that stalls each new connection to simulate connection setup"""
+
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        await asyncio.sleep(handshake_delay)
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", target_port)
+        await asyncio.gather(
+            pipe(client_reader, upstream_writer),
+            pipe(upstream_reader, client_writer),
+        )
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+async def first_burst_latencies(base_url: str, burst: int, warm_connections: int) -> List[float]:
+    """Latency (ms) of the first `burst` concurrent requests on a fresh client"""
+    client = OpenAIAPIClient(api_key="benchmark")
+    client.base_url = base_url
+    messages = [{"role": "user", "content": "ping"}]
+
+    try:
+        if warm_connections:
+            await ConnectionWarmer({"mock": client}, warm_connections).warm()
+
+        async def timed_call():
+            start_time = time.perf_counter()
+            await client.chat_completion(model="mock", messages=messages)
+            return (time.perf_counter() - start_time) * 1000
+
+        return await asyncio.gather(*[timed_call() for _ in range(burst)])
+    finally:
+        await client.close()
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": ordered[len(ordered) // 2],
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "max_ms": ordered[-1],
+    }
+
+
+async def main_async(args):
+    server = await start_mock_server(args.latency_ms / 1000)
+    relay = await start_handshake_relay(server.addresses[0][1], args.handshake_ms / 1000)
+    base_url = f"http://127.0.0.1:{relay.sockets[0].getsockname()[1]}/v1"
+
+    results = {}
+    try:
+        for label, warm_connections in [("cold", 0), ("warm", args.connections)]:
+            latencies = []
+            for _ in range(args.trials):
+                latencies.extend(await first_burst_latencies(base_url, args.burst, warm_connections))
+            results[label] = summarize(latencies)
+    finally:
+        relay.close()
+        await server.cleanup()
+
+    print("=" * 70)
+    print(f"First-request latency: burst {args.burst}, {args.trials} trials, "
+          f"{args.handshake_ms}ms handshake, {args.latency_ms}ms server latency")
+    print(f"Warm-up: {args.connections} connections per host")
+    print("=" * 70)
+    print(f"{'Startup':<10} {'Mean (ms)':>12} {'p50 (ms)':>12} {'p99 (ms)':>12} {'Max (ms)':>12}")
+    print("-" * 70)
+    for label, stats in results.items():
+        print(f"{label:<10} {stats['mean_ms']:>12.1f} {stats['p50_ms']:>12.1f} "
+              f"{stats['p99_ms']:>12.1f} {stats['max_ms']:>12.1f}")
+
+    if args.json:
+        print()
+        print(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark first-request latency with connection warm-up")
+    parser.add_argument("--trials", "-t", type=int, default=20, help="Fresh clients per mode")
+    parser.add_argument("--burst", "-b", type=int, default=4, help="Concurrent first requests per client")
+    parser.add_argument("--connections", "-c", type=int, default=4, help="Warm connections per host")
+    parser.add_argument("--handshake-ms", type=float, default=50.0, help="Simulated DNS+TCP+TLS setup per connection")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated server latency")
+    parser.add_argument("--json", action="store_true", help="Also print JSON results")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
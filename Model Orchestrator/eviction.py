@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Memory-pressure eviction of local models
+Watches available RAM, its trend and PSI memory stall time, and unloads the
+least valuable Ollama models (keep_alive 0) before the box starts swapping.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# On Apple silicon "VRAM" is the same memory, so a model's whole size is freed
+UNIFIED_MEMORY = sys.platform == "darwin"
+
+
+class EvictionController:
+    """
+    Unloads local models when memory runs short
+
+    Pressure means any of: available RAM below `min_available_gb`, available
+    RAM projected (from the sampler's trend) to fall below it within
+    `horizon` seconds, or PSI "some" avg10 above `psi_threshold` percent.
+    Under pressure, loaded models are unloaded in order of least value until
+    `target_available_gb` is expected to be free. Value is decayed demand
+    (recency and frequency together) per GB, so large idle models go first.
+    Evicted models are dropped from the keep-alive set, the cached Ollama
+    state is invalidated so routing sees them as cold, and `on_evict`
+    callbacks are told.
+    """
+
+    INTERVAL = 2.0
+    COOLDOWN = 10.0
+    MIN_AVAILABLE_GB = 4.0
+    TARGET_AVAILABLE_GB = 6.0
+    PSI_THRESHOLD = 10.0
+    HORIZON = 10.0
+
+    def __init__(self,
+                 manager,
+                 keep_alive,
+                 interval: float = INTERVAL,
+                 min_available_gb: float = MIN_AVAILABLE_GB,
+                 target_available_gb: float = TARGET_AVAILABLE_GB,
+                 psi_threshold: float = PSI_THRESHOLD,
+                 horizon: float = HORIZON,
+                 cooldown: float = COOLDOWN,
+                 on_evict: Optional[Callable[[List[str]], None]] = None):
+        """
+        Args:
+            manager: LocalModelManager (RAM snapshots, loaded models, demand)
+            keep_alive: KeepAliveService used to unload and to unpin
+            on_evict: Called with the evicted model names
+        """
+        self.manager = manager
+        self.keep_alive = keep_alive
+        self.interval = interval
+        self.min_available_gb = min_available_gb
+        self.target_available_gb = max(target_available_gb, min_available_gb)
+        self.psi_threshold = psi_threshold
+        self.horizon = horizon
+        self.cooldown = cooldown
+        self.listeners: List[Callable[[List[str]], None]] = [on_evict] if on_evict else []
+
+        self.evictions = 0
+        self._last_eviction = float("-inf")
+        self._periodic = PeriodicTask(self.check, lambda: self.interval, "Eviction check")
+
+    # ------------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------------
+
+    def pressure(self, status, slope: float = 0.0) -> Optional[str]:
+        """Reason memory is under pressure, or None"""
+        if status.available_gb < self.min_available_gb:
+            return f"available {status.available_gb:.1f}GB < {self.min_available_gb:.1f}GB"
+        projected = status.available_gb + min(slope, 0.0) * self.horizon
+        if projected < self.min_available_gb:
+            return f"available projected to {projected:.1f}GB within {self.horizon:.0f}s"
+        if status.pressure is not None and status.pressure.some_avg10 > self.psi_threshold:
+            return f"PSI some avg10 {status.pressure.some_avg10:.1f}% > {self.psi_threshold:.1f}%"
+        return None
+
+    def rank(self, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Loaded models with the RAM each frees, least valuable first"""
+        now = time.monotonic() if now is None else now
+        demand = self.manager.demand
+
+        ranked = []
+        for name, model in self.manager.get_loaded_model_details().items():
+            freed = model.size_gb if UNIFIED_MEMORY else model.ram_gb
+            if freed <= 0:
+                continue
+            last_seen = demand.last_seen(name)
+            idle = now - last_seen if last_seen is not None else float("inf")
+            # Lowest demand per GB first; ties (e.g. never used) go to the idlest, then largest
+            ranked.append((demand.rate(name, now) / freed, -idle, -freed, name, freed))
+
+        ranked.sort()
+        return [(name, freed) for *_, name, freed in ranked]
+
+    def choose_victims(self, available_gb: float, slope: float = 0.0) -> List[Tuple[str, float]]:
+        """Fewest low-value models whose unloading reaches the target"""
+        deficit = self.target_available_gb - (available_gb + min(slope, 0.0) * self.horizon)
+        victims = []
+        for name, freed in self.rank():
+            if deficit <= 0:
+                break
+            victims.append((name, freed))
+            deficit -= freed
+        return victims
+
+    # ------------------------------------------------------------------------
+    # Actions
+    # ------------------------------------------------------------------------
+
+    async def check(self) -> List[str]:
+        """Evict if under pressure; returns the models unloaded"""
+        if time.monotonic() - self._last_eviction < self.cooldown:
+            return []
+
+        monitor = self.manager.ram_monitor
+        status = monitor.get_status()
+        slope = monitor.sampler.available_slope(window=self.horizon * 3) if monitor.sampler else 0.0
+        reason = self.pressure(status, slope)
+        if reason is None:
+            return []
+
+        victims = await asyncio.to_thread(self.choose_victims, status.available_gb, slope)
+        if not victims:
+            logger.warning("Memory pressure (%s) but no local model to unload", reason)
+            return []
+
+        evicted = []
+        for name, freed in victims:
+            if await self.keep_alive.unload(name):
+                evicted.append(name)
+                logger.warning("Evicted %s (%.1fGB): %s", name, freed, reason)
+        if not evicted:
+            return []
+
+        self.evictions += len(evicted)
+        self._last_eviction = time.monotonic()
+        self.keep_alive.set_models([m for m in self.keep_alive.models if m not in evicted])
+        self.manager.ollama.invalidate()
+        if monitor.sampler:
+            monitor.sampler.sample_now()
+        for listener in self.listeners:
+            try:
+                listener(evicted)
+            except Exception as e:
+                logger.warning("Eviction listener failed: %s", e)
+        return evicted
+
+    def start(self):
+        """Watch memory in the background (requires a running event loop)"""
+        self._periodic.start()
+
+    async def stop(self):
+        await self._periodic.stop()
@@ -9,12 +9,20 @@ import sys
 import json
 import yaml
 import base64
-import requests
+import asyncio
+import aiohttp
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, List, AsyncIterator
 from datetime import datetime
 
 class GrokAPI:
+    # Connection pool sizing for the shared aiohttp session
+    POOL_LIMIT = 100
+    POOL_LIMIT_PER_HOST = 32
+    KEEPALIVE_TIMEOUT = 60
+    DNS_CACHE_TTL = 300
+    REQUEST_TIMEOUT = 300
+
     def __init__(self, api_key: Optional[str] = None, config_path: Optional[str] = None):
         """Initialize Grok API client with configuration"""
         self.api_key = api_key or os.getenv('XAI_API_KEY')
@@ -22,9 +30,13 @@ class GrokAPI:
             raise ValueError("XAI_API_KEY environment variable not set")
         
         # Load configuration
-        self.config_path = config_path or Path(__file__).parent / "grok_models_config.yaml"
+        self.config_path = config_path or Path(__file__).parent / "grok-models-config.yaml"
         self.config = self._load_config()
         self.base_url = self.config['api']['base_url']
+        self.aliases: Dict[str, str] = self.config.get('aliases') or {}
+        
+        # Pooled session, created lazily inside the running event loop
+        self.session: Optional[aiohttp.ClientSession] = None
         
     def _load_config(self) -> Dict:
         """Load model configuration from YAML"""
@@ -34,6 +46,61 @@ class GrokAPI:
         with open(self.config_path, 'r') as f:
             return yaml.safe_load(f)
     
+    async def __aenter__(self):
+        self._get_session()
+        return self
+        
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared pooled session, creating it on first use"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.POOL_LIMIT,
+                limit_per_host=self.POOL_LIMIT_PER_HOST,
+                keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=self.DNS_CACHE_TTL,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT),
+                headers=self._headers(),
+            )
+        return self.session
+    
+    async def close(self):
+        """Close the pooled session and release its connections"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    @property
+    def idle_timeout(self) -> float:
+        """Seconds an idle pooled connection is kept open"""
+        return self.KEEPALIVE_TIMEOUT
+
+    async def warm_up(self, connections: int = 1) -> int:
+        """Pre-open keep-alive connections to the API host; returns successful probes"""
+        session = self._get_session()
+
+        async def probe():
+            async with session.get(self.base_url) as response:
+                await response.read()
+
+        results = await asyncio.gather(*[probe() for _ in range(connections)], return_exceptions=True)
+        return sum(1 for result in results if not isinstance(result, BaseException))
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    def resolve_model(self, model_id: str) -> str:
+        """Resolve a model alias from grok-models-config.yaml to its model ID"""
+        return self.aliases.get(model_id, model_id)
+    
     def list_models(self, category: Optional[str] = None) -> List[Dict]:
         """List available models, optionally filtered by category"""
         models = []
@@ -47,9 +114,7 @@ class GrokAPI:
     
     def get_model_info(self, model_id: str) -> Optional[Dict]:
         """Get detailed information about a specific model"""
-        # Check aliases first
-        if model_id in self.config['aliases']:
-            model_id = self.config['aliases'][model_id]
+        model_id = self.resolve_model(model_id)
         
         for category in self.config['models'].values():
             for model in category:
@@ -57,47 +122,42 @@ class GrokAPI:
                     return model
         return None
     
-    def chat_completion(self, 
-                        model_id: str, 
-                        messages: List[Dict[str, str]], 
-                        **kwargs) -> Dict:
-        """Send chat completion request to Grok API"""
-        # Resolve aliases
-        if model_id in self.config['aliases']:
-            model_id = self.config['aliases'][model_id]
+    async def _post_json(self, endpoint: str, payload: Dict) -> Dict:
+        """POST a JSON payload on the pooled session and return the decoded body"""
+        session = self._get_session()
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        async with session.post(f"{self.base_url}/{endpoint}", json=payload) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"API Error: {response.status} - {error_text}")
+            
+            return await response.json()
+    
+    async def chat_completion(self, 
+                              model_id: str, 
+                              messages: List[Dict[str, str]], 
+                              **kwargs) -> Dict:
+        """Send chat completion request to Grok API"""
+        # Drop unset optional parameters (e.g. max_tokens=None)
+        params = {k: v for k, v in kwargs.items() if v is not None}
         
         payload = {
-            "model": model_id,
+            "model": self.resolve_model(model_id),
             "messages": messages,
-            **kwargs
+            **params
         }
         
-        response = requests.post(
-            f"{self.base_url}/chat/completions",
-            headers=headers,
-            json=payload
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"API Error: {response.status_code} - {response.text}")
-        
-        return response.json()
+        return await self._post_json("chat/completions", payload)
     
-    def vision_completion(self, 
-                         model_id: str, 
-                         messages: List[Dict], 
-                         image_path: Optional[str] = None,
-                         **kwargs) -> Dict:
+    async def vision_completion(self, 
+                                model_id: str, 
+                                messages: List[Dict], 
+                                image_path: Optional[str] = None,
+                                **kwargs) -> Dict:
         """Send vision completion request with image input"""
         if image_path:
-            # Encode image to base64
-            with open(image_path, 'rb') as img_file:
-                image_data = base64.b64encode(img_file.read()).decode('utf-8')
+            # Encode image to base64 off the event loop
+            image_data = await asyncio.to_thread(self._encode_image, image_path)
             
             # Add image to the last user message
             for msg in reversed(messages):
@@ -109,66 +169,49 @@ class GrokAPI:
                         ]
                     break
         
-        return self.chat_completion(model_id, messages, **kwargs)
+        return await self.chat_completion(model_id, messages, **kwargs)
+    
+    @staticmethod
+    def _encode_image(image_path: str) -> str:
+        with open(image_path, 'rb') as img_file:
+            return base64.b64encode(img_file.read()).decode('utf-8')
     
-    def image_generation(self, 
-                        prompt: str,
-                        model_id: str = "grok-2-image-1212",
-                        **kwargs) -> Dict:
+    async def image_generation(self, 
+                               prompt: str,
+                               model_id: str = "grok-2-image-1212",
+                               **kwargs) -> Dict:
         """Generate image using Grok image generation model"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
-            "model": model_id,
+            "model": self.resolve_model(model_id),
             "prompt": prompt,
             **kwargs
         }
         
-        response = requests.post(
-            f"{self.base_url}/images/generations",
-            headers=headers,
-            json=payload
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"API Error: {response.status_code} - {response.text}")
-        
-        return response.json()
+        return await self._post_json("images/generations", payload)
     
-    def stream_completion(self, 
-                         model_id: str, 
-                         messages: List[Dict[str, str]], 
-                         **kwargs) -> Any:
+    async def stream_completion(self, 
+                                model_id: str, 
+                                messages: List[Dict[str, str]], 
+                                **kwargs) -> AsyncIterator[Dict]:
         """Stream chat completion responses"""
-        # Resolve aliases
-        if model_id in self.config['aliases']:
-            model_id = self.config['aliases'][model_id]
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        params = {k: v for k, v in kwargs.items() if v is not None}
         
         payload = {
-            "model": model_id,
+            "model": self.resolve_model(model_id),
             "messages": messages,
-            "stream": True,
-            **kwargs
+            **params,
+            "stream": True
         }
         
-        response = requests.post(
-            f"{self.base_url}/chat/completions",
-            headers=headers,
-            json=payload,
-            stream=True
-        )
+        session = self._get_session()
         
-        for line in response.iter_lines():
-            if line:
-                line = line.decode('utf-8')
+        async with session.post(f"{self.base_url}/chat/completions", json=payload) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"API Error: {response.status} - {error_text}")
+            
+            async for line in response.content:
+                line = line.decode('utf-8').strip()
                 if line.startswith('data: '):
                     data = line[6:]
                     if data != '[DONE]':
@@ -190,8 +233,14 @@ def main():
     args = parser.parse_args()
     
     try:
-        api = GrokAPI()
-        
+        asyncio.run(_run_command(args))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+async def _run_command(args):
+    """Execute a CLI command on a single pooled client"""
+    async with GrokAPI() as api:
         if args.command == 'list':
             models = api.list_models(args.category)
             print(f"\n{'='*80}")
@@ -225,13 +274,13 @@ def main():
             messages = [{"role": "user", "content": args.prompt}]
             
             if args.stream:
-                for chunk in api.stream_completion(args.model, messages):
+                async for chunk in api.stream_completion(args.model, messages):
                     if 'choices' in chunk:
                         content = chunk['choices'][0].get('delta', {}).get('content', '')
                         print(content, end='', flush=True)
                 print()
             else:
-                response = api.chat_completion(args.model, messages)
+                response = await api.chat_completion(args.model, messages)
                 print(response['choices'][0]['message']['content'])
                 
         elif args.command == 'vision':
@@ -240,7 +289,7 @@ def main():
                 sys.exit(1)
             
             messages = [{"role": "user", "content": args.prompt}]
-            response = api.vision_completion(args.model, messages, args.image)
+            response = await api.vision_completion(args.model, messages, args.image)
             print(response['choices'][0]['message']['content'])
             
         elif args.command == 'image':
@@ -248,12 +297,8 @@ def main():
                 print("Error: --prompt required for image generation")
                 sys.exit(1)
             
-            response = api.image_generation(args.prompt)
+            response = await api.image_generation(args.prompt)
             print(f"Generated image URL: {response['data'][0]['url']}")
-            
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
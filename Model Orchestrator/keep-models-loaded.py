@@ -1,16 +1,18 @@
 #!/usr/bin/env python3
 """
 Keep Multiple Models Loaded in Memory
-Maximizes RAM usage by keeping models active with periodic pings
+Maximizes RAM usage by pinning models with Ollama keep_alive durations
 Prevents Ollama from unloading models to conserve memory
 """
 
+import asyncio
 import subprocess
-import time
-import threading
 from datetime import datetime
 from typing import List
 
+from ollama_state import OllamaState, format_loaded_table
+from keep_alive_service import KeepAliveService
+
 # Models to keep loaded (32GB+ tier configuration)
 TIER1_MODELS = [
     "deepseek-coder:1.3b",  # 776MB
@@ -34,46 +36,19 @@ TIER4_MODELS = [
 # All models to load (total ~42GB theoretical, but Ollama will manage)
 ALL_MODELS = TIER1_MODELS + TIER2_MODELS + TIER3_MODELS + TIER4_MODELS
 
-# Keep-alive interval in seconds
-KEEPALIVE_INTERVAL = 180  # 3 minutes
-
-model_threads = {}
-stop_event = threading.Event()
-
-
-def keep_model_alive(model: str):
-    """Keep a model loaded by periodically sending it requests"""
-    print(f"[{datetime.now().strftime('%H:%M:%S')}] 🔄 Starting keep-alive for {model}")
-
-    while not stop_event.is_set():
-        try:
-            # Send minimal request to keep model loaded
-            result = subprocess.run(
-                ["ollama", "run", model, "hi"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-
-            if result.returncode == 0:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Keep-alive: {model}")
-            else:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ Keep-alive warning: {model}")
+# Ollama keep_alive sent with each pin; re-pinned this long before expiry
+KEEP_ALIVE_SECONDS = 600  # 10 minutes
+REFRESH_MARGIN_SECONDS = 120
 
-        except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Keep-alive error for {model}: {e}")
+ollama_state = OllamaState()
 
-        # Wait for next keep-alive interval (unless stopping)
-        stop_event.wait(KEEPALIVE_INTERVAL)
 
-
-def check_loaded_models():
+def check_loaded_models() -> str:
     """Check which models are currently loaded"""
-    try:
-        result = subprocess.run(["ollama", "ps"], capture_output=True, text=True)
-        return result.stdout
-    except Exception as e:
-        return f"Error: {e}"
+    loaded = ollama_state.loaded()
+    if not ollama_state.reachable:
+        return "Error: Ollama API unreachable"
+    return format_loaded_table(loaded)
 
 
 def get_ram_usage():
@@ -105,54 +80,24 @@ def get_ram_usage():
         return 0, 0
 
 
-def main():
-    print("=" * 60)
-    print("Maximum RAM Utilization - Model Keep-Alive System")
-    print("=" * 60)
-    print()
-
-    print(f"Target models: {len(ALL_MODELS)}")
-    for i, model in enumerate(ALL_MODELS, 1):
-        print(f"  {i}. {model}")
-    print()
-
-    print(f"Keep-alive interval: {KEEPALIVE_INTERVAL}s")
-    print()
+async def run():
+    service = KeepAliveService(ALL_MODELS, keep_alive=KEEP_ALIVE_SECONDS, refresh_margin=REFRESH_MARGIN_SECONDS)
 
     initial_used, initial_free = get_ram_usage()
     print(f"Initial RAM: {initial_used:.2f} GB used, {initial_free:.2f} GB free")
     print()
 
+    # Load all models initially (one at a time to avoid overload)
     print("Starting initial model loading...")
-    print()
-
-    # Load all models initially (sequentially to avoid overload)
+    await service.tick()
     for model in ALL_MODELS:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] Loading {model}...")
-        try:
-            subprocess.run(
-                ["ollama", "run", model, "test"],
-                capture_output=True,
-                text=True,
-                timeout=60,
-            )
+        status = service.status.get(model, {})
+        if status.get("status") == "active":
             print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Loaded {model}")
-        except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Failed to load {model}: {e}")
-
-    print()
-    print("=" * 60)
-    print("Initial loading complete - Starting keep-alive threads")
-    print("=" * 60)
-    print()
-
-    # Start keep-alive threads for all models
-    for model in ALL_MODELS:
-        thread = threading.Thread(target=keep_model_alive, args=(model,), daemon=True)
-        thread.start()
-        model_threads[model] = thread
-        time.sleep(2)  # Stagger thread starts
+        else:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Failed to load {model}: {status.get('message')}")
 
+    service.start()
     print()
     print("=" * 60)
     print("Keep-alive system active - Models will remain loaded")
@@ -163,12 +108,13 @@ def main():
     try:
         iteration = 0
         while True:
+            await asyncio.sleep(60)  # Check every minute
             iteration += 1
             print(f"\n[Iteration {iteration}] Status at {datetime.now().strftime('%H:%M:%S')}")
             print("-" * 60)
 
             # Check loaded models
-            loaded = check_loaded_models()
+            loaded = await asyncio.to_thread(check_loaded_models)
             print("Loaded models:")
             print(loaded)
 
@@ -177,20 +123,28 @@ def main():
             print(f"RAM Usage: {used:.2f} GB used, {free:.2f} GB free")
             print(f"RAM Change: {used - initial_used:+.2f} GB since start")
             print(f"Utilization: {(used/36)*100:.1f}% of 36 GB total")
+    finally:
+        await service.stop()
 
-            # Wait before next check
-            time.sleep(60)  # Check every minute
 
-    except KeyboardInterrupt:
-        print("\n\nShutting down keep-alive system...")
-        stop_event.set()
+def main():
+    print("=" * 60)
+    print("Maximum RAM Utilization - Model Keep-Alive System")
+    print("=" * 60)
+    print()
 
-        # Wait for threads to finish
-        for model, thread in model_threads.items():
-            print(f"Stopping keep-alive for {model}...")
-            thread.join(timeout=5)
+    print(f"Target models: {len(ALL_MODELS)}")
+    for i, model in enumerate(ALL_MODELS, 1):
+        print(f"  {i}. {model}")
+    print()
+
+    print(f"keep_alive: {KEEP_ALIVE_SECONDS}s, refreshed {REFRESH_MARGIN_SECONDS}s before expiry")
+    print()
 
-        print("\nKeep-alive system stopped")
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n\nKeep-alive system stopped (models stay loaded until keep_alive expires)")
         print("=" * 60)
 
 
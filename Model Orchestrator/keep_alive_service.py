@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Async keep-alive for local Ollama models
+One asyncio task keeps a set of models resident. Models are pinned with
+zero-token /api/generate requests (no prompt) carrying a keep_alive
+duration: Ollama loads the model if needed and resets its unload timer
+without generating anything.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+
+from ollama_state import DEFAULT_OLLAMA_HOST, parse_timestamp
+from transports import Transport, get_transport
+from periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class KeepAliveService:
+    """
+    Pins models from a single task, refreshing only when needed
+
+    Each tick reads /api/ps once. A model is re-pinned only when it is not
+    loaded or Ollama will unload it within `refresh_margin` seconds, and it
+    has not served real traffic (see touch()) within that margin. Loads run
+    one at a time (`max_concurrent_loads`) so pins never pile onto the
+    server; the tick sleeps until the earliest refresh is due.
+    """
+
+    KEEP_ALIVE = 600.0
+    REFRESH_MARGIN = 120.0
+    MIN_INTERVAL = 5.0
+    MAX_INTERVAL = 60.0
+
+    def __init__(self,
+                 models: Iterable[str],
+                 base_url: Optional[str] = None,
+                 keep_alive: float = KEEP_ALIVE,
+                 refresh_margin: float = REFRESH_MARGIN,
+                 max_concurrent_loads: int = 1,
+                 status_file: Optional[str] = None,
+                 transport: Union[str, Transport, None] = None):
+        base_url = base_url or os.getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
+        if not base_url.startswith("http"):
+            base_url = f"http://{base_url}"
+        self.base_url = base_url.rstrip("/")
+        self.models: List[str] = list(models)
+        self.keep_alive = keep_alive
+        self.refresh_margin = refresh_margin
+        self.status_file = status_file
+        self.transport = transport if isinstance(transport, Transport) else get_transport(transport)
+
+        self.status: Dict[str, Dict] = {}
+        self.load_ms: Dict[str, float] = {}  # Wall time of the last pin that loaded the model
+        self.stats = {"ticks": 0, "pins": 0, "skipped": 0, "errors": 0, "tick_ms": 0.0}
+
+        self._touched: Dict[str, float] = {}
+        self._loads = asyncio.Semaphore(max_concurrent_loads)
+        self._next_tick = self.MIN_INTERVAL
+        self._periodic = PeriodicTask(self._tick, lambda: self._next_tick, "Keep-alive tick", run_first=True)
+
+    # ------------------------------------------------------------------------
+    # Model set and traffic
+    # ------------------------------------------------------------------------
+
+    def set_models(self, models: Iterable[str]):
+        """Replace the pinned set; dropped models expire on Ollama's own timer"""
+        self.models = list(models)
+        for model in list(self.status):
+            if model not in self.models:
+                del self.status[model]
+        self._write_status()
+
+    def touch(self, model: str):
+        """Note that real traffic just used a model, so it needs no refresh"""
+        self._touched[model] = time.monotonic()
+
+    # ------------------------------------------------------------------------
+    # Ollama requests
+    # ------------------------------------------------------------------------
+
+    async def _generate(self, model: str, keep_alive: float) -> Dict:
+        payload = {"model": model, "keep_alive": keep_alive}
+        response = await self.transport.request("POST", f"{self.base_url}/api/generate", json=payload)
+        if response.status != 200:
+            raise Exception(f"API Error {response.status}: {response.text()}")
+        return response.json()
+
+    async def pin(self, model: str, loaded: bool = False) -> bool:
+        """Load (if needed) and reset the model's unload timer without generating"""
+        async with self._loads:
+            start = time.perf_counter()
+            try:
+                await self._generate(model, self.keep_alive)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self._set_status(model, "error", str(e))
+                logger.warning("Keep-alive pin failed for %s: %s", model, e)
+                return False
+
+        if not loaded:
+            self.load_ms[model] = (time.perf_counter() - start) * 1000
+        self.stats["pins"] += 1
+        self._set_status(model, "active", "Pinned" if loaded else "Loaded and pinned")
+        return True
+
+    async def preload(self, model: str, keep_alive: float) -> bool:
+        """Load a model outside the pinned set; it expires after `keep_alive` unless used"""
+        async with self._loads:
+            start = time.perf_counter()
+            try:
+                await self._generate(model, keep_alive)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning("Preload failed for %s: %s", model, e)
+                return False
+        self.load_ms[model] = (time.perf_counter() - start) * 1000
+        return True
+
+    async def unload(self, model: str) -> bool:
+        """Ask Ollama to unload a model now (keep_alive 0)"""
+        try:
+            await self._generate(model, 0)
+        except Exception as e:
+            logger.warning("Unload failed for %s: %s", model, e)
+            return False
+        self._touched.pop(model, None)
+        return True
+
+    async def loaded_expiry(self) -> Dict[str, Optional[float]]:
+        """Loaded model -> epoch seconds Ollama will unload it (None = never)"""
+        response = await self.transport.request("GET", f"{self.base_url}/api/ps")
+        if response.status != 200:
+            raise Exception(f"API Error {response.status}: {response.text()}")
+        return {
+            entry["name"]: parse_timestamp(entry.get("expires_at"))
+            for entry in response.json().get("models", [])
+        }
+
+    # ------------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------------
+
+    async def tick(self) -> float:
+        """Refresh models that are due; returns seconds until the next tick"""
+        tick_start = time.perf_counter()
+        self.stats["ticks"] += 1
+
+        try:
+            expiry = await self.loaded_expiry()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning("Keep-alive could not read /api/ps: %s", e)
+            return self.MIN_INTERVAL
+
+        now = time.time()
+        recent = time.monotonic() - self.refresh_margin
+        next_due = self.MAX_INTERVAL
+
+        for model in list(self.models):
+            loaded = model in expiry
+            remaining = None
+            if loaded:
+                remaining = float("inf") if expiry[model] is None else expiry[model] - now
+
+            if loaded and (remaining > self.refresh_margin or self._touched.get(model, float("-inf")) > recent):
+                self.stats["skipped"] += 1
+                self._set_status(model, "active", "Resident")
+            elif await self.pin(model, loaded):
+                remaining = self.keep_alive
+            else:
+                continue
+            next_due = min(next_due, remaining - self.refresh_margin)
+
+        self.stats["tick_ms"] += (time.perf_counter() - tick_start) * 1000
+        self._write_status()
+        return max(self.MIN_INTERVAL, next_due)
+
+    async def _tick(self):
+        self._next_tick = await self.tick()
+
+    def start(self):
+        """Run in the background (requires a running event loop)"""
+        self._periodic.start()
+
+    async def stop(self):
+        """Stop refreshing and release the HTTP session; pinned models stay until they expire"""
+        await self._periodic.stop()
+        await self.transport.close()
+
+    # ------------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------------
+
+    def _set_status(self, model: str, status: str, message: str):
+        self.status[model] = {
+            "status": status,
+            "message": message,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def _write_status(self):
+        """Same format the keep-alive scripts always wrote (read by LocalModelManager)"""
+        if not self.status_file:
+            return
+        try:
+            with open(self.status_file, "w") as f:
+                json.dump(self.status, f, indent=2)
+        except OSError as e:
+            logger.warning("Could not write keep-alive status %s: %s", self.status_file, e)
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Streaming latency sketches for Model Orchestrator
+Mergeable log-bucketed quantile sketches (relative-error, DDSketch style) with
+O(1) updates and bounded memory, kept per (model, provider, task type) over
+rolling 1m/5m/1h windows for latency, time to first token and tokens/sec
+"""
+
+import math
+import time
+import threading
+from typing import Dict, Optional, Any, Iterable, Tuple
+
+# Metrics tracked per key
+METRICS = ("latency_ms", "ttft_ms", "tokens_per_second")
+
+# Quantiles reported for every metric
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """
+    Quantile sketch with bounded relative error
+
+    Values are counted in logarithmic buckets of ratio gamma, so any reported
+    quantile is within `relative_accuracy` of an actual recorded value.
+    Sketches with the same accuracy merge by adding bucket counts.
+    """
+
+    __slots__ = ("relative_accuracy", "_log_gamma", "counts", "zero_count", "count", "total", "min", "max")
+
+    # Values at or below this are counted as zero
+    MIN_VALUE = 1e-3
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(gamma)
+        self.counts: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """Record one value"""
+        if value > self.MIN_VALUE:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.counts[index] = self.counts.get(index, 0) + 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch (same accuracy) into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0 <= q <= 1); 0.0 when empty"""
+        if not self.count:
+            return 0.0
+
+        # Nearest-rank: the smallest value with at least q of the mass at or below it
+        rank = max(1, math.ceil(q * self.count))
+        seen = self.zero_count
+        if rank <= seen:
+            return 0.0
+
+        gamma = math.exp(self._log_gamma)
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                # Bucket midpoint, clamped to the observed range
+                value = 2 * gamma ** index / (gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, for merging across worker processes"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.counts = {int(index): count for index, count in data["counts"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+class WindowedSketch:
+    """
+    Rolling-window quantile sketch
+
+    Each window is a ring of time slots holding one sketch each; a slot is
+    reset when time moves past it. Querying a window merges its live slots.
+    """
+
+    # Window name -> (slot width in seconds, number of slots)
+    WINDOWS = {
+        "1m": (10, 6),
+        "5m": (60, 5),
+        "1h": (300, 12),
+    }
+
+    __slots__ = ("relative_accuracy", "_slots", "_slot_ids")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._slots = {name: [QuantileSketch(relative_accuracy) for _ in range(n)]
+                       for name, (_, n) in self.WINDOWS.items()}
+        self._slot_ids = {name: [-1] * n for name, (_, n) in self.WINDOWS.items()}
+
+    def add(self, value: float, timestamp: float):
+        for name, (width, n) in self.WINDOWS.items():
+            slot_id = int(timestamp // width)
+            i = slot_id % n
+            if self._slot_ids[name][i] != slot_id:
+                if slot_id < self._slot_ids[name][i]:
+                    continue  # older than the window; nothing to update
+                self._slots[name][i] = QuantileSketch(self.relative_accuracy)
+                self._slot_ids[name][i] = slot_id
+            self._slots[name][i].add(value)
+
+    def window(self, name: str, now: float) -> QuantileSketch:
+        """Merged sketch of the slots inside the window ending at `now`"""
+        width, n = self.WINDOWS[name]
+        current = int(now // width)
+        merged = QuantileSketch(self.relative_accuracy)
+        for slot_id, sketch in zip(self._slot_ids[name], self._slots[name]):
+            if current - n < slot_id <= current:
+                merged.merge(sketch)
+        return merged
+
+
+class LatencyTracker:
+    """
+    Windowed latency, TTFT and tokens/sec sketches per (model, provider, task type)
+
+    record() is O(1) per metric and window. Exports are plain dicts of sketch
+    data, so trackers in separate worker processes can be merged with
+    merge_exports() and summarized together.
+    """
+
+    DEFAULT_WINDOW = "5m"
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._lock = threading.Lock()
+        self._sketches: Dict[Tuple[str, str, str], Dict[str, WindowedSketch]] = {}
+
+    def record(self,
+               model_id: str,
+               provider: str,
+               task_type: Optional[str],
+               latency_ms: float,
+               ttft_ms: Optional[float] = None,
+               tokens_per_second: Optional[float] = None,
+               timestamp: Optional[float] = None):
+        """Record one request's latency and, when known, TTFT and throughput"""
+        timestamp = time.time() if timestamp is None else timestamp
+        key = (model_id, provider, task_type or "unspecified")
+        values = (latency_ms, ttft_ms, tokens_per_second)
+
+        with self._lock:
+            sketches = self._sketches.get(key)
+            if sketches is None:
+                sketches = self._sketches[key] = {
+                    metric: WindowedSketch(self.relative_accuracy) for metric in METRICS
+                }
+            for metric, value in zip(METRICS, values):
+                if value is not None:
+                    sketches[metric].add(value, timestamp)
+
+    def export(self,
+               window: str = DEFAULT_WINDOW,
+               group_by: str = "key",
+               now: Optional[float] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Serializable sketches for a window, grouped by "key" (model|provider|task_type),
+        "model", "provider" or "task_type"
+        """
+        now = time.time() if now is None else now
+        position = {"model": 0, "provider": 1, "task_type": 2}.get(group_by)
+
+        grouped: Dict[str, Dict[str, QuantileSketch]] = {}
+        with self._lock:
+            for key, sketches in self._sketches.items():
+                name = "|".join(key) if position is None else key[position]
+                target = grouped.setdefault(name, {})
+                for metric, windowed in sketches.items():
+                    sketch = windowed.window(window, now)
+                    if not sketch.count:
+                        continue
+                    if metric in target:
+                        target[metric].merge(sketch)
+                    else:
+                        target[metric] = sketch
+
+        return {
+            name: {metric: sketch.to_dict() for metric, sketch in metrics.items()}
+            for name, metrics in grouped.items() if metrics
+        }
+
+    @staticmethod
+    def merge_exports(exports: Iterable[Dict[str, Dict[str, Dict[str, Any]]]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Merge exports from several trackers (e.g. one per worker process)"""
+        merged: Dict[str, Dict[str, QuantileSketch]] = {}
+        for export in exports:
+            for name, metrics in export.items():
+                target = merged.setdefault(name, {})
+                for metric, data in metrics.items():
+                    sketch = QuantileSketch.from_dict(data)
+                    if metric in target:
+                        target[metric].merge(sketch)
+                    else:
+                        target[metric] = sketch
+
+        return {
+            name: {metric: sketch.to_dict() for metric, sketch in metrics.items()}
+            for name, metrics in merged.items()
+        }
+
+    @staticmethod
+    def summarize(export: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, float]]:
+        """Flatten an export into p50/p95/p99 and mean per metric"""
+        report = {}
+        for name, metrics in export.items():
+            row: Dict[str, float] = {}
+            for metric, data in metrics.items():
+                sketch = QuantileSketch.from_dict(data)
+                if metric == "latency_ms":
+                    row["requests"] = sketch.count
+                row[f"{metric}_mean"] = sketch.mean
+                for q in QUANTILES:
+                    row[f"{metric}_p{round(q * 100)}"] = sketch.quantile(q)
+            report[name] = row
+        return report
+
+    def report(self,
+               window: str = DEFAULT_WINDOW,
+               group_by: str = "key",
+               now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Percentile report for one window"""
+        return self.summarize(self.export(window, group_by, now))
+
+
+def derive_request_metrics(latency_ms: float,
+                           output_tokens: int,
+                           timings: Optional[Dict[str, float]] = None) -> Tuple[Optional[float], Optional[float]]:
+    """
+    (ttft_ms, tokens_per_second) for one request
+
+    Uses server-reported values when present (streaming ttft_ms, or Ollama's
+    load + prompt eval time and eval rate); otherwise tokens/sec falls back to
+    output tokens over end-to-end latency and TTFT is unknown.
+    """
+    timings = timings if isinstance(timings, dict) else {}
+
+    ttft_ms = timings.get("ttft_ms")
+    if ttft_ms is None and "prompt_eval_ms" in timings:
+        ttft_ms = timings.get("load_ms", 0.0) + timings["prompt_eval_ms"]
+
+    tokens_per_second = timings.get("tokens_per_second") or None
+    if tokens_per_second is None and output_tokens and latency_ms > 0:
+        tokens_per_second = output_tokens / (latency_ms / 1000)
+
+    return ttft_ms, tokens_per_second
@@ -9,6 +9,8 @@ import sys
 import importlib.util
 from typing import Dict, List
 
+from ollama_state import OllamaState
+
 # Import the orchestrator
 spec = importlib.util.spec_from_file_location(
     "model_orchestrator", 
@@ -38,23 +40,11 @@ def check_api_keys():
 
 def check_local_models():
     """Check which local models are actually installed via Ollama"""
+    state = OllamaState(ps_ttl=0)
     try:
-        import subprocess
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            installed_models = []
-            for line in lines:
-                if line.strip():
-                    parts = line.split()
-                    if parts:
-                        model_name = parts[0]
-                        installed_models.append(model_name)
-            return installed_models
-        else:
-            return []
-    except:
-        return []
+        return list(state.installed())
+    finally:
+        state.close()
 
 def format_task_scores(task_scores, top_n=3):
     """Format top task scores for display"""
@@ -5,14 +5,17 @@ Integrates RAM monitoring and keep-alive system with Model Orchestrator
 Provides intelligent local model selection and availability checking
 """
 
+import os
 import json
-import subprocess
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
 # Import RAM monitor
-from ram_monitor import RAMMonitor, RAMStatus
+from ram_monitor import RAMMonitor, RAMStatus, RAMSampler, RAM_SAMPLE_INTERVAL_ENV_VAR
+from ollama_state import OllamaState, LoadedModel
+from model_footprint import ModelFootprints
+from warm_set import DemandTracker, LoadTimes
 
 
 @dataclass
@@ -30,7 +33,7 @@ class LocalModelManager:
     Integrates with keep-alive system for optimal performance
     """
 
-    # Model size mapping (GB)
+    # Fallback sizes (GB) for models Ollama cannot describe
     MODEL_SIZES = {
         "deepseek-coder:1.3b": 0.776,
         "llama3.2:3b": 2.0,
@@ -59,52 +62,93 @@ class LocalModelManager:
     # Status file from keep-alive system
     STATUS_FILE = "/tmp/model-keepalive-status.json"
 
-    def __init__(self):
+    def __init__(self,
+                 ram_sample_interval: Optional[float] = None,
+                 ollama_state: Optional[OllamaState] = None,
+                 footprints: Optional[ModelFootprints] = None):
+        """
+        Args:
+            ram_sample_interval: Seconds between background RAM samples
+                (defaults to $ORCHESTRATOR_RAM_SAMPLE_INTERVAL, then 1s; 0 reads on demand)
+            ollama_state: Cached Ollama model lists (defaults to $OLLAMA_HOST);
+                on the event loop, lookups read its snapshot without blocking
+                and its start() keeps that snapshot fresh for routing
+            footprints: Model size discovery (defaults to the on-disk profile cache)
+        """
         self.ram_monitor = RAMMonitor()
+        self.ollama = ollama_state or OllamaState()
+        self.footprints = footprints or ModelFootprints(self.ollama)
+        # Routing decisions per model, for the demand-driven warm set
+        self.demand = DemandTracker()
+        # Measured cold-start time per model, for latency-aware routing
+        self.load_times = LoadTimes()
+        if ram_sample_interval is None:
+            ram_sample_interval = float(os.getenv(RAM_SAMPLE_INTERVAL_ENV_VAR, RAMSampler.INTERVAL))
+        if ram_sample_interval > 0:
+            self.ram_monitor.start_sampler(ram_sample_interval)
 
     def get_installed_models(self) -> List[str]:
         """Get list of installed Ollama models"""
-        try:
-            result = subprocess.run(
-                ["ollama", "list"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-            models = []
-            for line in result.stdout.strip().split('\n')[1:]:  # Skip header
-                if line.strip():
-                    parts = line.split()
-                    if parts:
-                        model_name = parts[0]
-                        models.append(model_name)
-
-            return models
-        except Exception:
-            return []
+        return list(self.ollama.installed())
 
     def get_loaded_models(self) -> List[str]:
-        """Get currently loaded models from ollama ps"""
-        try:
-            result = subprocess.run(
-                ["ollama", "ps"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-            models = []
-            for line in result.stdout.strip().split('\n')[1:]:  # Skip header
-                if line.strip():
-                    parts = line.split()
-                    if parts:
-                        model_name = parts[0]
-                        models.append(model_name)
-
-            return models
-        except Exception:
-            return []
+        """Get currently loaded models"""
+        return list(self.ollama.loaded())
+
+    def get_loaded_model_details(self) -> Dict[str, LoadedModel]:
+        """Loaded models with resident size, VRAM share and expiry"""
+        return self.ollama.loaded()
+
+    def get_model_size(self, model_name: str,
+                       num_ctx: Optional[int] = None,
+                       parallel: Optional[int] = None) -> Optional[float]:
+        """
+        Resident size of a model in GB
+
+        Uses the size Ollama reports for a loaded model, then the footprint
+        estimate for an installed one (at num_ctx/parallel or the server
+        defaults), then MODEL_SIZES. None if the model is unknown.
+        """
+        if num_ctx is None and parallel is None:
+            loaded = self.ollama.loaded().get(model_name)
+            if loaded is not None:
+                return loaded.size_gb
+        size = self.footprints.footprint_gb(model_name, num_ctx, parallel)
+        if size is not None:
+            return size
+        return self.MODEL_SIZES.get(model_name)
+
+    def get_model_sizes(self) -> Dict[str, float]:
+        """Sizes of all installed and known models"""
+        names = dict.fromkeys([*self.get_installed_models(), *self.MODEL_SIZES])
+        sizes = {name: self.get_model_size(name) for name in names}
+        return {name: size for name, size in sizes.items() if size is not None}
+
+    def is_resident(self, model_name: str) -> bool:
+        """True if Ollama currently has the model loaded"""
+        return model_name in self.ollama.loaded()
+
+    def record_load(self, model_name: str, load_ms: float):
+        """Record a request's load_duration; a cold load makes the model resident"""
+        if self.load_times.record(model_name, load_ms):
+            self.ollama.invalidate()
+
+    def expected_cold_start_ms(self, model_name: str) -> Optional[float]:
+        """
+        Load time a request to this model would pay now
+
+        0 for a resident model, else the measured (or size-estimated) load
+        time. None if the model is unknown.
+        """
+        if self.is_resident(model_name):
+            return 0.0
+        measured = self.load_times.measured(model_name)
+        if measured is not None:
+            return measured
+        size = self.get_model_size(model_name)
+        if size is None:
+            return None
+        return self.load_times.expected_ms(model_name, size)
 
     def get_keep_alive_status(self) -> Dict:
         """Get status from keep-alive system"""
@@ -116,7 +160,8 @@ class LocalModelManager:
 
     def get_model_info(self, model_name: str) -> Optional[LocalModel]:
         """Get detailed information about a specific model"""
-        if model_name not in self.MODEL_SIZES:
+        size = self.get_model_size(model_name)
+        if size is None:
             return None
 
         loaded_models = self.get_loaded_models()
@@ -124,7 +169,7 @@ class LocalModelManager:
 
         return LocalModel(
             name=model_name,
-            size_gb=self.MODEL_SIZES[model_name],
+            size_gb=size,
             is_loaded=model_name in loaded_models,
             is_keep_alive=model_name in keep_alive_status and
                           keep_alive_status[model_name].get("status") == "active"
@@ -132,10 +177,10 @@ class LocalModelManager:
 
     def can_load_model(self, model_name: str) -> Tuple[bool, str]:
         """Check if a model can be loaded given current RAM"""
-        if model_name not in self.MODEL_SIZES:
+        model_size = self.get_model_size(model_name)
+        if model_size is None:
             return False, f"Unknown model: {model_name}"
 
-        model_size = self.MODEL_SIZES[model_name]
         can_load, reason = self.ram_monitor.can_load_model(model_size)
 
         return can_load, reason
@@ -143,7 +188,7 @@ class LocalModelManager:
     def select_best_model(self, task_type: str, candidates: List[str]) -> Optional[str]:
         """
         Select best available model for task from candidates
-        Prioritizes: keep-alive models > loaded models > installable models
+        Prioritizes: loadable > lowest expected cold start (0 if resident) > smallest
 
         Args:
             task_type: Type of task (code, docs, reasoning, etc.)
@@ -152,46 +197,23 @@ class LocalModelManager:
         Returns:
             Best model name or None
         """
-        keep_alive_status = self.get_keep_alive_status()
-        loaded_models = set(self.get_loaded_models())
-
-        # Score models
-        scored_models = []
-        for model in candidates:
-            if model not in self.MODEL_SIZES:
+        ranked = []
+        for order, model in enumerate(candidates):
+            size = self.get_model_size(model)
+            if size is None:
                 continue
 
-            score = 0
+            cold_start_ms = self.expected_cold_start_ms(model)
+            # A resident model needs no further RAM
+            can_load = cold_start_ms == 0 or self.can_load_model(model)[0]
+            ranked.append((not can_load, cold_start_ms, size, order, model))
 
-            # Highest priority: keep-alive and active
-            if (model in keep_alive_status and
-                keep_alive_status[model].get("status") == "active"):
-                score += 1000
-
-            # Medium priority: already loaded
-            elif model in loaded_models:
-                score += 500
-
-            # Check if can load
-            can_load, _ = self.can_load_model(model)
-            if can_load:
-                score += 100
-
-            # Prefer smaller models for faster response (efficiency bonus)
-            size = self.MODEL_SIZES[model]
-            if size < 5:
-                score += 50
-            elif size < 10:
-                score += 25
-
-            scored_models.append((model, score))
-
-        if not scored_models:
+        if not ranked:
             return None
 
-        # Return highest scored model
-        scored_models.sort(key=lambda x: x[1], reverse=True)
-        return scored_models[0][0]
+        best = min(ranked)[-1]
+        self.demand.record(best)
+        return best
 
     def get_recommended_models_for_task(self, task_type: str) -> List[str]:
         """Get recommended models for specific task type"""
@@ -228,9 +250,10 @@ class LocalModelManager:
 
     def get_status_summary(self) -> Dict:
         """Get comprehensive status summary"""
-        ram_status = self.ram_monitor.get_current_status()
+        ram_status = self.ram_monitor.get_status()
         keep_alive_status = self.get_keep_alive_status()
-        loaded_models = self.get_loaded_models()
+        loaded_details = self.get_loaded_model_details()
+        loaded_models = list(loaded_details)
         installed_models = self.get_installed_models()
         capacity = self.ram_monitor.get_model_capacity()
 
@@ -246,6 +269,7 @@ class LocalModelManager:
             },
             "keep_alive_models": list(keep_alive_status.keys()),
             "loaded_models": loaded_models,
+            "loaded_details": {name: model.to_dict() for name, model in loaded_details.items()},
             "capacity": {
                 "tier": capacity.tier.value,
                 "max_concurrent_models": capacity.max_concurrent_models,
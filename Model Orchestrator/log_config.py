@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Queued logging for Model Orchestrator
+Code on the request path only enqueues LogRecords; a QueueListener thread
+formats them (plain text or JSON lines) and does the I/O. Library modules do
+not configure logging at import - entry points call configure_logging().
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO, Union
+
+# Root log level (default INFO) and "text" or "json" line format
+LOG_LEVEL_ENV_VAR = "ORCHESTRATOR_LOG_LEVEL"
+LOG_FORMAT_ENV_VAR = "ORCHESTRATOR_LOG_FORMAT"
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not caller-supplied `extra` fields
+_RECORD_FIELDS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves all formatting to the listener thread
+
+    The stock handler merges args into the message before enqueueing; records
+    here stay in-process, so they are passed through untouched and %-style
+    args are only interpolated on the listener. Log immutable values.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DeferredQueueHandler] = None
+
+
+def configure_logging(level: Optional[Union[int, str]] = None,
+                      json_format: Optional[bool] = None,
+                      stream: Optional[TextIO] = None) -> QueueListener:
+    """
+    Route all logging through a queue to a background writer
+
+    Args:
+        level: Root level (defaults to $ORCHESTRATOR_LOG_LEVEL, then INFO)
+        json_format: JSON lines instead of text (defaults to $ORCHESTRATOR_LOG_FORMAT == "json")
+        stream: Output stream (defaults to stderr)
+
+    Calling again replaces the previous configuration.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    level = level or os.getenv(LOG_LEVEL_ENV_VAR, "INFO")
+    if json_format is None:
+        json_format = os.getenv(LOG_FORMAT_ENV_VAR, "text") == "json"
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = DeferredQueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Write out queued records and stop the listener thread"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        atexit.unregister(stop_logging)
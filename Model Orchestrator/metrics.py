@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+OpenMetrics exporter for Model Orchestrator
+Counters, gauges and histograms with pre-resolved label children, a text
+renderer in the OpenMetrics exposition format and an optional stdlib HTTP
+endpoint for scraping
+"""
+
+import math
+import logging
+import threading
+from bisect import bisect_left
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# (name, labels, value) samples returned by scrape-time collectors
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+# ============================================================================
+# Metric Types
+# ============================================================================
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    """
+    Metric family with a fixed label set
+
+    labels(...) returns a child that callers can keep and update directly; a
+    child update is a single attribute add with no allocation.
+    """
+
+    TYPE = "unknown"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Child for one label combination (created once, then cached)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} {self.TYPE}", f"# HELP {self.name} {self.documentation}"]
+        return lines + self.samples()
+
+
+class Counter(Metric):
+    """Monotonic counter; exposed with the OpenMetrics _total suffix"""
+
+    TYPE = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._children.items())
+        ]
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    TYPE = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._children.items())
+        ]
+
+
+class Histogram(Metric):
+    """Cumulative histogram over fixed bucket bounds"""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, values, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_count{labels} {child.count}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        return lines
+
+
+# ============================================================================
+# Registry and Endpoint
+# ============================================================================
+
+class MetricsRegistry:
+    """
+    Collection of metric families plus scrape-time collectors
+
+    Collectors are callables returning (name, labels, value) gauge samples;
+    they run only when the registry is rendered, never on the request path.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Tuple[str, str, Callable[[], Iterable[Sample]]]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} already registered with a different type or labels")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, name: str, documentation: str, collect: Callable[[], Iterable[Sample]]):
+        """Add a gauge family whose samples are produced by `collect` at scrape time"""
+        self._collectors.append((name, documentation, collect))
+
+    def render(self) -> str:
+        """Full exposition in OpenMetrics text format"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+
+        for name, documentation, collect in self._collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", name, e)
+                continue
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"# HELP {name} {documentation}")
+            for sample_name, labels, value in samples:
+                names, values = tuple(labels), tuple(labels.values())
+                lines.append(f"{sample_name}{_format_labels(names, values)} {_format_value(float(value))}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Background stdlib HTTP server exposing a registry at /metrics"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+            self._thread.start()
+            logger.info("✓ Metrics endpoint on http://%s:%d/metrics", self._server.server_address[0], self.port)
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+# ============================================================================
+# Orchestrator Metrics
+# ============================================================================
+
+class OrchestratorMetrics:
+    """
+    Standard orchestrator metric families
+
+    Label children are cached per (model, provider), so recording a request
+    is a handful of float adds and one bisect.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+
+        self.requests = r.counter("orchestrator_requests", "Model calls by outcome",
+                                  ("model", "provider", "outcome"))
+        self.latency = r.histogram("orchestrator_request_latency_seconds", "End-to-end model call latency",
+                                   ("model", "provider"))
+        self.tokens = r.counter("orchestrator_tokens", "Tokens processed", ("model", "provider", "direction"))
+        self.cost = r.counter("orchestrator_cost_dollars", "Estimated spend", ("model", "provider"))
+        self.retries = r.counter("orchestrator_retries", "Retried provider attempts", ("model", "provider"))
+        self.pool_wait = r.counter("orchestrator_pool_wait_seconds", "Time spent waiting for a pooled connection",
+                                   ("model", "provider"))
+        self._children: Dict[Tuple[str, str], Tuple] = {}
+
+    def _resolve(self, model_id: str, provider: str) -> Tuple:
+        key = (model_id, provider)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                self.requests.labels(model_id, provider, "success"),
+                self.requests.labels(model_id, provider, "error"),
+                self.latency.labels(model_id, provider),
+                self.tokens.labels(model_id, provider, "input"),
+                self.tokens.labels(model_id, provider, "output"),
+                self.cost.labels(model_id, provider),
+                self.retries.labels(model_id, provider),
+                self.pool_wait.labels(model_id, provider),
+            )
+        return children
+
+    def observe_request(self,
+                        model_id: str,
+                        provider: str,
+                        input_tokens: int,
+                        output_tokens: int,
+                        cost: float,
+                        latency_ms: float,
+                        success: bool = True,
+                        timings: Optional[Dict[str, float]] = None):
+        """Record one completed model call"""
+        ok, failed, latency, tokens_in, tokens_out, spend, retries, pool_wait = self._resolve(model_id, provider)
+        (ok if success else failed).inc()
+        latency.observe(latency_ms / 1000)
+        tokens_in.inc(input_tokens)
+        tokens_out.inc(output_tokens)
+        spend.inc(cost)
+        if timings:
+            attempts = timings.get("attempts", 1)
+            if attempts > 1:
+                retries.inc(attempts - 1)
+            queue_ms = timings.get("queue_ms")
+            if queue_ms:
+                pool_wait.inc(queue_ms / 1000)
+
+    def observe_error(self, model_id: str, provider: str):
+        """Record a call that raised before producing a response"""
+        self._resolve(model_id, provider)[1].inc()
+
+    def watch_queue(self, name: str, depth: Callable[[], int]):
+        """Export a queue's depth, read at scrape time"""
+        self.registry.register_collector(
+            f"orchestrator_{name}_queue_depth", f"Items waiting in the {name} queue",
+            lambda: [(f"orchestrator_{name}_queue_depth", {}, depth())],
+        )
+
+    def watch_local_models(self, manager: Any):
+        """Export RAM and loaded/size state from a LocalModelManager at scrape time"""
+        def collect_ram() -> List[Sample]:
+            status = manager.ram_monitor.get_status()
+            gib = 1024 ** 3
+            return [
+                ("local_ram_bytes", {"state": "total"}, status.total_gb * gib),
+                ("local_ram_bytes", {"state": "used"}, status.used_gb * gib),
+                ("local_ram_bytes", {"state": "available"}, status.available_gb * gib),
+            ]
+
+        def collect_models() -> List[Sample]:
+            loaded = set(manager.get_loaded_models())
+            return [
+                ("local_model_loaded", {"model": model}, 1.0 if model in loaded else 0.0)
+                for model in manager.get_model_sizes()
+            ]
+
+        def collect_sizes() -> List[Sample]:
+            return [
+                ("local_model_size_bytes", {"model": model}, size_gb * 1024 ** 3)
+                for model, size_gb in manager.get_model_sizes().items()
+            ]
+
+        self.registry.register_collector("local_ram_bytes", "System RAM by state", collect_ram)
+        self.registry.register_collector("local_model_loaded", "1 if the local model is loaded in Ollama",
+                                         collect_models)
+        self.registry.register_collector("local_model_size_bytes", "Approximate local model memory footprint",
+                                         collect_sizes)
+
+    def watch_admission(self, controller: Any):
+        """Export per-model admission queue depth, slots in use and expected wait at scrape time"""
+        def collect(name: str, read: Callable) -> Callable[[], List[Sample]]:
+            return lambda: [(name, {"model": model}, read(gate)) for model, gate in list(controller.gates.items())]
+
+        self.registry.register_collector(
+            "local_admission_queue_depth", "Requests waiting for a local model slot",
+            collect("local_admission_queue_depth", lambda gate: gate.queue_depth))
+        self.registry.register_collector(
+            "local_admission_in_flight", "Local model slots in use",
+            collect("local_admission_in_flight", lambda gate: gate.in_flight))
+        self.registry.register_collector(
+            "local_admission_expected_wait_seconds", "Expected wait for a new request to a local model",
+            collect("local_admission_expected_wait_seconds", lambda gate: gate.expected_wait_ms() / 1000))
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464) -> MetricsServer:
+        """Start the /metrics HTTP endpoint in a background thread"""
+        server = MetricsServer(self.registry, host, port)
+        server.start()
+        return server
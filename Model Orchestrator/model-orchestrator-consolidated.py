@@ -22,18 +22,24 @@ import asyncio
 import logging
 import re
 import time
+import contextlib
+from array import array
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple, Union, Protocol
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Tuple, Union, Protocol, NamedTuple
 from enum import Enum
-from datetime import datetime
 from abc import ABC, abstractmethod
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from usage_store import UsageStore, UsageAggregates
+from usage_log import open_usage_log
+from latency_sketch import LatencyTracker, derive_request_metrics
+from metrics import OrchestratorMetrics, MetricsRegistry
+from tracing import Tracer, open_tracer
+from profiling import stage_timers, configure_profiling
+from log_config import configure_logging
+from admission import AdmissionController, AdmissionRejected
+from api_clients import APIResponse
+from transports import timing_report
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,6 +66,12 @@ class TaskType(Enum):
     DATA_ANALYSIS = "data_analysis"
 
 
+# Fixed ordinal per task type, used to index ModelCapabilities.task_affinity
+TASK_TYPES: Tuple[TaskType, ...] = tuple(TaskType)
+for _ordinal, _task_type in enumerate(TASK_TYPES):
+    _task_type.ordinal = _ordinal
+
+
 class ModelProvider(Enum):
     """Available model providers"""
     ANTHROPIC = "anthropic"
@@ -74,39 +86,109 @@ class ModelProvider(Enum):
     META = "meta"
 
 
-@dataclass
 class ModelCapabilities:
-    """Model capability profile with performance metrics"""
-    provider: ModelProvider
-    model_id: str
-    context_window: int
-    supports_vision: bool = False
-    supports_function_calling: bool = False
-    supports_streaming: bool = True
-    supports_reasoning: bool = False
-    code_specialized: bool = False
-
-    # Performance metrics (0-1 scale)
-    speed: float = 0.5
-    accuracy: float = 0.5
-    creativity: float = 0.5
-    reasoning_depth: float = 0.5
-
-    # Cost per million tokens
-    input_cost: float = 0.0
-    output_cost: float = 0.0
-
-    # Task affinity scores (0-1 scale)
-    task_scores: Dict[TaskType, float] = field(default_factory=dict)
-
-    # Availability
-    rate_limit: Optional[str] = None
-    available: bool = True
-
-
-@dataclass
-class TaskRequirements:
-    """Requirements for a specific task"""
+    """
+    Immutable model capability record
+
+    Slotted, with task affinities held in a fixed-length float array indexed by
+    TaskType.ordinal. Only `available` (runtime status) may change after creation.
+    """
+
+    __slots__ = (
+        "provider", "model_id", "context_window",
+        "supports_vision", "supports_function_calling", "supports_streaming",
+        "supports_reasoning", "code_specialized",
+        "speed", "accuracy", "creativity", "reasoning_depth",
+        "input_cost", "output_cost",
+        "task_affinity", "task_mask",
+        "rate_limit", "available",
+    )
+    _MUTABLE = frozenset({"available"})
+
+    # Affinity used for task types the model has no score for
+    DEFAULT_AFFINITY = 0.5
+
+    def __init__(
+        self,
+        provider: ModelProvider,
+        model_id: str,
+        context_window: int,
+        supports_vision: bool = False,
+        supports_function_calling: bool = False,
+        supports_streaming: bool = True,
+        supports_reasoning: bool = False,
+        code_specialized: bool = False,
+        # Performance metrics (0-1 scale)
+        speed: float = 0.5,
+        accuracy: float = 0.5,
+        creativity: float = 0.5,
+        reasoning_depth: float = 0.5,
+        # Cost per million tokens
+        input_cost: float = 0.0,
+        output_cost: float = 0.0,
+        # Task affinity scores (0-1 scale)
+        task_scores: Optional[Dict[TaskType, float]] = None,
+        # Availability
+        rate_limit: Optional[str] = None,
+        available: bool = True,
+    ):
+        self.provider = provider
+        self.model_id = model_id
+        self.context_window = context_window
+        self.supports_vision = supports_vision
+        self.supports_function_calling = supports_function_calling
+        self.supports_streaming = supports_streaming
+        self.supports_reasoning = supports_reasoning
+        self.code_specialized = code_specialized
+        self.speed = speed
+        self.accuracy = accuracy
+        self.creativity = creativity
+        self.reasoning_depth = reasoning_depth
+        self.input_cost = input_cost
+        self.output_cost = output_cost
+
+        affinity = array('d', [self.DEFAULT_AFFINITY]) * len(TASK_TYPES)
+        mask = 0
+        for task_type, score in (task_scores or {}).items():
+            affinity[task_type.ordinal] = score
+            mask |= 1 << task_type.ordinal
+        self.task_affinity = affinity
+        self.task_mask = mask  # bit per TaskType ordinal that has an explicit score
+
+        self.rate_limit = rate_limit
+        self.available = available
+
+    def __setattr__(self, name, value):
+        if name not in self._MUTABLE and hasattr(self, name):
+            raise AttributeError(f"ModelCapabilities is immutable: cannot set {name!r}")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"ModelCapabilities is immutable: cannot delete {name!r}")
+
+    @property
+    def task_scores(self) -> Dict[TaskType, float]:
+        """Explicit task affinity scores (a fresh dict; the record itself is unchanged)"""
+        return {
+            task_type: self.task_affinity[task_type.ordinal]
+            for task_type in TASK_TYPES
+            if self.task_mask >> task_type.ordinal & 1
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, ModelCapabilities):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"ModelCapabilities(provider={self.provider}, model_id={self.model_id!r}, "
+                f"context_window={self.context_window}, available={self.available})")
+
+
+class TaskRequirements(NamedTuple):
+    """Requirements for a specific task (lightweight immutable struct)"""
     task_type: TaskType
     min_context_window: int = 4096
     requires_vision: bool = False
@@ -114,22 +196,10 @@ class TaskRequirements:
     requires_reasoning: bool = False
     max_latency_ms: Optional[int] = None
     max_cost: Optional[float] = None
-    preferred_providers: List[ModelProvider] = field(default_factory=list)
+    preferred_providers: Tuple[ModelProvider, ...] = ()
     quality_threshold: float = 0.7
 
 
-@dataclass
-class APIResponse:
-    """Standardized API response format"""
-    content: str
-    model: str
-    provider: str
-    usage: Dict[str, int]  # input_tokens, output_tokens
-    latency_ms: int
-    raw_response: Optional[Dict] = None
-    error: Optional[str] = None
-
-
 # ============================================================================
 # Protocols and Abstract Base Classes
 # ============================================================================
@@ -532,9 +602,9 @@ class TaskAnalyzer:
         estimated_context = max(4096, prompt_length * 10)
 
         # Check for specific requirements
-        requires_vision = any(word in prompt_lower for word in ["image", "picture", "screenshot", "visual"])
-        requires_reasoning = any(word in prompt_lower for word in ["think", "reason", "explain why", "analyze"])
-        requires_function = any(word in prompt_lower for word in ["function", "api", "tool", "call"])
+        requires_vision = any(word in prompt_lower for word in ("image", "picture", "screenshot", "visual"))
+        requires_reasoning = any(word in prompt_lower for word in ("think", "reason", "explain why", "analyze"))
+        requires_function = any(word in prompt_lower for word in ("function", "api", "tool", "call"))
 
         return TaskRequirements(
             task_type=detected_type,
@@ -565,7 +635,7 @@ class ModelScorer:
             return 0.0
 
         # Task affinity score (40% weight)
-        task_score = model.task_scores.get(requirements.task_type, 0.5)
+        task_score = model.task_affinity[requirements.task_type.ordinal]
         score += task_score * 0.4
 
         # Performance score (30% weight)
@@ -602,13 +672,24 @@ class ModelOrchestrator:
     - Comprehensive error handling
     """
 
+    # Latency each strategy tolerates before a local model's cold start or queue wait outweighs it
+    LATENCY_BUDGET_MS = {
+        "speed_priority": 2000.0,
+        "balanced": 10000.0,
+        "quality_first": 30000.0,
+        "cost_optimize": 30000.0,
+    }
+
     def __init__(
         self,
         registry: Optional[ModelRegistry] = None,
         guide: Optional[ModelGuideProtocol] = None,
         analyzer: Optional[TaskAnalyzer] = None,
         scorer: Optional[ModelScorer] = None,
-        api_client_factory: Optional[callable] = None
+        api_client_factory: Optional[callable] = None,
+        usage_log_path: Optional[str] = None,
+        tracer: Optional[Tracer] = None,
+        local_model_manager: Optional[Any] = None
     ):
         """
         Initialize orchestrator with dependency injection
@@ -619,16 +700,42 @@ class ModelOrchestrator:
             analyzer: Task analyzer (defaults to TaskAnalyzer())
             scorer: Model scorer (defaults to ModelScorer())
             api_client_factory: Factory function for creating API clients
+            usage_log_path: SQLite usage log to replay and append to
+                (defaults to $ORCHESTRATOR_USAGE_LOG; in-memory only if unset)
+            tracer: Span tracer (defaults to $ORCHESTRATOR_TRACE_FILE; disabled if unset)
+            local_model_manager: LocalModelManager whose residency and measured
+                load times turn into a cold-start penalty for local models
         """
         self.registry = registry or ModelRegistry()
         self.guide = guide or ModelGuideParser()
         self.analyzer = analyzer or TaskAnalyzer()
         self.scorer = scorer or ModelScorer()
         self.api_client_factory = api_client_factory or self._default_client_factory
+        self.local_model_manager = local_model_manager
 
         self.api_clients: Dict[str, Any] = {}
-        self.cost_tracker: Dict[str, float] = {}
-        self.performance_history: List[Dict] = []
+        self.usage_store = UsageStore()
+        self.usage_aggregates = UsageAggregates()
+        # Per-model spend, maintained by usage_aggregates under its lock
+        self.cost_tracker: Dict[str, float] = self.usage_aggregates.cost_by_model
+        self.latency_tracker = LatencyTracker()
+        self.timing_totals: Dict[str, Dict[str, float]] = {}
+        self.connection_warmer = None
+        self.keep_alive = None
+        self.warm_set = None
+        self.eviction = None
+        self.preloader = None
+        self.admission = None
+        self.metrics: Optional[OrchestratorMetrics] = None
+        self.metrics_server = None
+        self.tracer = tracer if tracer is not None else open_tracer()
+        configure_profiling()
+
+        self.usage_log = open_usage_log(usage_log_path)
+        if self.usage_log is not None:
+            self.usage_log.replay_into(self.usage_aggregates, self.usage_store, latency=self.latency_tracker)
+            logger.info(f"✓ Usage log replayed: {self.usage_aggregates.total.requests} requests "
+                        f"from {self.usage_log.path}")
 
         self._initialize_clients()
 
@@ -661,15 +768,227 @@ class ModelOrchestrator:
                 except Exception as e:
                     logger.warning(f"Failed to initialize {provider} client: {e}")
 
-        # Local models client
+        # Local models client - native Ollama unless an OpenAI-compatible server is configured
         try:
-            client = self.api_client_factory('local')
+            local_provider = 'local' if os.getenv('CUSTOM_API_URL') else 'ollama'
+            client = self.api_client_factory(local_provider)
             if client:
                 self.api_clients['local'] = client
                 logger.info("✓ Local model client initialized")
         except Exception as e:
             logger.warning(f"Failed to initialize local client: {e}")
 
+    async def warm_up(
+        self,
+        connections_per_host: int = 2,
+        keep_warm: bool = True,
+        refresh_interval: Optional[float] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Optional startup phase: pre-open keep-alive connections to every configured provider
+
+        Args:
+            connections_per_host: Connections to open and hold per provider
+            keep_warm: Refresh connections in the background before they idle out
+            refresh_interval: Seconds between refreshes (defaults to 75% of idle timeout)
+
+        Returns:
+            Per-provider dns_ms, connect_ms and connections opened
+        """
+        from connection_warmer import ConnectionWarmer
+
+        await self.stop_warming()
+        self.connection_warmer = ConnectionWarmer(
+            self.api_clients, connections_per_host, refresh_interval
+        )
+        stats = await self.connection_warmer.warm()
+        if keep_warm:
+            self.connection_warmer.start()
+        return stats
+
+    async def stop_warming(self):
+        """Stop background connection refreshing"""
+        if self.connection_warmer:
+            await self.connection_warmer.stop()
+            self.connection_warmer = None
+
+    def enable_keep_alive(self, keep_alive: Any) -> Any:
+        """
+        Keep local models resident with a KeepAliveService (requires a running event loop)
+
+        Local requests are reported to it (touch()), so models already kept
+        warm by real traffic are not re-pinned.
+        """
+        if self.keep_alive is not keep_alive:
+            self.keep_alive = keep_alive
+            keep_alive.start()
+        return keep_alive
+
+    def enable_warm_set(self, keep_alive: Any, **kwargs) -> Any:
+        """
+        Optional demand-driven keep-alive set (requires a running event loop)
+
+        Args:
+            keep_alive: KeepAliveService whose model set is managed (usually
+                the one given to enable_keep_alive())
+            **kwargs: WarmSetPlanner settings (budget_gb, interval, hysteresis, ...)
+
+        Returns:
+            The running WarmSetPlanner
+        """
+        from warm_set import WarmSetPlanner
+
+        if self.local_model_manager is None:
+            raise ValueError("Warm set planning requires a local_model_manager")
+        if self.warm_set is None:
+            self.warm_set = WarmSetPlanner(self.local_model_manager, keep_alive, **kwargs)
+            self.warm_set.start()
+        return self.warm_set
+
+    def enable_eviction(self, keep_alive: Any, **kwargs) -> Any:
+        """
+        Optional memory-pressure eviction of local models (requires a running event loop)
+
+        Args:
+            keep_alive: KeepAliveService used to unload and unpin
+            **kwargs: EvictionController settings (min_available_gb, interval, ...)
+
+        Returns:
+            The running EvictionController
+        """
+        from eviction import EvictionController
+
+        if self.local_model_manager is None:
+            raise ValueError("Eviction requires a local_model_manager")
+        if self.eviction is None:
+            self.eviction = EvictionController(self.local_model_manager, keep_alive, **kwargs)
+            self.eviction.listeners.append(self._on_evict)
+            self.eviction.start()
+        return self.eviction
+
+    def _on_evict(self, models: List[str]):
+        """Evicted models are no longer preloads the preloader should manage"""
+        if self.preloader is not None:
+            for model in models:
+                self.preloader.preloaded.pop(model, None)
+
+    def enable_preloading(self, keep_alive: Any, **kwargs) -> Any:
+        """
+        Optional predictive preloading of local models (requires a running event loop)
+
+        Args:
+            keep_alive: KeepAliveService used to load and unload models
+            **kwargs: Preloader settings (interval, window, horizon, ...)
+
+        Returns:
+            The running Preloader; announce queued work with its enqueue()/dequeue()
+        """
+        from preloader import Preloader
+
+        if self.local_model_manager is None:
+            raise ValueError("Preloading requires a local_model_manager")
+        if self.preloader is None:
+            self.preloader = Preloader(self.local_model_manager, keep_alive,
+                                       route=self.local_model_for_task, **kwargs)
+            self.preloader.start()
+        return self.preloader
+
+    def local_model_for_task(self, task: str) -> Optional[str]:
+        """Ollama name of the local model scoring best for a task type, ignoring residency"""
+        try:
+            requirements = TaskRequirements(task_type=TaskType(task))
+        except ValueError:
+            return None
+        scores = {
+            model.model_id: self.scorer.score(model, requirements)
+            for model in self.registry.models.values()
+            if model.available and model.provider == ModelProvider.LOCAL
+        }
+        if not scores:
+            return None
+        best = max(scores, key=scores.get)
+        return best if scores[best] > 0 else None
+
+    def enable_admission(
+        self,
+        slots: Optional[int] = None,
+        max_queue: int = AdmissionController.MAX_QUEUE,
+        max_wait_ms: Optional[float] = AdmissionController.MAX_WAIT_MS,
+        model_slots: Optional[Dict[str, int]] = None
+    ) -> AdmissionController:
+        """
+        Optional per-model admission control for local models
+
+        Args:
+            slots: Parallel requests per model (defaults to $OLLAMA_NUM_PARALLEL, then 1)
+            max_queue: Requests allowed to wait per model
+            max_wait_ms: Reject (and spill) when the expected wait exceeds this
+            model_slots: Per-model overrides of `slots`
+        """
+        if self.admission is None:
+            self.admission = AdmissionController(slots, max_queue, max_wait_ms, model_slots)
+            if self.metrics is not None:
+                self.metrics.watch_admission(self.admission)
+        return self.admission
+
+    def enable_metrics(
+        self,
+        port: Optional[int] = None,
+        host: str = "127.0.0.1",
+        registry: Optional[MetricsRegistry] = None,
+        local_model_manager: Optional[Any] = None
+    ) -> OrchestratorMetrics:
+        """
+        Optional OpenMetrics export of request, token, cost, retry and queue metrics
+
+        Args:
+            port: Serve /metrics on this port (no server if None; render
+                self.metrics.registry from your own endpoint instead)
+            host: Bind address for the metrics server
+            registry: Existing registry to add orchestrator metrics to
+            local_model_manager: LocalModelManager whose RAM and loaded
+                models are exported at scrape time (defaults to the one
+                given to the constructor)
+        """
+        local_model_manager = local_model_manager or self.local_model_manager
+        if self.metrics is None:
+            self.metrics = OrchestratorMetrics(registry)
+            if self.usage_log is not None:
+                self.metrics.watch_queue("usage_log", lambda: self.usage_log.pending)
+            if local_model_manager is not None:
+                self.metrics.watch_local_models(local_model_manager)
+            if self.admission is not None:
+                self.metrics.watch_admission(self.admission)
+
+        if port is not None and self.metrics_server is None:
+            self.metrics_server = self.metrics.serve(host, port)
+        return self.metrics
+
+    async def close(self):
+        """Stop warming, warm set planning, eviction, preloading and keep-alive, release all pooled client connections and flush the usage log and traces"""
+        await self.stop_warming()
+        if self.warm_set is not None:
+            await self.warm_set.stop()
+            self.warm_set = None
+        if self.eviction is not None:
+            await self.eviction.stop()
+            self.eviction = None
+        if self.preloader is not None:
+            await self.preloader.stop()
+            self.preloader = None
+        if self.keep_alive is not None:
+            await self.keep_alive.stop()
+            self.keep_alive = None
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        for client in self.api_clients.values():
+            if hasattr(client, "close"):
+                await client.close()
+        if self.usage_log is not None:
+            await asyncio.to_thread(self.usage_log.close)
+        self.tracer.close()
+
     def select_model(
         self,
         prompt: str,
@@ -689,42 +1008,79 @@ class ModelOrchestrator:
         Returns:
             Tuple of (model_id, model_capabilities)
         """
-        requirements = self.analyzer.analyze(prompt, context)
-
-        # Try guide recommendations first if enabled
-        if use_guide:
-            recommended = self.guide.get_recommended_models(requirements.task_type.value)
-
-            # Filter to available models
-            available_recommended = [
-                m for m in recommended
-                if m in self.registry.models
-                and self.registry.models[m].available
-                and not self.guide.is_model_blocked(m, requirements.task_type.value)
-            ]
-
-            if available_recommended:
-                best_model_id = available_recommended[0]
-                return best_model_id, self.registry.models[best_model_id]
-
-        # Fall back to scoring system
-        scores = {}
-        for model_id, model in self.registry.models.items():
-            if model.available:
-                scores[model_id] = self.scorer.score(model, requirements)
-
-        if not scores:
-            raise ValueError("No suitable models available")
-
-        # Apply strategy modifiers
-        scores = self._apply_strategy(scores, strategy)
-
-        # Select best model
-        best_model_id = max(scores, key=scores.get)
-
-        logger.info(f"Selected: {best_model_id} (score: {scores[best_model_id]:.2f}, task: {requirements.task_type.value})")
-
-        return best_model_id, self.registry.models[best_model_id]
+        start = time.perf_counter_ns() if stage_timers.enabled else 0
+
+        with self.tracer.span("select_model", strategy=strategy) as span:
+            with self.tracer.span("analyze_task"):
+                requirements = self.analyzer.analyze(prompt, context)
+            if start:
+                stage_timers.record("analyze_task", time.perf_counter_ns() - start)
+            span.set_attribute("task_type", requirements.task_type.value)
+            if self.preloader is not None:
+                self.preloader.observe(requirements.task_type)
+
+            # Try guide recommendations first if enabled
+            if use_guide:
+                recommended = self.guide.get_recommended_models(requirements.task_type.value)
+
+                # Filter to available models
+                available_recommended = [
+                    m for m in recommended
+                    if m in self.registry.models
+                    and self.registry.models[m].available
+                    and not self.guide.is_model_blocked(m, requirements.task_type.value)
+                ]
+
+                # Skip local models whose cold start and queue wait alone would blow the latency budget
+                if self.local_model_manager is not None or self.admission is not None:
+                    budget_ms = self._latency_budget_ms(requirements, strategy)
+                    available_recommended = [
+                        m for m in available_recommended
+                        if self.local_delay_ms(self.registry.models[m]) <= budget_ms
+                    ]
+
+                if available_recommended:
+                    best_model_id = available_recommended[0]
+                    span.set_attributes({"model": best_model_id, "source": "guide"})
+                    if start:
+                        stage_timers.record("select_model", time.perf_counter_ns() - start)
+                    return best_model_id, self.registry.models[best_model_id]
+
+            # Fall back to scoring system
+            with self.tracer.span("score_models") as score_span:
+                scores = {}
+                for model_id, model in self.registry.models.items():
+                    if model.available:
+                        if not start:
+                            scores[model_id] = self.scorer.score(model, requirements)
+                        else:
+                            score_start = time.perf_counter_ns()
+                            scores[model_id] = self.scorer.score(model, requirements)
+                            stage_timers.record("score_model", time.perf_counter_ns() - score_start)
+                score_span.set_attribute("candidates", len(scores))
+
+                if not scores:
+                    raise ValueError("No suitable models available")
+
+                # Apply strategy modifiers
+                scores = self._apply_strategy(scores, strategy)
+                if self.local_model_manager is not None or self.admission is not None:
+                    scores = self._apply_local_delay(scores, self._latency_budget_ms(requirements, strategy))
+
+                # Select best model
+                best_model_id = max(scores, key=scores.get)
+
+            span.set_attributes({"model": best_model_id, "source": "score", "score": scores[best_model_id]})
+            # Per-routing detail: DEBUG, and nothing is built unless it will be emitted
+            if logger.isEnabledFor(logging.DEBUG):
+                task_type = requirements.task_type.value
+                logger.debug("Selected: %s (score: %.2f, task: %s)",
+                             best_model_id, scores[best_model_id], task_type,
+                             extra={"model": best_model_id, "score": scores[best_model_id], "task_type": task_type})
+
+            if start:
+                stage_timers.record("select_model", time.perf_counter_ns() - start)
+            return best_model_id, self.registry.models[best_model_id]
 
     def _apply_strategy(self, scores: Dict[str, float], strategy: str) -> Dict[str, float]:
         """Apply selection strategy modifiers to scores"""
@@ -747,12 +1103,70 @@ class ModelOrchestrator:
 
         return scores
 
+    def cold_start_ms(self, model: ModelCapabilities) -> float:
+        """Expected model load time before a call can start (0 if resident or not local)"""
+        if self.local_model_manager is None or model.provider != ModelProvider.LOCAL:
+            return 0.0
+        return self.local_model_manager.expected_cold_start_ms(model.model_id) or 0.0
+
+    def expected_wait_ms(self, model: ModelCapabilities) -> float:
+        """Expected admission queue wait for a local model (0 without admission control)"""
+        if self.admission is None or model.provider != ModelProvider.LOCAL:
+            return 0.0
+        return self.admission.expected_wait_ms(model.model_id)
+
+    def local_delay_ms(self, model: ModelCapabilities) -> float:
+        """Cold start plus queue wait before a local model starts on a request"""
+        return self.cold_start_ms(model) + self.expected_wait_ms(model)
+
+    def _latency_budget_ms(self, requirements: TaskRequirements, strategy: str) -> float:
+        """Latency a request tolerates: the task's max_latency_ms, else the strategy's"""
+        if requirements.max_latency_ms is not None:
+            return float(requirements.max_latency_ms)
+        return self.LATENCY_BUDGET_MS.get(strategy, self.LATENCY_BUDGET_MS["balanced"])
+
+    def _apply_local_delay(self, scores: Dict[str, float], budget_ms: float) -> Dict[str, float]:
+        """
+        Discount local models by their expected load time and queue wait
+
+        A delay of one latency budget halves the score, so a warm, idle model
+        or a cloud model wins unless the delayed one is clearly better.
+        """
+        for model_id in scores:
+            delay_ms = self.local_delay_ms(self.registry.models[model_id])
+            if delay_ms > 0:
+                scores[model_id] *= budget_ms / (budget_ms + delay_ms)
+        return scores
+
+    def spill_model(self, task_type: Optional[TaskType], exclude: Tuple[str, ...] = ()) -> Optional[str]:
+        """
+        Best callable model for a task other than `exclude`, skipping local models that would reject
+
+        Runs on the event loop when a call is rejected, so it reads only
+        cached local model state (the manager's Ollama snapshot), never Ollama.
+        """
+        requirements = TaskRequirements(task_type=task_type or TaskType.CONVERSATION)
+        scores = {}
+        for model_id, model in self.registry.models.items():
+            if not model.available or model_id in exclude or model.provider.value not in self.api_clients:
+                continue
+            if (self.admission is not None and model.provider == ModelProvider.LOCAL
+                    and not self.admission.would_admit(model.model_id)):
+                continue
+            scores[model_id] = self.scorer.score(model, requirements)
+        scores = self._apply_local_delay(scores, self.LATENCY_BUDGET_MS["balanced"])
+        best = max(scores, key=scores.get, default=None)
+        return best if best is not None and scores[best] > 0 else None
+
     async def call_model(
         self,
         model_id: str,
         messages: Union[List[Dict], str],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        task_type: Optional[TaskType] = None,
+        priority: int = 0,
+        spill: bool = True,
         **kwargs
     ) -> APIResponse:
         """
@@ -763,6 +1177,10 @@ class ModelOrchestrator:
             messages: Messages or prompt string
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
+            task_type: Task type the call serves, for usage reporting
+            priority: Admission queue priority for local models (lower goes first)
+            spill: If a local model's admission queue rejects the call, send it
+                to the best other model instead of raising AdmissionRejected
             **kwargs: Additional API parameters
 
         Returns:
@@ -782,15 +1200,31 @@ class ModelOrchestrator:
 
         try:
             client = self.api_clients[provider]
-
-            async with client:
-                response = await client.chat_completion(
-                    model=model_id,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    **kwargs
-                )
+            if self.admission is not None and model.provider == ModelProvider.LOCAL:
+                gate = self.admission.slot(model.model_id, priority)
+            else:
+                gate = contextlib.nullcontext()
+
+            # Clients stay open across calls so pooled (and pre-warmed) connections are reused
+            with self.tracer.span("call_model", model=model_id, provider=provider) as span:
+                async with gate as admission_ms:
+                    response = await client.chat_completion(
+                        model=model_id,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        **kwargs
+                    )
+                if admission_ms:
+                    response.timings = {**(response.timings or {}), "admission_ms": admission_ms}
+                if span.recording:
+                    span.set_attributes({
+                        "input_tokens": response.usage['input_tokens'],
+                        "output_tokens": response.usage['output_tokens'],
+                        "latency_ms": response.latency_ms,
+                    })
+                    if response.timings:
+                        span.set_attributes({f"timing.{k}": v for k, v in response.timings.items()})
 
             # Track usage
             self.track_usage(
@@ -798,13 +1232,26 @@ class ModelOrchestrator:
                 input_tokens=response.usage['input_tokens'],
                 output_tokens=response.usage['output_tokens'],
                 latency_ms=response.latency_ms,
-                success=response.error is None
+                success=response.error is None,
+                timings=response.timings,
+                task_type=task_type
             )
 
             return response
 
+        except AdmissionRejected as e:
+            spill_id = self.spill_model(task_type, exclude=(model_id,)) if spill else None
+            if spill_id is None:
+                raise
+            logger.warning("Spilling %s to %s: %s", model_id, spill_id, e.reason,
+                           extra={"model": model_id, "spill_model": spill_id})
+            return await self.call_model(spill_id, messages, temperature, max_tokens, task_type,
+                                         priority, spill=False, **kwargs)
+
         except Exception as e:
-            logger.error(f"API call failed for {model_id}: {e}")
+            logger.error("API call failed for %s: %s", model_id, e, extra={"model": model_id, "provider": provider})
+            if self.metrics is not None:
+                self.metrics.observe_error(model_id, provider)
             raise
 
     def track_usage(
@@ -813,35 +1260,69 @@ class ModelOrchestrator:
         input_tokens: int,
         output_tokens: int,
         latency_ms: int,
-        success: bool = True
+        success: bool = True,
+        timings: Optional[Dict[str, float]] = None,
+        task_type: Optional[TaskType] = None
     ):
         """Track model usage for optimization"""
         model = self.registry.get_model(model_id)
         if not model:
             return
 
+        # Accumulate per-stage timing totals (dns_ms, ttfb_ms, retry_ms, ...)
+        if isinstance(timings, dict):
+            totals = self.timing_totals.setdefault(model_id, {"requests": 0})
+            totals["requests"] += 1
+            for stage, ms in timings.items():
+                totals[stage] = totals.get(stage, 0.0) + ms
+
+        # Local demand feeds the warm set and preloader; measured cold loads the cold-start penalty
+        if model.provider == ModelProvider.LOCAL:
+            if self.local_model_manager is not None:
+                self.local_model_manager.demand.record(model.model_id)
+                if isinstance(timings, dict) and timings.get("load_ms"):
+                    self.local_model_manager.record_load(model.model_id, timings["load_ms"])
+            # Real traffic resets Ollama's unload timer, so keep-alive can skip a pin
+            if self.keep_alive is not None:
+                self.keep_alive.touch(model.model_id)
+
         # Calculate cost
         cost = self.estimate_cost(model_id, input_tokens, output_tokens)
 
-        # Update cost tracker
-        if model_id not in self.cost_tracker:
-            self.cost_tracker[model_id] = 0.0
-        self.cost_tracker[model_id] += cost
-
-        # Record performance
-        self.performance_history.append({
-            "timestamp": datetime.now().isoformat(),
-            "model_id": model_id,
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-            "cost": cost,
-            "latency_ms": latency_ms,
-            "success": success
-        })
+        provider = model.provider.value
+        task_name = task_type.value if task_type else None
+        timestamp = time.time()
+
+        # Update running aggregates (also updates cost_tracker)
+        self.usage_aggregates.record(
+            model_id, provider, input_tokens, output_tokens, cost, latency_ms, success,
+            task_type=task_name, timestamp=timestamp
+        )
+
+        # Record performance (ring buffer keeps the last 1000 entries)
+        self.usage_store.append(
+            model_id, input_tokens, output_tokens, cost, latency_ms, success,
+            provider=provider, timestamp=timestamp
+        )
 
-        # Keep only last 1000 entries
-        if len(self.performance_history) > 1000:
-            self.performance_history = self.performance_history[-1000:]
+        # Latency, TTFT and tokens/sec sketches
+        ttft_ms, tokens_per_second = derive_request_metrics(latency_ms, output_tokens, timings)
+        self.latency_tracker.record(model_id, provider, task_name, latency_ms,
+                                    ttft_ms, tokens_per_second, timestamp)
+
+        # Queue for the durable log (written in batches off the request path)
+        if self.usage_log is not None:
+            self.usage_log.append(timestamp, model_id, provider, task_name,
+                                  input_tokens, output_tokens, cost, latency_ms, success)
+
+        if self.metrics is not None:
+            self.metrics.observe_request(model_id, provider, input_tokens, output_tokens,
+                                         cost, latency_ms, success, timings)
+
+    @property
+    def performance_history(self) -> List[Dict]:
+        """Recorded usage entries, oldest first"""
+        return self.usage_store.records()
 
     def estimate_cost(self, model_id: str, input_tokens: int, output_tokens: int) -> float:
         """Estimate cost for model usage"""
@@ -855,33 +1336,49 @@ class ModelOrchestrator:
         return input_cost + output_cost
 
     def get_cost_report(self) -> Dict[str, Any]:
-        """Generate cost report"""
-        total_cost = sum(self.cost_tracker.values())
-
-        report = {
-            "total_cost": total_cost,
-            "by_model": self.cost_tracker.copy(),
-            "by_provider": {},
-            "usage_count": {}
+        """Generate cost report from the running aggregates"""
+        return self.usage_aggregates.report()
+
+    def get_usage_timeseries(self, granularity: str = "minute") -> List[Dict[str, Any]]:
+        """Usage per minute, hour or day bucket, oldest first"""
+        return self.usage_aggregates.time_series(granularity)
+
+    def get_latency_report(self, window: str = "5m", group_by: str = "key") -> Dict[str, Dict[str, float]]:
+        """
+        p50/p95/p99 latency, TTFT and tokens/sec over a rolling window
+
+        Args:
+            window: "1m", "5m" or "1h"
+            group_by: "key" (model|provider|task_type), "model", "provider" or "task_type"
+        """
+        return self.latency_tracker.report(window, group_by)
+
+    def get_usage_window(self, seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Usage totals and latency over the last N seconds (all retained entries if None)"""
+        return {
+            "overall": self.usage_store.aggregate(seconds),
+            "by_model": self.usage_store.by_model(seconds),
+            "by_provider": self.usage_store.by_provider(seconds),
         }
 
-        # Aggregate by provider
-        for model_id, cost in self.cost_tracker.items():
-            model = self.registry.get_model(model_id)
-            if model:
-                provider = model.provider.value
-                if provider not in report["by_provider"]:
-                    report["by_provider"][provider] = 0.0
-                report["by_provider"][provider] += cost
+    def get_timing_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Mean per-request timing breakdown by model
+
+        network_ms sums connection setup, body transfer and retries; server_ms is
+        time to first byte, which is dominated by model generation.
+        """
+        return timing_report(self.timing_totals)
 
-        # Count usage
-        for entry in self.performance_history:
-            model_id = entry["model_id"]
-            if model_id not in report["usage_count"]:
-                report["usage_count"][model_id] = 0
-            report["usage_count"][model_id] += 1
+    def get_stage_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-stage timing histograms while stage profiling is on
 
-        return report
+        Stages: analyze_task, score_model (per model scored), select_model,
+        make_request (including retries) and parse_response. Enable with
+        profiling.stage_timers.enable() or $ORCHESTRATOR_PROFILE_STAGES=1.
+        """
+        return stage_timers.report()
 
     def create_consensus_group(
         self,
@@ -927,6 +1424,7 @@ class ModelOrchestrator:
 
 def main():
     """Demo and testing"""
+    configure_logging()
     orchestrator = ModelOrchestrator()
 
     print("="*80)
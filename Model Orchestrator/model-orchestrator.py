@@ -10,18 +10,23 @@ import yaml
 import asyncio
 import logging
 import re
+import time
+from array import array
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple, Union
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Tuple, Union, NamedTuple
 from enum import Enum
 from datetime import datetime
 import numpy as np
 
 # API integration
 from api_clients import get_api_client, APIResponse, BaseAPIClient
+from usage_store import UsageStore, UsageAggregates
+from usage_log import open_usage_log
+from latency_sketch import LatencyTracker, derive_request_metrics
+from tracing import open_tracer, child_span
+from profiling import stage_timers, configure_profiling
+from log_config import configure_logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TaskType(Enum):
@@ -42,6 +47,11 @@ class TaskType(Enum):
     SYSTEM_DESIGN = "system_design"
     DATA_ANALYSIS = "data_analysis"
 
+# Fixed ordinal per task type, used to index ModelCapabilities.task_affinity
+TASK_TYPES: Tuple[TaskType, ...] = tuple(TaskType)
+for _ordinal, _task_type in enumerate(TASK_TYPES):
+    _task_type.ordinal = _ordinal
+
 class ModelProvider(Enum):
     """Available model providers"""
     ANTHROPIC = "anthropic"
@@ -55,38 +65,108 @@ class ModelProvider(Enum):
     BEDROCK = "bedrock"
     META = "meta"
 
-@dataclass
 class ModelCapabilities:
-    """Model capability profile"""
-    provider: ModelProvider
-    model_id: str
-    context_window: int
-    supports_vision: bool = False
-    supports_function_calling: bool = False
-    supports_streaming: bool = True
-    supports_reasoning: bool = False
-    code_specialized: bool = False
-    
-    # Performance metrics (0-1 scale)
-    speed: float = 0.5
-    accuracy: float = 0.5
-    creativity: float = 0.5
-    reasoning_depth: float = 0.5
-    
-    # Cost per million tokens
-    input_cost: float = 0.0
-    output_cost: float = 0.0
-    
-    # Task affinity scores (0-1 scale)
-    task_scores: Dict[TaskType, float] = field(default_factory=dict)
-    
-    # Availability
-    rate_limit: Optional[str] = None
-    available: bool = True
-    
-@dataclass
-class TaskRequirements:
-    """Requirements for a specific task"""
+    """
+    Immutable model capability record
+
+    Slotted, with task affinities held in a fixed-length float array indexed by
+    TaskType.ordinal. Only `available` (runtime status) may change after creation.
+    """
+
+    __slots__ = (
+        "provider", "model_id", "context_window",
+        "supports_vision", "supports_function_calling", "supports_streaming",
+        "supports_reasoning", "code_specialized",
+        "speed", "accuracy", "creativity", "reasoning_depth",
+        "input_cost", "output_cost",
+        "task_affinity", "task_mask",
+        "rate_limit", "available",
+    )
+    _MUTABLE = frozenset({"available"})
+
+    # Affinity used for task types the model has no score for
+    DEFAULT_AFFINITY = 0.5
+
+    def __init__(
+        self,
+        provider: ModelProvider,
+        model_id: str,
+        context_window: int,
+        supports_vision: bool = False,
+        supports_function_calling: bool = False,
+        supports_streaming: bool = True,
+        supports_reasoning: bool = False,
+        code_specialized: bool = False,
+        # Performance metrics (0-1 scale)
+        speed: float = 0.5,
+        accuracy: float = 0.5,
+        creativity: float = 0.5,
+        reasoning_depth: float = 0.5,
+        # Cost per million tokens
+        input_cost: float = 0.0,
+        output_cost: float = 0.0,
+        # Task affinity scores (0-1 scale)
+        task_scores: Optional[Dict[TaskType, float]] = None,
+        # Availability
+        rate_limit: Optional[str] = None,
+        available: bool = True,
+    ):
+        self.provider = provider
+        self.model_id = model_id
+        self.context_window = context_window
+        self.supports_vision = supports_vision
+        self.supports_function_calling = supports_function_calling
+        self.supports_streaming = supports_streaming
+        self.supports_reasoning = supports_reasoning
+        self.code_specialized = code_specialized
+        self.speed = speed
+        self.accuracy = accuracy
+        self.creativity = creativity
+        self.reasoning_depth = reasoning_depth
+        self.input_cost = input_cost
+        self.output_cost = output_cost
+
+        affinity = array('d', [self.DEFAULT_AFFINITY]) * len(TASK_TYPES)
+        mask = 0
+        for task_type, score in (task_scores or {}).items():
+            affinity[task_type.ordinal] = score
+            mask |= 1 << task_type.ordinal
+        self.task_affinity = affinity
+        self.task_mask = mask  # bit per TaskType ordinal that has an explicit score
+
+        self.rate_limit = rate_limit
+        self.available = available
+
+    def __setattr__(self, name, value):
+        if name not in self._MUTABLE and hasattr(self, name):
+            raise AttributeError(f"ModelCapabilities is immutable: cannot set {name!r}")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"ModelCapabilities is immutable: cannot delete {name!r}")
+
+    @property
+    def task_scores(self) -> Dict[TaskType, float]:
+        """Explicit task affinity scores (a fresh dict; the record itself is unchanged)"""
+        return {
+            task_type: self.task_affinity[task_type.ordinal]
+            for task_type in TASK_TYPES
+            if self.task_mask >> task_type.ordinal & 1
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, ModelCapabilities):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"ModelCapabilities(provider={self.provider}, model_id={self.model_id!r}, "
+                f"context_window={self.context_window}, available={self.available})")
+
+class TaskRequirements(NamedTuple):
+    """Requirements for a specific task (lightweight immutable struct)"""
     task_type: TaskType
     min_context_window: int = 4096
     requires_vision: bool = False
@@ -94,7 +174,7 @@ class TaskRequirements:
     requires_reasoning: bool = False
     max_latency_ms: Optional[int] = None
     max_cost: Optional[float] = None
-    preferred_providers: List[ModelProvider] = field(default_factory=list)
+    preferred_providers: Tuple[ModelProvider, ...] = ()
     quality_threshold: float = 0.7
     
 class ModelGuideParser:
@@ -172,19 +252,47 @@ class ModelGuideParser:
 
 class ModelOrchestrator:
     """Intelligent model orchestration system with MODELS.md guidance and API integration"""
+    
+    # Keywords for task type detection (built once, not per request)
+    TASK_KEYWORDS = {
+        TaskType.CODE_GENERATION: ("write", "implement", "create", "code", "function", "class"),
+        TaskType.CODE_REVIEW: ("review", "check", "analyze code", "improve code"),
+        TaskType.REASONING: ("think", "reason", "analyze", "solve", "deduce"),
+        TaskType.CREATIVE_WRITING: ("story", "poem", "creative", "fiction", "narrative"),
+        TaskType.VISION: ("image", "picture", "screenshot", "visual", "see"),
+        TaskType.DEBUGGING: ("debug", "fix", "error", "bug", "troubleshoot"),
+        TaskType.SYSTEM_DESIGN: ("design", "architect", "structure", "system"),
+        TaskType.RESEARCH: ("research", "find", "discover", "investigate"),
+        TaskType.TRANSLATION: ("translate", "translation", "chinese", "japanese", "spanish", "french", "german", "multilingual"),
+    }
 
-    def __init__(self, config_path: Optional[str] = None, guide_path: Optional[str] = None):
+    def __init__(self,
+                 config_path: Optional[str] = None,
+                 guide_path: Optional[str] = None,
+                 usage_log_path: Optional[str] = None):
         self.config_path = config_path or Path(".") / "orchestrator_config.yaml"
         self.guide_path = guide_path
         self.models: Dict[str, ModelCapabilities] = {}
         self.api_clients: Dict[str, BaseAPIClient] = {}
-        self.cost_tracker: Dict[str, float] = {}
-        self.performance_history: List[Dict] = []
+        self.usage_store = UsageStore()
+        self.usage_aggregates = UsageAggregates()
+        # Per-model spend, maintained by usage_aggregates under its lock
+        self.cost_tracker: Dict[str, float] = self.usage_aggregates.cost_by_model
+        self.latency_tracker = LatencyTracker()
+        # Spans exported to $ORCHESTRATOR_TRACE_FILE (disabled if unset)
+        self.tracer = open_tracer()
+        configure_profiling()
         self.guide: Optional[ModelGuideParser] = None
 
         # Load models and configuration
         self._load_models()
 
+        # Replay persisted usage (path or $ORCHESTRATOR_USAGE_LOG)
+        self.usage_log = open_usage_log(usage_log_path)
+        if self.usage_log is not None:
+            self.usage_log.replay_into(self.usage_aggregates, self.usage_store, latency=self.latency_tracker)
+            logger.info(f"✓ Usage log replayed: {self.usage_aggregates.total.requests} requests")
+
         # Load MODELS.md guidance if path provided
         if self.guide_path:
             try:
@@ -1388,35 +1496,24 @@ class ModelOrchestrator:
             except Exception as e:
                 logger.warning(f"Failed to initialize Anthropic client: {e}")
 
-        # Local models
+        # Local models - native Ollama client unless an OpenAI-compatible server is configured
         try:
-            self.api_clients['local'] = get_api_client('local')
+            local_provider = 'local' if os.getenv("CUSTOM_API_URL") else 'ollama'
+            self.api_clients['local'] = get_api_client(local_provider)
             logger.info("✓ Local model client initialized")
         except Exception as e:
             logger.warning(f"Failed to initialize local client: {e}")
 
     def analyze_task(self, prompt: str, context: Optional[Dict] = None) -> TaskRequirements:
         """Analyze prompt to determine task requirements"""
-        
-        # Keywords for task type detection
-        task_keywords = {
-            TaskType.CODE_GENERATION: ["write", "implement", "create", "code", "function", "class"],
-            TaskType.CODE_REVIEW: ["review", "check", "analyze code", "improve code"],
-            TaskType.REASONING: ["think", "reason", "analyze", "solve", "deduce"],
-            TaskType.CREATIVE_WRITING: ["story", "poem", "creative", "fiction", "narrative"],
-            TaskType.VISION: ["image", "picture", "screenshot", "visual", "see"],
-            TaskType.DEBUGGING: ["debug", "fix", "error", "bug", "troubleshoot"],
-            TaskType.SYSTEM_DESIGN: ["design", "architect", "structure", "system"],
-            TaskType.RESEARCH: ["research", "find", "discover", "investigate"],
-            TaskType.TRANSLATION: ["translate", "translation", "chinese", "japanese", "spanish", "french", "german", "multilingual"],
-        }
+        start = time.perf_counter_ns() if stage_timers.enabled else 0
         
         # Detect task type
         prompt_lower = prompt.lower()
         detected_type = TaskType.CONVERSATION  # default
         max_matches = 0
         
-        for task_type, keywords in task_keywords.items():
+        for task_type, keywords in self.TASK_KEYWORDS.items():
             matches = sum(1 for keyword in keywords if keyword in prompt_lower)
             if matches > max_matches:
                 max_matches = matches
@@ -1427,17 +1524,20 @@ class ModelOrchestrator:
         estimated_context = max(4096, prompt_length * 10)  # Rule of thumb
         
         # Check for specific requirements
-        requires_vision = any(word in prompt_lower for word in ["image", "picture", "screenshot", "visual"])
-        requires_reasoning = any(word in prompt_lower for word in ["think", "reason", "explain why", "analyze"])
-        requires_function = any(word in prompt_lower for word in ["function", "api", "tool", "call"])
+        requires_vision = any(word in prompt_lower for word in ("image", "picture", "screenshot", "visual"))
+        requires_reasoning = any(word in prompt_lower for word in ("think", "reason", "explain why", "analyze"))
+        requires_function = any(word in prompt_lower for word in ("function", "api", "tool", "call"))
         
-        return TaskRequirements(
+        requirements = TaskRequirements(
             task_type=detected_type,
             min_context_window=estimated_context,
             requires_vision=requires_vision,
             requires_function_calling=requires_function,
             requires_reasoning=requires_reasoning,
         )
+        if start:
+            stage_timers.record("analyze_task", time.perf_counter_ns() - start)
+        return requirements
     
     def score_model(self, model: ModelCapabilities, requirements: TaskRequirements) -> float:
         """Score model fitness for task requirements"""
@@ -1452,7 +1552,7 @@ class ModelOrchestrator:
             return 0.0
         
         # Task affinity score (40% weight)
-        task_score = model.task_scores.get(requirements.task_type, 0.5)
+        task_score = model.task_affinity[requirements.task_type.ordinal]
         score += task_score * 0.4
         
         # Performance score (30% weight)
@@ -1481,44 +1581,62 @@ class ModelOrchestrator:
                     context: Optional[Dict] = None,
                     strategy: str = "balanced") -> Tuple[str, ModelCapabilities]:
         """Select best model for task"""
+        start = time.perf_counter_ns() if stage_timers.enabled else 0
         
-        requirements = self.analyze_task(prompt, context)
-        
-        # Score all available models
-        scores = {}
-        for model_id, model in self.models.items():
-            if model.available:
-                scores[model_id] = self.score_model(model, requirements)
-        
-        if not scores:
-            raise ValueError("No suitable models available")
-        
-        # Apply strategy modifiers
-        if strategy == "cost_optimize":
-            # Heavily weight cost efficiency
-            for model_id in scores:
-                model = self.models[model_id]
-                cost_factor = 1.0 - min(1.0, (model.input_cost + model.output_cost) / 50.0)
-                scores[model_id] *= (0.5 + 0.5 * cost_factor)
-        elif strategy == "quality_first":
-            # Heavily weight accuracy and reasoning
-            for model_id in scores:
-                model = self.models[model_id]
-                quality_factor = (model.accuracy + model.reasoning_depth) / 2
-                scores[model_id] *= (0.5 + 0.5 * quality_factor)
-        elif strategy == "speed_priority":
-            # Heavily weight speed
-            for model_id in scores:
-                model = self.models[model_id]
-                scores[model_id] *= (0.5 + 0.5 * model.speed)
-        
-        # Select best model
-        best_model_id = max(scores, key=scores.get)
-        
-        logger.info(f"Selected model: {best_model_id} (score: {scores[best_model_id]:.2f})")
-        logger.info(f"Task type: {requirements.task_type.value}")
-        
-        return best_model_id, self.models[best_model_id]
+        with self.tracer.span("select_model", strategy=strategy) as span:
+            with self.tracer.span("analyze_task"):
+                requirements = self.analyze_task(prompt, context)
+            span.set_attribute("task_type", requirements.task_type.value)
+            
+            with self.tracer.span("score_models") as score_span:
+                # Score all available models
+                scores = {}
+                for model_id, model in self.models.items():
+                    if model.available:
+                        if not start:
+                            scores[model_id] = self.score_model(model, requirements)
+                        else:
+                            score_start = time.perf_counter_ns()
+                            scores[model_id] = self.score_model(model, requirements)
+                            stage_timers.record("score_model", time.perf_counter_ns() - score_start)
+                score_span.set_attribute("candidates", len(scores))
+                
+                if not scores:
+                    raise ValueError("No suitable models available")
+                
+                # Apply strategy modifiers
+                if strategy == "cost_optimize":
+                    # Heavily weight cost efficiency
+                    for model_id in scores:
+                        model = self.models[model_id]
+                        cost_factor = 1.0 - min(1.0, (model.input_cost + model.output_cost) / 50.0)
+                        scores[model_id] *= (0.5 + 0.5 * cost_factor)
+                elif strategy == "quality_first":
+                    # Heavily weight accuracy and reasoning
+                    for model_id in scores:
+                        model = self.models[model_id]
+                        quality_factor = (model.accuracy + model.reasoning_depth) / 2
+                        scores[model_id] *= (0.5 + 0.5 * quality_factor)
+                elif strategy == "speed_priority":
+                    # Heavily weight speed
+                    for model_id in scores:
+                        model = self.models[model_id]
+                        scores[model_id] *= (0.5 + 0.5 * model.speed)
+                
+                # Select best model
+                best_model_id = max(scores, key=scores.get)
+            
+            span.set_attributes({"model": best_model_id, "score": scores[best_model_id]})
+            # Per-routing detail: DEBUG, and nothing is built unless it will be emitted
+            if logger.isEnabledFor(logging.DEBUG):
+                task_type = requirements.task_type.value
+                logger.debug("Selected model: %s (score: %.2f, task: %s)",
+                             best_model_id, scores[best_model_id], task_type,
+                             extra={"model": best_model_id, "score": scores[best_model_id], "task_type": task_type})
+            
+            if start:
+                stage_timers.record("select_model", time.perf_counter_ns() - start)
+            return best_model_id, self.models[best_model_id]
     
     def create_model_chain(self, 
                           tasks: List[str],
@@ -1584,52 +1702,53 @@ class ModelOrchestrator:
                    input_tokens: int,
                    output_tokens: int,
                    latency_ms: int,
-                   success: bool = True):
+                   success: bool = True,
+                   task_type: Optional[TaskType] = None,
+                   timings: Optional[Dict[str, float]] = None):
         """Track model usage for optimization"""
         cost = self.estimate_cost(model_id, input_tokens, output_tokens)
+        provider = self.models[model_id].provider.value
+        task_name = task_type.value if task_type else None
+        timestamp = time.time()
         
-        # Update cost tracker
-        if model_id not in self.cost_tracker:
-            self.cost_tracker[model_id] = 0.0
-        self.cost_tracker[model_id] += cost
-        
-        # Record performance
-        self.performance_history.append({
-            "timestamp": datetime.now().isoformat(),
-            "model_id": model_id,
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-            "cost": cost,
-            "latency_ms": latency_ms,
-            "success": success
-        })
-    
-    def get_cost_report(self) -> Dict[str, Any]:
-        """Generate cost report"""
-        total_cost = sum(self.cost_tracker.values())
-        
-        report = {
-            "total_cost": total_cost,
-            "by_model": self.cost_tracker.copy(),
-            "by_provider": {},
-            "usage_count": {}
-        }
+        # Update running aggregates (also updates cost_tracker)
+        self.usage_aggregates.record(
+            model_id, provider, input_tokens, output_tokens, cost, latency_ms, success,
+            task_type=task_name, timestamp=timestamp
+        )
         
-        # Aggregate by provider
-        for model_id, cost in self.cost_tracker.items():
-            provider = self.models[model_id].provider.value
-            if provider not in report["by_provider"]:
-                report["by_provider"][provider] = 0.0
-            report["by_provider"][provider] += cost
+        # Record performance (ring buffer keeps the last 1000 entries)
+        self.usage_store.append(
+            model_id, input_tokens, output_tokens, cost, latency_ms, success,
+            provider=provider, timestamp=timestamp
+        )
         
-        # Count usage
-        for entry in self.performance_history:
-            model_id = entry["model_id"]
-            if model_id not in report["usage_count"]:
-                report["usage_count"][model_id] = 0
-            report["usage_count"][model_id] += 1
+        # Latency, TTFT and tokens/sec sketches
+        ttft_ms, tokens_per_second = derive_request_metrics(latency_ms, output_tokens, timings)
+        self.latency_tracker.record(model_id, provider, task_name, latency_ms,
+                                    ttft_ms, tokens_per_second, timestamp)
         
-        return report
+        # Queue for the durable log (written in batches off the request path)
+        if self.usage_log is not None:
+            self.usage_log.append(timestamp, model_id, provider, task_name,
+                                  input_tokens, output_tokens, cost, latency_ms, success)
+    
+    @property
+    def performance_history(self) -> List[Dict]:
+        """Recorded usage entries, oldest first"""
+        return self.usage_store.records()
+    
+    def get_cost_report(self) -> Dict[str, Any]:
+        """Generate cost report from the running aggregates"""
+        return self.usage_aggregates.report()
+    
+    def get_latency_report(self, window: str = "5m", group_by: str = "key") -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 latency, TTFT and tokens/sec over a rolling window (1m, 5m, 1h)"""
+        return self.latency_tracker.report(window, group_by)
+    
+    def get_stage_report(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage timing histograms (analyze_task, score_model, select_model, ...) while profiling"""
+        return stage_timers.report()
 
 class InteractionPattern:
     """Multi-model interaction patterns"""
@@ -1641,14 +1760,16 @@ class InteractionPattern:
         results = []
         context = {}
         
-        for i, task in enumerate(tasks):
-            model_id, model = orchestrator.select_model(task, context)
-            
-            # Simulate API call (replace with actual implementation)
-            result = await InteractionPattern._call_model(model_id, task, context)
-            
-            results.append(result)
-            context[f"step_{i}"] = result
+        with orchestrator.tracer.span("chain_of_thought", steps=len(tasks)):
+            for i, task in enumerate(tasks):
+                with orchestrator.tracer.span("step", step=i):
+                    model_id, model = orchestrator.select_model(task, context)
+                    
+                    # Simulate API call (replace with actual implementation)
+                    result = await InteractionPattern._call_model(model_id, task, context)
+                
+                results.append(result)
+                context[f"step_{i}"] = result
         
         return results
     
@@ -1657,14 +1778,16 @@ class InteractionPattern:
                                 prompt: str,
                                 num_models: int = 3) -> Dict[str, Any]:
         """Parallel execution with consensus"""
-        models = orchestrator.create_consensus_group(prompt, num_models)
-        
-        # Parallel execution
-        tasks = []
-        for model_id, model in models:
-            tasks.append(InteractionPattern._call_model(model_id, prompt))
-        
-        results = await asyncio.gather(*tasks)
+        with orchestrator.tracer.span("parallel_consensus", num_models=num_models) as span:
+            models = orchestrator.create_consensus_group(prompt, num_models)
+            span.set_attribute("models", ",".join(m[0] for m in models))
+            
+            # Parallel execution (each task inherits this span as its parent)
+            tasks = []
+            for model_id, model in models:
+                tasks.append(InteractionPattern._call_model(model_id, prompt))
+            
+            results = await asyncio.gather(*tasks)
         
         # Simple voting consensus (can be enhanced)
         consensus = {
@@ -1682,18 +1805,19 @@ class InteractionPattern:
         """Hierarchical refinement with increasing capability"""
         results = {"initial": None, "refinements": []}
         
-        # Start with fast/cheap model
-        model_id, _ = orchestrator.select_model(initial_prompt, strategy="speed_priority")
-        results["initial"] = await InteractionPattern._call_model(model_id, initial_prompt)
-        
-        # Refine with increasingly capable models
-        for prompt in refinement_prompts:
-            model_id, _ = orchestrator.select_model(prompt, strategy="quality_first")
-            refinement = await InteractionPattern._call_model(
-                model_id, 
-                f"{prompt}\n\nPrevious result: {results['initial']}"
-            )
-            results["refinements"].append(refinement)
+        with orchestrator.tracer.span("hierarchical_refinement", refinements=len(refinement_prompts)):
+            # Start with fast/cheap model
+            model_id, _ = orchestrator.select_model(initial_prompt, strategy="speed_priority")
+            results["initial"] = await InteractionPattern._call_model(model_id, initial_prompt)
+            
+            # Refine with increasingly capable models
+            for prompt in refinement_prompts:
+                model_id, _ = orchestrator.select_model(prompt, strategy="quality_first")
+                refinement = await InteractionPattern._call_model(
+                    model_id, 
+                    f"{prompt}\n\nPrevious result: {results['initial']}"
+                )
+                results["refinements"].append(refinement)
         
         return results
     
@@ -1743,17 +1867,21 @@ class InteractionPattern:
             messages.append({"role": "user", "content": prompt})
             
             # Make API call
-            async with client:
-                response = await client.chat_completion(
-                    model=model_id,
-                    messages=messages,
-                    temperature=context.get('temperature', 0.7) if context else 0.7
-                )
+            with child_span("call_model", model=model_id, provider=provider) as span:
+                async with client:
+                    response = await client.chat_completion(
+                        model=model_id,
+                        messages=messages,
+                        temperature=context.get('temperature', 0.7) if context else 0.7
+                    )
+                span.set_attributes({"input_tokens": response.input_tokens,
+                                     "output_tokens": response.output_tokens,
+                                     "latency_ms": response.latency_ms})
             
             return response.content
             
         except Exception as e:
-            logger.error(f"API call failed for {model_id}: {e}")
+            logger.error("API call failed for %s: %s", model_id, e)
             # Fallback to mock response in case of error
             return f"Error calling {model_id}: {str(e)}"
     
@@ -1765,6 +1893,7 @@ class InteractionPattern:
 
 def main():
     """Demo and testing"""
+    configure_logging()
     orchestrator = ModelOrchestrator()
     
     # Test scenarios
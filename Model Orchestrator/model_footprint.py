@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Local model memory footprints
+Discovers each installed model's weights size and attention shape from
+Ollama (/api/tags, /api/show) and estimates resident memory for a given
+context length and number of parallel slots:
+
+    weights + KV cache (per token x num_ctx x parallel) + runtime overhead
+
+Profiles are cached on disk by model digest, so /api/show is called once
+per model build rather than once per process. Lookups made on the event
+loop never call it inline; the profile is fetched in a worker thread.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, Optional, Set, Union
+
+from ollama_state import OllamaState, GB, running_loop
+
+logger = logging.getLogger(__name__)
+
+# Profile cache file (default ~/.cache/model-orchestrator/model-profiles.json)
+PROFILE_CACHE_ENV_VAR = "ORCHESTRATOR_MODEL_PROFILE_CACHE"
+DEFAULT_PROFILE_CACHE = Path.home() / ".cache" / "model-orchestrator" / "model-profiles.json"
+
+# Ollama server settings that change the footprint
+DEFAULT_NUM_CTX = 4096
+DEFAULT_NUM_PARALLEL = 1
+
+# Bytes per cached K or V element for each OLLAMA_KV_CACHE_TYPE (block formats include scales)
+KV_CACHE_BYTES = {"f16": 2.0, "q8_0": 34 / 32, "q4_0": 18 / 32}
+
+# Compute graph and backend buffers, as a share of the weights (rough)
+OVERHEAD_FRACTION = 0.1
+
+
+@dataclass
+class ModelProfile:
+    """Size and attention shape of one model build"""
+    name: str
+    digest: str
+    file_size_bytes: int
+    architecture: str = ""
+    parameter_count: int = 0
+    quantization_level: str = ""
+    context_length: int = 0  # Trained maximum
+    kv_heads_x_layers: int = 0  # Sum of KV heads over all layers
+    head_dim: int = 0
+
+    @classmethod
+    def from_show(cls, name: str, digest: str, file_size_bytes: int, show: Dict) -> "ModelProfile":
+        info = show.get("model_info") or {}
+        details = show.get("details") or {}
+        arch = info.get("general.architecture", "")
+
+        def arch_value(key: str, default=0):
+            return info.get(f"{arch}.{key}", default)
+
+        layers = arch_value("block_count")
+        kv_heads = arch_value("attention.head_count_kv") or arch_value("attention.head_count")
+        # Some architectures list per-layer head counts
+        kv_heads_x_layers = sum(kv_heads) if isinstance(kv_heads, list) else kv_heads * layers
+
+        heads = arch_value("attention.head_count")
+        if isinstance(heads, list):
+            heads = max(heads, default=0)
+        head_dim = arch_value("attention.key_length") or (
+            arch_value("embedding_length") // heads if heads else 0
+        )
+
+        return cls(
+            name=name,
+            digest=digest,
+            file_size_bytes=file_size_bytes,
+            architecture=arch,
+            parameter_count=info.get("general.parameter_count", 0),
+            quantization_level=details.get("quantization_level", ""),
+            context_length=arch_value("context_length"),
+            kv_heads_x_layers=kv_heads_x_layers,
+            head_dim=head_dim,
+        )
+
+    def kv_bytes_per_token(self, kv_cache_type: str = "f16") -> float:
+        """K and V for every layer; 0 if the shape is unknown"""
+        return 2 * self.kv_heads_x_layers * self.head_dim * KV_CACHE_BYTES.get(kv_cache_type, 2.0)
+
+    def footprint_bytes(self, num_ctx: int, parallel: int = 1, kv_cache_type: str = "f16") -> int:
+        """Estimated resident bytes with `parallel` slots of `num_ctx` tokens each"""
+        if self.context_length:
+            num_ctx = min(num_ctx, self.context_length)
+        kv = self.kv_bytes_per_token(kv_cache_type) * num_ctx * parallel
+        return int(self.file_size_bytes * (1 + OVERHEAD_FRACTION) + kv)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class ModelFootprints:
+    """
+    Profiles for installed models with footprint estimates
+
+    Server-side defaults come from the same environment variables Ollama
+    reads (OLLAMA_CONTEXT_LENGTH, OLLAMA_NUM_PARALLEL, OLLAMA_KV_CACHE_TYPE).
+    A failed /api/show is remembered for `failure_ttl` seconds, so a model
+    Ollama cannot describe is not asked about again on every lookup.
+    """
+
+    FAILURE_TTL = 60.0
+
+    def __init__(self,
+                 state: OllamaState,
+                 cache_path: Union[str, Path, None] = None,
+                 num_ctx: Optional[int] = None,
+                 parallel: Optional[int] = None,
+                 kv_cache_type: Optional[str] = None,
+                 failure_ttl: float = FAILURE_TTL):
+        self.state = state
+        self.failure_ttl = failure_ttl
+        self.cache_path = Path(cache_path or os.getenv(PROFILE_CACHE_ENV_VAR) or DEFAULT_PROFILE_CACHE)
+        self.num_ctx = num_ctx or int(os.getenv("OLLAMA_CONTEXT_LENGTH", DEFAULT_NUM_CTX))
+        self.parallel = parallel or int(os.getenv("OLLAMA_NUM_PARALLEL", DEFAULT_NUM_PARALLEL))
+        self.kv_cache_type = kv_cache_type or os.getenv("OLLAMA_KV_CACHE_TYPE", "f16")
+
+        self._profiles: Dict[str, ModelProfile] = self._load()  # By digest
+        self._failed: Dict[str, float] = {}  # Digest -> monotonic time /api/show last failed
+        self._fetching: Set[str] = set()  # Digests being profiled off the event loop
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------------
+    # Persistent cache
+    # ------------------------------------------------------------------------
+
+    def _load(self) -> Dict[str, ModelProfile]:
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        known = {field.name for field in fields(ModelProfile)}
+        return {
+            digest: ModelProfile(**{k: v for k, v in entry.items() if k in known})
+            for digest, entry in data.items()
+        }
+
+    def _save(self):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump({digest: p.to_dict() for digest, p in self._profiles.items()}, f, indent=2)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning("Could not write model profile cache %s: %s", self.cache_path, e)
+
+    # ------------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------------
+
+    def profile(self, model: str) -> Optional[ModelProfile]:
+        """Profile for an installed model (None if Ollama does not know it)"""
+        installed = self.state.installed().get(model)
+        if installed is None:
+            return None
+
+        profile = self._profiles.get(installed.digest)
+        if profile is not None:
+            return profile
+
+        loop = running_loop()
+        if loop is not None:
+            # Never wait on /api/show on the loop: weights only until the worker finishes
+            if installed.digest not in self._fetching and not self._failed_recently(installed.digest):
+                self._fetching.add(installed.digest)
+                loop.run_in_executor(None, self._profile_off_loop, model, installed.digest)
+            return ModelProfile(model, installed.digest, installed.size_bytes,
+                                quantization_level=installed.quantization_level)
+
+        with self._lock:
+            profile = self._profiles.get(installed.digest)
+            if profile is None:
+                show = None
+                if not self._failed_recently(installed.digest):
+                    show = self.state.show(model)
+                    if show is None:
+                        self._failed[installed.digest] = time.monotonic()
+                if show is None:
+                    # Weights only until /api/show answers; not persisted, retried after failure_ttl
+                    return ModelProfile(model, installed.digest, installed.size_bytes,
+                                        quantization_level=installed.quantization_level)
+                self._failed.pop(installed.digest, None)
+                profile = ModelProfile.from_show(model, installed.digest, installed.size_bytes, show)
+                self._profiles[installed.digest] = profile
+                self._save()
+        return profile
+
+    def _failed_recently(self, digest: str) -> bool:
+        failed_at = self._failed.get(digest)
+        return failed_at is not None and time.monotonic() - failed_at < self.failure_ttl
+
+    def _profile_off_loop(self, model: str, digest: str):
+        try:
+            self.profile(model)
+        finally:
+            self._fetching.discard(digest)
+
+    def footprint_gb(self, model: str, num_ctx: Optional[int] = None, parallel: Optional[int] = None) -> Optional[float]:
+        """Estimated resident GB at the given (or server default) context and slots"""
+        profile = self.profile(model)
+        if profile is None:
+            return None
+        return profile.footprint_bytes(num_ctx or self.num_ctx, parallel or self.parallel, self.kv_cache_type) / GB
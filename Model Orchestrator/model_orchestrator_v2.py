@@ -17,9 +17,13 @@ from datetime import datetime
 import time
 
 from api_clients import get_api_client, APIResponse, BaseAPIClient
+from grok_api import GrokAPI
+from connection_warmer import ConnectionWarmer
+from tracing import NOOP_SPAN
+from transports import timing_report
 from model_orchestrator import TaskType, ModelProvider, ModelCapabilities, TaskRequirements
+from log_config import configure_logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ModelOrchestratorV2:
@@ -29,13 +33,20 @@ class ModelOrchestratorV2:
         self.config_path = config_path or Path(__file__).parent / "orchestrator_config.yaml"
         self.models: Dict[str, ModelCapabilities] = {}
         self.api_clients: Dict[str, BaseAPIClient] = {}
-        self.cost_tracker: Dict[str, float] = {}
-        self.performance_history: List[Dict] = []
+        self.timing_totals: Dict[str, Dict[str, float]] = {}
+        self.connection_warmer: Optional[ConnectionWarmer] = None
         
-        # Load models from base orchestrator
+        # Load models from base orchestrator (one instance, shared for analysis,
+        # scoring and usage tracking)
         from model_orchestrator import ModelOrchestrator
-        base_orchestrator = ModelOrchestrator()
-        self.models = base_orchestrator.models
+        self.base_orchestrator = ModelOrchestrator()
+        self.models = self.base_orchestrator.models
+        
+        # Usage state (ring buffer, aggregates, durable log) lives on the base orchestrator
+        self.usage_store = self.base_orchestrator.usage_store
+        self.usage_aggregates = self.base_orchestrator.usage_aggregates
+        self.cost_tracker: Dict[str, float] = self.base_orchestrator.cost_tracker
+        self.tracer = self.base_orchestrator.tracer
         
         # Initialize API clients
         self._initialize_clients()
@@ -46,7 +57,6 @@ class ModelOrchestratorV2:
         # xAI/Grok
         if os.getenv("XAI_API_KEY"):
             try:
-                from grok_api import GrokAPI
                 self.api_clients['xai'] = GrokAPI()
                 logger.info("✓ Grok API client initialized")
             except Exception as e:
@@ -82,13 +92,40 @@ class ModelOrchestratorV2:
             except Exception as e:
                 logger.warning(f"Failed to initialize Anthropic client: {e}")
         
-        # Local models
+        # Local models - native Ollama client unless an OpenAI-compatible server is configured
         try:
-            self.api_clients['local'] = get_api_client('local')
+            local_provider = 'local' if os.getenv("CUSTOM_API_URL") else 'ollama'
+            self.api_clients['local'] = get_api_client(local_provider)
             logger.info("✓ Local model client initialized")
         except Exception as e:
             logger.warning(f"Failed to initialize local client: {e}")
     
+    async def warm_up(self,
+                      connections_per_host: int = 2,
+                      keep_warm: bool = True) -> Dict[str, Dict[str, float]]:
+        """Pre-open keep-alive connections to every configured provider"""
+        await self.stop_warming()
+        self.connection_warmer = ConnectionWarmer(self.api_clients, connections_per_host)
+        stats = await self.connection_warmer.warm()
+        if keep_warm:
+            self.connection_warmer.start()
+        return stats
+    
+    async def stop_warming(self):
+        """Stop background connection refreshing"""
+        if self.connection_warmer:
+            await self.connection_warmer.stop()
+            self.connection_warmer = None
+    
+    async def close(self):
+        """Stop warming, release all pooled client connections and flush the usage log"""
+        await self.stop_warming()
+        for client in self.api_clients.values():
+            await client.close()
+        if self.base_orchestrator.usage_log is not None:
+            await asyncio.to_thread(self.base_orchestrator.usage_log.close)
+        self.tracer.close()
+    
     async def call_model(self,
                         model_id: str,
                         messages: Union[List[Dict], str],
@@ -115,47 +152,57 @@ class ModelOrchestratorV2:
         client = self.api_clients[provider]
         
         # Special handling for Grok models
-        if provider == 'xai' and isinstance(client, type(client).__class__.__name__ == 'GrokAPI'):
-            # Use GrokAPI's native method
+        if provider == 'xai' and isinstance(client, GrokAPI):
+            # Use GrokAPI's native async methods on its pooled session
             start_time = time.time()
             
             if stream:
-                # Handle streaming for Grok
-                response = client.stream_completion(
+                # For streaming, return the async generator
+                return client.stream_completion(
                     model_id=model_id,
                     messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
                     **kwargs
                 )
-                # For streaming, return generator
-                return response
-            else:
-                response_data = client.chat_completion(
+            
+            with self.tracer.span("call_model", model=model_id, provider=provider) as span:
+                response_data = await client.chat_completion(
                     model_id=model_id,
                     messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
                     **kwargs
                 )
-                
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                # Convert to standardized format
-                return APIResponse(
-                    content=response_data['choices'][0]['message']['content'],
-                    model=model_id,
-                    provider=provider,
-                    usage={
-                        'input_tokens': response_data['usage']['prompt_tokens'],
-                        'output_tokens': response_data['usage']['completion_tokens']
-                    },
-                    latency_ms=latency_ms,
-                    raw_response=response_data
-                )
+                span.set_attributes({"input_tokens": response_data['usage']['prompt_tokens'],
+                                     "output_tokens": response_data['usage']['completion_tokens']})
+            
+            latency_ms = int((time.time() - start_time) * 1000)
+            
+            # Convert to standardized format
+            response = APIResponse(
+                content=response_data['choices'][0]['message']['content'],
+                model=model_id,
+                provider=provider,
+                usage={
+                    'input_tokens': response_data['usage']['prompt_tokens'],
+                    'output_tokens': response_data['usage']['completion_tokens']
+                },
+                latency_ms=latency_ms
+            )
+            
+            self.track_usage(
+                model_id=model_id,
+                input_tokens=response.usage['input_tokens'],
+                output_tokens=response.usage['output_tokens'],
+                latency_ms=response.latency_ms
+            )
+            
+            return response
         else:
-            # Use unified API client
-            async with client:
+            # Use unified API client; it stays open so pooled connections are reused
+            span = NOOP_SPAN if stream else self.tracer.span("call_model", model=model_id, provider=provider)
+            with span:
                 response = await client.chat_completion(
                     model=model_id,
                     messages=messages,
@@ -164,6 +211,10 @@ class ModelOrchestratorV2:
                     stream=stream,
                     **kwargs
                 )
+                if not stream:
+                    span.set_attributes({"input_tokens": response.input_tokens,
+                                         "output_tokens": response.output_tokens,
+                                         "latency_ms": response.latency_ms})
             
             # Track usage
             if not stream:
@@ -172,7 +223,8 @@ class ModelOrchestratorV2:
                     input_tokens=response.usage['input_tokens'],
                     output_tokens=response.usage['output_tokens'],
                     latency_ms=response.latency_ms,
-                    success=response.error is None
+                    success=response.error is None,
+                    timings=response.timings
                 )
             
             return response
@@ -184,67 +236,66 @@ class ModelOrchestratorV2:
                            stream: bool = False) -> APIResponse:
         """Route request to best model and make actual API call"""
         
-        # Analyze task
-        from model_orchestrator import ModelOrchestrator
-        base_orchestrator = ModelOrchestrator()
-        requirements = base_orchestrator.analyze_task(prompt, context)
-        
-        # Select best model
-        model_id, model = base_orchestrator.select_model(prompt, context, strategy)
-        
-        logger.info(f"Selected model: {model_id} (provider: {model.provider.value})")
-        
-        # Make actual API call
-        try:
-            response = await self.call_model(
-                model_id=model_id,
-                messages=prompt,
-                temperature=context.get('temperature', 0.7) if context else 0.7,
-                max_tokens=context.get('max_tokens') if context else None,
-                stream=stream
-            )
-            
-            return response
-            
-        except Exception as e:
-            logger.error(f"Failed to call {model_id}: {e}")
+        with self.tracer.span("route_request", strategy=strategy, stream=stream) as span:
+            # Analyze task
+            requirements = self.base_orchestrator.analyze_task(prompt, context)
             
-            # Try fallback model
-            fallback_models = self._get_fallback_models(model_id, requirements)
+            # Select best model
+            model_id, model = self.base_orchestrator.select_model(prompt, context, strategy)
+            span.set_attributes({"task_type": requirements.task_type.value, "model": model_id})
             
-            for fallback_id in fallback_models:
-                try:
-                    logger.info(f"Trying fallback model: {fallback_id}")
-                    response = await self.call_model(
-                        model_id=fallback_id,
-                        messages=prompt,
-                        temperature=context.get('temperature', 0.7) if context else 0.7,
-                        max_tokens=context.get('max_tokens') if context else None,
-                        stream=stream
-                    )
-                    return response
-                except Exception as e2:
-                    logger.error(f"Fallback {fallback_id} also failed: {e2}")
-                    continue
+            logger.debug("Selected model: %s (provider: %s)", model_id, model.provider.value)
             
-            # All models failed
-            raise Exception(f"All models failed for this request. Original error: {e}")
+            # Make actual API call
+            try:
+                response = await self.call_model(
+                    model_id=model_id,
+                    messages=prompt,
+                    temperature=context.get('temperature', 0.7) if context else 0.7,
+                    max_tokens=context.get('max_tokens') if context else None,
+                    stream=stream
+                )
+                
+                return response
+                
+            except Exception as e:
+                logger.error("Failed to call %s: %s", model_id, e)
+                
+                # Try fallback model
+                fallback_models = self._get_fallback_models(model_id, requirements)
+                
+                for attempt, fallback_id in enumerate(fallback_models, start=2):
+                    try:
+                        logger.info("Trying fallback model: %s", fallback_id)
+                        with self.tracer.span("fallback", model=fallback_id, attempt=attempt):
+                            response = await self.call_model(
+                                model_id=fallback_id,
+                                messages=prompt,
+                                temperature=context.get('temperature', 0.7) if context else 0.7,
+                                max_tokens=context.get('max_tokens') if context else None,
+                                stream=stream
+                            )
+                        span.set_attributes({"model": fallback_id, "attempts": attempt})
+                        return response
+                    except Exception as e2:
+                        logger.error("Fallback %s also failed: %s", fallback_id, e2)
+                        continue
+                
+                # All models failed
+                raise Exception(f"All models failed for this request. Original error: {e}")
     
     def _get_fallback_models(self, 
                             failed_model_id: str,
                             requirements: TaskRequirements) -> List[str]:
         """Get fallback models for a failed request"""
         
-        from model_orchestrator import ModelOrchestrator
-        base_orchestrator = ModelOrchestrator()
-        
         # Score all models except the failed one
         scores = {}
         for model_id, model in self.models.items():
             if model_id != failed_model_id and model.available:
                 # Check if provider client is available
                 if model.provider.value in self.api_clients:
-                    scores[model_id] = base_orchestrator.score_model(model, requirements)
+                    scores[model_id] = self.base_orchestrator.score_model(model, requirements)
         
         # Sort by score and return top 3
         sorted_models = sorted(scores.items(), key=lambda x: x[1], reverse=True)
@@ -256,27 +307,29 @@ class ModelOrchestratorV2:
                             diverse: bool = True) -> Dict[str, Any]:
         """Call multiple models for consensus"""
         
-        from model_orchestrator import ModelOrchestrator
-        base_orchestrator = ModelOrchestrator()
-        
-        # Get consensus group
-        models = base_orchestrator.create_consensus_group(prompt, num_models, diverse)
-        
-        # Filter to only available providers
-        available_models = [
-            (m_id, m) for m_id, m in models 
-            if m.provider.value in self.api_clients
-        ]
-        
-        if not available_models:
-            raise ValueError("No available models for consensus")
-        
-        # Make parallel calls
-        tasks = []
-        for model_id, model in available_models:
-            tasks.append(self.call_model(model_id, prompt))
-        
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
+        with self.tracer.span("consensus_call", num_models=num_models, diverse=diverse) as span:
+            # Get consensus group
+            models = self.base_orchestrator.create_consensus_group(prompt, num_models, diverse)
+            
+            # Filter to only available providers
+            available_models = [
+                (m_id, m) for m_id, m in models 
+                if m.provider.value in self.api_clients
+            ]
+            
+            if not available_models:
+                raise ValueError("No available models for consensus")
+            
+            # Make parallel calls (each task inherits this span as its parent)
+            tasks = []
+            for model_id, model in available_models:
+                tasks.append(self.call_model(model_id, prompt))
+            
+            responses = await asyncio.gather(*tasks, return_exceptions=True)
+            span.set_attributes({
+                "models": ",".join(m[0] for m in available_models),
+                "errors": sum(isinstance(r, Exception) for r in responses),
+            })
         
         # Process responses
         results = []
@@ -328,66 +381,71 @@ class ModelOrchestratorV2:
         client = self.api_clients[provider]
         
         # Special handling for different providers
-        if provider == 'xai':
-            # Grok streaming
+        if provider == 'xai' and isinstance(client, GrokAPI):
+            # Grok streaming - yield text deltas like the generic path
             async for chunk in client.stream_completion(
                 model_id=model_id,
                 messages=[{"role": "user", "content": prompt}],
                 **kwargs
             ):
-                yield chunk
+                if chunk.get('choices'):
+                    content = chunk['choices'][0].get('delta', {}).get('content')
+                    if content:
+                        yield content
         else:
             # Generic streaming
-            async with client:
-                if hasattr(client, '_stream_completion'):
-                    async for chunk in client._stream_completion(
-                        model=model_id,
-                        messages=[{"role": "user", "content": prompt}],
-                        **kwargs
-                    ):
-                        yield chunk
-                else:
-                    # Fallback to non-streaming
-                    response = await client.chat_completion(
-                        model=model_id,
-                        messages=[{"role": "user", "content": prompt}],
-                        **kwargs
-                    )
-                    yield response.content
+            if hasattr(client, '_stream_completion'):
+                async for chunk in client._stream_completion(
+                    model=model_id,
+                    messages=[{"role": "user", "content": prompt}],
+                    **kwargs
+                ):
+                    yield chunk
+            else:
+                # Fallback to non-streaming
+                response = await client.chat_completion(
+                    model=model_id,
+                    messages=[{"role": "user", "content": prompt}],
+                    **kwargs
+                )
+                yield response.content
     
     def track_usage(self,
                    model_id: str,
                    input_tokens: int,
                    output_tokens: int,
                    latency_ms: int,
-                   success: bool = True):
+                   success: bool = True,
+                   timings: Optional[Dict[str, float]] = None):
         """Track model usage for optimization"""
         
-        from model_orchestrator import ModelOrchestrator
-        base_orchestrator = ModelOrchestrator()
-        
-        # Calculate cost
-        cost = base_orchestrator.estimate_cost(model_id, input_tokens, output_tokens)
-        
-        # Update cost tracker
-        if model_id not in self.cost_tracker:
-            self.cost_tracker[model_id] = 0.0
-        self.cost_tracker[model_id] += cost
-        
-        # Record performance
-        self.performance_history.append({
-            "timestamp": datetime.now().isoformat(),
-            "model_id": model_id,
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-            "cost": cost,
-            "latency_ms": latency_ms,
-            "success": success
-        })
-        
-        # Keep only last 1000 entries to prevent memory issues
-        if len(self.performance_history) > 1000:
-            self.performance_history = self.performance_history[-1000:]
+        # Accumulate per-stage timing totals (dns_ms, ttfb_ms, retry_ms, ...)
+        if timings:
+            totals = self.timing_totals.setdefault(model_id, {"requests": 0})
+            totals["requests"] += 1
+            for stage, ms in timings.items():
+                totals[stage] = totals.get(stage, 0.0) + ms
+        
+        # Cost, aggregates, history and durable log
+        self.base_orchestrator.track_usage(model_id, input_tokens, output_tokens, latency_ms, success,
+                                          timings=timings)
+    
+    @property
+    def performance_history(self) -> List[Dict]:
+        """Recorded usage entries, oldest first"""
+        return self.usage_store.records()
+    
+    def get_cost_report(self) -> Dict[str, Any]:
+        """Cost report from the running aggregates"""
+        return self.usage_aggregates.report()
+    
+    def get_latency_report(self, window: str = "5m", group_by: str = "key") -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 latency, TTFT and tokens/sec over a rolling window (1m, 5m, 1h)"""
+        return self.base_orchestrator.get_latency_report(window, group_by)
+    
+    def get_timing_report(self) -> Dict[str, Dict[str, float]]:
+        """Mean per-request timing breakdown by model (network_ms vs server_ms)"""
+        return timing_report(self.timing_totals)
     
     def get_available_models(self) -> Dict[str, List[str]]:
         """Get list of available models by provider"""
@@ -463,6 +521,9 @@ async def test_orchestrator_v2():
             
         except Exception as e:
             print(f"Consensus call failed: {e}")
+    
+    await orchestrator.close()
 
 if __name__ == "__main__":
+    configure_logging()
     asyncio.run(test_orchestrator_v2())
\ No newline at end of file
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Cached view of Ollama's installed and loaded models
+Reads /api/tags and /api/ps over one pooled HTTP session instead of forking
+the ollama CLI. Each list is cached for a TTL and can be invalidated when a
+model is known to have been loaded or unloaded. On an event loop, reads
+never wait on the network: they return the last snapshot and stale lists
+are refreshed in the background over the async transport.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Union
+
+import requests
+
+from periodic import PeriodicTask
+from transports import Transport, get_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"
+
+GB = 1024 ** 3
+
+# Ollama reports nanosecond timestamps; datetime takes at most microseconds
+_FRACTION = re.compile(r"(\.\d{6})\d+")
+
+
+def running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """The event loop running in this thread, if any (code on it must not block)"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """RFC 3339 timestamp -> epoch seconds (None if missing or unparseable)"""
+    if not value:
+        return None
+    try:
+        value = _FRACTION.sub(r"\1", value.replace("Z", "+00:00"))
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+@dataclass
+class InstalledModel:
+    """One entry from /api/tags"""
+    name: str
+    digest: str
+    size_bytes: int
+    parameter_size: str = ""
+    quantization_level: str = ""
+    family: str = ""
+
+    @property
+    def size_gb(self) -> float:
+        return self.size_bytes / GB
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class LoadedModel:
+    """One entry from /api/ps; size_bytes is resident size, size_vram_bytes the GPU share"""
+    name: str
+    digest: str
+    size_bytes: int
+    size_vram_bytes: int
+    expires_at: Optional[float]
+    context_length: Optional[int] = None
+
+    @property
+    def size_gb(self) -> float:
+        return self.size_bytes / GB
+
+    @property
+    def vram_gb(self) -> float:
+        return self.size_vram_bytes / GB
+
+    @property
+    def ram_gb(self) -> float:
+        """Part of the model held in system RAM rather than VRAM"""
+        return max(self.size_bytes - self.size_vram_bytes, 0) / GB
+
+    def expires_in(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until Ollama unloads the model (None if it never expires)"""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - (now or time.time())
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "size_gb": round(self.size_gb, 2),
+            "vram_gb": round(self.vram_gb, 2),
+            "ram_gb": round(self.ram_gb, 2),
+            "expires_at": self.expires_at,
+            "context_length": self.context_length,
+        }
+
+
+def _parse_tags(data: Dict) -> Dict[str, InstalledModel]:
+    return {
+        entry["name"]: InstalledModel(
+            name=entry["name"],
+            digest=entry.get("digest", ""),
+            size_bytes=entry.get("size", 0),
+            parameter_size=entry.get("details", {}).get("parameter_size", ""),
+            quantization_level=entry.get("details", {}).get("quantization_level", ""),
+            family=entry.get("details", {}).get("family", ""),
+        )
+        for entry in data.get("models", [])
+    }
+
+
+def _parse_ps(data: Dict) -> Dict[str, LoadedModel]:
+    return {
+        entry["name"]: LoadedModel(
+            name=entry["name"],
+            digest=entry.get("digest", ""),
+            size_bytes=entry.get("size", 0),
+            size_vram_bytes=entry.get("size_vram", 0),
+            expires_at=parse_timestamp(entry.get("expires_at")),
+            context_length=entry.get("context_length"),
+        )
+        for entry in data.get("models", [])
+    }
+
+
+class OllamaState:
+    """
+    TTL-cached /api/tags and /api/ps
+
+    The installed list changes rarely and gets a long TTL; the loaded list
+    gets a short one. Call invalidate() after loading or unloading a model.
+    If Ollama is unreachable the last known lists are returned (empty before
+    the first success) and retried after the TTL.
+
+    Off the event loop (scripts, worker threads) a stale read refetches
+    synchronously. On the loop it returns the snapshot at once and schedules
+    a background refresh instead, so routing never waits on Ollama; start()
+    keeps the snapshot fresh ahead of reads.
+    """
+
+    TAGS_TTL = 60.0
+    PS_TTL = 5.0
+
+    def __init__(self,
+                 base_url: Optional[str] = None,
+                 tags_ttl: float = TAGS_TTL,
+                 ps_ttl: float = PS_TTL,
+                 timeout: float = 2.0,
+                 session: Optional[requests.Session] = None,
+                 transport: Union[str, Transport, None] = None):
+        base_url = base_url or os.getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
+        if not base_url.startswith("http"):
+            base_url = f"http://{base_url}"
+        self.base_url = base_url.rstrip("/")
+        self.tags_ttl = tags_ttl
+        self.ps_ttl = ps_ttl
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.transport = transport if isinstance(transport, Transport) else get_transport(transport, timeout=timeout)
+        self.reachable: Optional[bool] = None
+
+        self._installed: Dict[str, InstalledModel] = {}
+        self._loaded: Dict[str, LoadedModel] = {}
+        self._installed_at = float("-inf")
+        self._loaded_at = float("-inf")
+        self._invalidations = 0
+        self._lock = threading.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._periodic = PeriodicTask(self._refresh_stale, lambda: self.ps_ttl, "Ollama state refresh",
+                                      run_first=True)
+
+    def _unavailable(self, path: str, error: Exception):
+        if self.reachable is not False:
+            logger.warning("Ollama %s unavailable: %s", path, error)
+        self.reachable = False
+
+    def _get(self, path: str) -> Optional[Dict]:
+        try:
+            response = self.session.get(f"{self.base_url}{path}", timeout=self.timeout)
+            response.raise_for_status()
+            self.reachable = True
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            self._unavailable(path, e)
+            return None
+
+    async def _aget(self, path: str) -> Optional[Dict]:
+        try:
+            response = await self.transport.request("GET", f"{self.base_url}{path}")
+            if response.status != 200:
+                raise ValueError(f"HTTP {response.status}")
+            data = response.json()
+        except Exception as e:
+            self._unavailable(path, e)
+            return None
+        self.reachable = True
+        return data
+
+    def _installed_stale(self) -> bool:
+        return time.monotonic() - self._installed_at >= self.tags_ttl
+
+    def _loaded_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.ps_ttl
+
+    # ------------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------------
+
+    def installed(self) -> Dict[str, InstalledModel]:
+        """Installed models by name"""
+        if not self._installed_stale() or self._schedule_refresh():
+            return self._installed
+        with self._lock:
+            if self._installed_stale():
+                data = self._get("/api/tags")
+                if data is not None:
+                    self._installed = _parse_tags(data)
+                self._installed_at = time.monotonic()
+        return self._installed
+
+    def loaded(self) -> Dict[str, LoadedModel]:
+        """Models currently resident in Ollama, by name"""
+        if not self._loaded_stale() or self._schedule_refresh():
+            return self._loaded
+        with self._lock:
+            if self._loaded_stale():
+                data = self._get("/api/ps")
+                if data is not None:
+                    self._loaded = _parse_ps(data)
+                self._loaded_at = time.monotonic()
+        return self._loaded
+
+    def is_loaded(self, model: str) -> bool:
+        return model in self.loaded()
+
+    def show(self, model: str) -> Optional[Dict]:
+        """Uncached /api/show for one model (architecture and quantization details)"""
+        try:
+            response = self.session.post(f"{self.base_url}/api/show", json={"model": model}, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Ollama /api/show %s failed: %s", model, e)
+            return None
+
+    # ------------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------------
+
+    async def refresh(self, loaded: bool = True, installed: bool = False):
+        """Refetch the given lists over the async transport"""
+        version = self._invalidations
+        started = time.monotonic()
+        if installed:
+            data = await self._aget("/api/tags")
+            if data is not None:
+                self._installed = _parse_tags(data)
+        if loaded:
+            data = await self._aget("/api/ps")
+            if data is not None:
+                self._loaded = _parse_ps(data)
+        # An invalidate() while fetching means the lists may already be out of date
+        if self._invalidations == version:
+            if installed:
+                self._installed_at = started
+            if loaded:
+                self._loaded_at = started
+
+    async def _refresh_stale(self):
+        installed, loaded = self._installed_stale(), self._loaded_stale()
+        if installed or loaded:
+            await self.refresh(loaded, installed)
+
+    def _schedule_refresh(self) -> bool:
+        """Refresh stale lists in the background if on an event loop; False if not on one"""
+        loop = running_loop()
+        if loop is None:
+            return False
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = loop.create_task(self._refresh_stale())
+        return True
+
+    def start(self):
+        """Keep the lists fresh in the background (requires a running event loop)"""
+        self._periodic.start()
+
+    async def stop(self):
+        """Stop background refreshing and release the async transport"""
+        await self._periodic.stop()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        await self.transport.close()
+
+    # ------------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------------
+
+    def invalidate(self, loaded: bool = True, installed: bool = False):
+        """
+        Mark the given lists stale after a load or unload
+
+        On an event loop the refetch is scheduled in the background;
+        elsewhere it happens on the next read.
+        """
+        if loaded:
+            self._loaded_at = float("-inf")
+        if installed:
+            self._installed_at = float("-inf")
+        self._invalidations += 1
+        self._schedule_refresh()
+
+    def close(self):
+        self.session.close()
+
+
+def format_loaded_table(loaded: Dict[str, LoadedModel]) -> str:
+    """Plain-text table of loaded models, like `ollama ps`"""
+    lines = [f"{'NAME':<28} {'SIZE':>8} {'VRAM':>8} {'UNTIL':>8}"]
+    now = time.time()
+    for model in loaded.values():
+        remaining = model.expires_in(now)
+        until = "forever" if remaining is None else f"{max(remaining, 0):.0f}s"
+        lines.append(f"{model.name:<28} {model.size_gb:>6.1f}GB {model.vram_gb:>6.1f}GB {until:>8}")
+    return "\n".join(lines)
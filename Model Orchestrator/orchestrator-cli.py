@@ -7,6 +7,9 @@ Command-line interface for the intelligent model orchestration system
 import os
 import sys
 import json
+import time
+import signal
+import logging
 import argparse
 import asyncio
 from pathlib import Path
@@ -27,6 +30,9 @@ spec.loader.exec_module(model_orchestrator_module)
 ModelOrchestrator = model_orchestrator_module.ModelOrchestrator
 TaskType = model_orchestrator_module.TaskType
 
+from profiling import SamplingProfiler, stage_timers
+from log_config import configure_logging
+
 try:
     from zen_mcp_bridge import ZenMCPBridge, ModelRouter
 except ImportError:
@@ -202,7 +208,7 @@ Requires Functions: [magenta]{'Yes' if requirements.requires_function_calling el
         # Would make actual API call here
         console.print("\n[dim]Note: Actual API call would be made here[/dim]")
     
-    def show_cost_report(self):
+    def show_cost_report(self, window: str = "5m"):
         """Display cost tracking report"""
         
         report = self.orchestrator.get_cost_report()
@@ -247,6 +253,32 @@ Requires Functions: [magenta]{'Yes' if requirements.requires_function_calling el
                 table.add_row(model_id, str(count), f"${cost:.4f}")
             
             console.print(table)
+        
+        # Latency percentiles over the rolling window
+        latency = self.orchestrator.get_latency_report(window, group_by="model")
+        if latency:
+            table = Table(title=f"Latency (last {window})", show_header=True)
+            table.add_column("Model", style="green")
+            table.add_column("Requests", justify="right", style="cyan")
+            for column in ("p50", "p95", "p99"):
+                table.add_column(f"{column} (ms)", justify="right", style="yellow")
+            table.add_column("TTFT p50 (ms)", justify="right", style="magenta")
+            table.add_column("Tokens/s p50", justify="right", style="blue")
+            
+            for model_id, stats in sorted(latency.items(), key=lambda x: x[1].get("requests", 0), reverse=True):
+                ttft = stats.get("ttft_ms_p50")
+                tokens_per_second = stats.get("tokens_per_second_p50")
+                table.add_row(
+                    model_id,
+                    str(stats.get("requests", 0)),
+                    f"{stats.get('latency_ms_p50', 0):.0f}",
+                    f"{stats.get('latency_ms_p95', 0):.0f}",
+                    f"{stats.get('latency_ms_p99', 0):.0f}",
+                    f"{ttft:.0f}" if ttft is not None else "-",
+                    f"{tokens_per_second:.1f}" if tokens_per_second is not None else "-",
+                )
+            
+            console.print(table)
     
     def create_consensus_group(self, prompt: str, num_models: int = 3):
         """Create a consensus group for the prompt"""
@@ -331,6 +363,54 @@ Requires Functions: [magenta]{'Yes' if requirements.requires_function_calling el
         
         console.print("\n[bold green]Integration test complete![/bold green]")
 
+    def profile(self, output: str, duration: float = 5.0, pid: Optional[int] = None,
+                signal_name: str = "USR2"):
+        """Capture collapsed stacks from a live process, or from a local routing loop"""
+        
+        if pid is not None:
+            # The target must have set ORCHESTRATOR_PROFILE_SIGNAL; it writes into its ORCHESTRATOR_PROFILE_DIR
+            signum = getattr(signal, f"SIG{signal_name}")
+            os.kill(pid, signum)
+            console.print(f"[green]Profiling process {pid} for {duration:g}s...[/green]")
+            time.sleep(duration)
+            os.kill(pid, signum)
+            console.print("[green]✓ Profile written to the target's ORCHESTRATOR_PROFILE_DIR[/green]")
+            return
+        
+        prompts = [
+            "Write a Python function to calculate fibonacci",
+            "Analyze this image and describe what you see",
+            "Reason through this complex math problem step by step",
+            "Translate this text to Spanish",
+        ]
+        
+        # Per-selection info logs would dominate the profile
+        logging.getLogger(model_orchestrator_module.__name__).setLevel(logging.WARNING)
+        stage_timers.reset()
+        stage_timers.enable()
+        profiler = SamplingProfiler(output=output)
+        profiler.start()
+        
+        routed = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            self.orchestrator.select_model(prompts[routed % len(prompts)])
+            routed += 1
+        
+        profiler.stop()
+        stage_timers.disable()
+        
+        table = Table(title=f"Stage Timings ({routed:,} selections in {duration:g}s)", show_header=True)
+        table.add_column("Stage", style="green")
+        table.add_column("Count", justify="right", style="cyan")
+        for column in ("mean", "p50", "p95", "p99"):
+            table.add_column(f"{column} (ms)", justify="right", style="yellow")
+        for stage, stats in self.orchestrator.get_stage_report().items():
+            table.add_row(stage, f"{stats['count']:,}", *(f"{stats[f'{column}_ms']:.4f}"
+                                                         for column in ("mean", "p50", "p95", "p99")))
+        console.print(table)
+        console.print(f"[green]✓ {profiler.samples} stack samples written to {output}[/green]")
+
 async def main():
     """Main CLI entry point"""
     
@@ -364,12 +444,24 @@ async def main():
     
     # Cost report command
     cost_parser = subparsers.add_parser("cost", help="Show cost report")
+    cost_parser.add_argument("--window", choices=["1m", "5m", "1h"], default="5m",
+                            help="Rolling window for latency percentiles")
+    
+    # Profile command
+    profile_parser = subparsers.add_parser("profile", help="Capture a flamegraph profile (collapsed stacks)")
+    profile_parser.add_argument("--output", default="orchestrator.folded",
+                               help="Collapsed-stack output file (local mode)")
+    profile_parser.add_argument("--duration", type=float, default=5.0, help="Seconds to sample")
+    profile_parser.add_argument("--pid", type=int,
+                               help="Toggle the sampling profiler of a running process by signal")
+    profile_parser.add_argument("--signal", default="USR2", help="Signal the target listens on")
     
     # Test command
     test_parser = subparsers.add_parser("test", help="Test integration")
     
     args = parser.parse_args()
     
+    configure_logging()
     cli = OrchestratorCLI()
     
     if not args.command:
@@ -389,7 +481,10 @@ async def main():
         cli.create_consensus_group(args.prompt, args.num)
     
     elif args.command == "cost":
-        cli.show_cost_report()
+        cli.show_cost_report(args.window)
+    
+    elif args.command == "profile":
+        cli.profile(args.output, args.duration, args.pid, args.signal)
     
     elif args.command == "test":
         cli.test_integration()
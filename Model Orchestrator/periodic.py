@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Periodic background tasks
+One asyncio task that awaits a step, sleeps, and repeats, shared by the
+keep-alive, warm set, preloading, eviction and connection refresh loops.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Awaits `step` in the background, sleeping `interval()` seconds between runs
+
+    The interval is read again before every sleep, so a step can change it.
+    The first run comes after one interval, or straight away with
+    `run_first`. A failing step is logged and the loop carries on.
+    """
+
+    def __init__(self,
+                 step: Callable[[], Awaitable],
+                 interval: Callable[[], float],
+                 name: str,
+                 run_first: bool = False):
+        self.step = step
+        self.interval = interval
+        self.name = name
+        self.run_first = run_first
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _run(self):
+        if not self.run_first:
+            await asyncio.sleep(self.interval())
+        while True:
+            try:
+                await self.step()
+            except Exception as e:
+                logger.warning("%s failed: %s", self.name, e)
+            await asyncio.sleep(self.interval())
+
+    def start(self):
+        """Start the loop (requires a running event loop); no-op if already running"""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the loop and wait for it to finish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
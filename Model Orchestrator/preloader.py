@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Predictive preloading of local models
+Watches the rolling mix of routed task types and announced queued work,
+and loads the local models those tasks will route to before they arrive.
+Preloads that stop being predicted are cancelled, or unloaded if unused.
+"""
+
+import time
+import asyncio
+import logging
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional
+
+from periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+def _task_name(task_type) -> str:
+    """TaskType enum or plain string"""
+    return getattr(task_type, "value", task_type)
+
+
+class Preloader:
+    """
+    Loads local models ahead of predicted demand, within RAM headroom
+
+    Expected requests per model over the next `horizon` seconds come from
+    two signals: the task types routed in the last `window` seconds (see
+    observe()), and work announced as queued (see enqueue()/dequeue()).
+    `route` maps a task type to the local model it would use. Models
+    expected to get at least `min_requests` are loaded, most wanted first,
+    while they fit in RAMMonitor.get_model_budget_gb(). Preloads carry a
+    short `preload_keep_alive` so an unused one expires on its own. When a
+    model drops out of the prediction, an in-flight preload is cancelled
+    and a finished one is unloaded unless it has served traffic since.
+    Models in the keep-alive set are left to the KeepAliveService.
+    """
+
+    INTERVAL = 5.0
+    WINDOW = 120.0
+    HORIZON = 60.0
+    MIN_REQUESTS = 1.0
+    PRELOAD_KEEP_ALIVE = 300.0
+
+    def __init__(self,
+                 manager,
+                 keep_alive,
+                 route: Optional[Callable[[str], Optional[str]]] = None,
+                 interval: float = INTERVAL,
+                 window: float = WINDOW,
+                 horizon: float = HORIZON,
+                 min_requests: float = MIN_REQUESTS,
+                 preload_keep_alive: float = PRELOAD_KEEP_ALIVE):
+        """
+        Args:
+            manager: LocalModelManager (residency, sizes, RAM budget, demand)
+            keep_alive: KeepAliveService used to load and unload
+            route: Task type name -> local model (defaults to the manager's
+                first known recommendation for the task)
+        """
+        self.manager = manager
+        self.keep_alive = keep_alive
+        self.route = route or self._default_route
+        self.interval = interval
+        self.window = window
+        self.horizon = horizon
+        self.min_requests = min_requests
+        self.preload_keep_alive = preload_keep_alive
+
+        self.recent: deque = deque()  # (monotonic time, task name)
+        self.queued: Counter = Counter()
+        self.preloaded: Dict[str, float] = {}  # model -> monotonic time the preload started
+        self.stats = {"preloads": 0, "cancelled": 0, "unloaded": 0}
+
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._periodic = PeriodicTask(self.evaluate, lambda: self.interval, "Preload evaluation")
+
+    def _default_route(self, task: str) -> Optional[str]:
+        for model in self.manager.get_recommended_models_for_task(task):
+            if self.manager.get_model_size(model) is not None:
+                return model
+        return None
+
+    # ------------------------------------------------------------------------
+    # Signals
+    # ------------------------------------------------------------------------
+
+    def observe(self, task_type, now: Optional[float] = None):
+        """Note that a request of this task type was just routed"""
+        now = time.monotonic() if now is None else now
+        self.recent.append((now, _task_name(task_type)))
+
+    def enqueue(self, task_type, count: int = 1):
+        """Announce work of this task type that will be routed soon"""
+        self.queued[_task_name(task_type)] += count
+
+    def dequeue(self, task_type, count: int = 1):
+        """Queued work started (or was dropped)"""
+        task = _task_name(task_type)
+        self.queued[task] = max(0, self.queued[task] - count)
+        if not self.queued[task]:
+            del self.queued[task]
+
+    # ------------------------------------------------------------------------
+    # Prediction
+    # ------------------------------------------------------------------------
+
+    def predict(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Local model -> requests expected within the horizon"""
+        now = time.monotonic() if now is None else now
+        while self.recent and now - self.recent[0][0] > self.window:
+            self.recent.popleft()
+
+        expected = Counter()
+        for _, task in self.recent:
+            expected[task] += self.horizon / self.window
+        expected.update(self.queued)
+
+        by_model: Dict[str, float] = {}
+        for task, count in expected.items():
+            model = self.route(task)
+            if model is not None:
+                by_model[model] = by_model.get(model, 0.0) + count
+        return by_model
+
+    def plan(self,
+             now: Optional[float] = None,
+             predicted: Optional[Dict[str, float]] = None,
+             inflight: Optional[List[str]] = None,
+             pinned: Optional[List[str]] = None) -> List[str]:
+        """
+        Models to preload or keep preloaded, most wanted first, within the RAM budget
+
+        `predicted`, `inflight` and `pinned` are snapshots taken on the event
+        loop when planning runs in a worker thread; by default they are read
+        from this preloader and its keep-alive service.
+        """
+        predicted = self.predict(now) if predicted is None else predicted
+        inflight = list(self._inflight) if inflight is None else inflight
+        pinned = list(self.keep_alive.models) if pinned is None else pinned
+        wanted = sorted((m for m, n in predicted.items() if n >= self.min_requests),
+                        key=predicted.get, reverse=True)
+
+        # Loads still in flight have not shown up in available RAM yet
+        headroom = self.manager.ram_monitor.get_model_budget_gb()
+        headroom -= sum(self.manager.get_model_size(m) or 0.0 for m in inflight)
+
+        chosen = []
+        for model in wanted:
+            if model in inflight:
+                chosen.append(model)
+                continue
+            if model in pinned:
+                continue
+            if self.manager.is_resident(model):
+                if model in self.preloaded:
+                    chosen.append(model)
+                continue
+            size = self.manager.get_model_size(model)
+            if size is not None and size <= headroom:
+                chosen.append(model)
+                headroom -= size
+        return chosen
+
+    # ------------------------------------------------------------------------
+    # Actions
+    # ------------------------------------------------------------------------
+
+    async def _preload(self, model: str):
+        try:
+            if await self.keep_alive.preload(model, self.preload_keep_alive):
+                self.stats["preloads"] += 1
+                self.manager.ollama.invalidate()
+                logger.info("✓ Preloaded %s", model)
+            else:
+                self.preloaded.pop(model, None)
+        finally:
+            if self._inflight.get(model) is asyncio.current_task():
+                del self._inflight[model]
+
+    def _used_since_preload(self, model: str) -> bool:
+        last_seen = self.manager.demand.last_seen(model)
+        return last_seen is not None and last_seen >= self.preloaded[model]
+
+    def _decide(self, predicted: Dict[str, float], inflight: List[str], pinned: List[str]):
+        return (self.plan(predicted=predicted, inflight=inflight, pinned=pinned),
+                set(self.manager.get_loaded_models()))
+
+    async def evaluate(self) -> List[str]:
+        """Start preloads for the plan and retire stale ones; returns models started"""
+        # Planning reads RAM and Ollama state, so it runs off the loop, on
+        # snapshots of the state the loop keeps changing
+        chosen, loaded = await asyncio.to_thread(
+            self._decide, self.predict(), list(self._inflight), list(self.keep_alive.models))
+
+        for model in list(self._inflight):
+            if model not in chosen:
+                self._inflight.pop(model).cancel()
+                self.stats["cancelled"] += 1
+                logger.info("Cancelled preload of %s", model)
+
+        for model in list(self.preloaded):
+            if model in chosen or model in self._inflight:
+                continue
+            if (model in loaded and model not in self.keep_alive.models
+                    and not self._used_since_preload(model)):
+                if await self.keep_alive.unload(model):
+                    self.stats["unloaded"] += 1
+                    self.manager.ollama.invalidate()
+                    logger.info("Unloaded unused preload %s", model)
+            del self.preloaded[model]
+
+        started = []
+        loop = asyncio.get_running_loop()
+        for model in chosen:
+            if model in self._inflight or model in loaded:
+                continue
+            self.preloaded[model] = time.monotonic()
+            self._inflight[model] = loop.create_task(self._preload(model))
+            started.append(model)
+        return started
+
+    def start(self):
+        """Re-evaluate in the background (requires a running event loop)"""
+        self._periodic.start()
+
+    async def stop(self):
+        """Stop evaluating and cancel in-flight preloads"""
+        await self._periodic.stop()
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
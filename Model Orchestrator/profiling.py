@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Hot-path profiling for Model Orchestrator
+Per-stage timers folded into quantile sketches, and an on-demand sampling
+profiler that writes collapsed stacks (flamegraph.pl / speedscope input).
+Call sites check `stage_timers.enabled` before reading the clock, so timing
+costs one attribute check while profiling is off.
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import threading
+from collections import deque, Counter
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from latency_sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+# "1" to time stages from startup
+PROFILE_STAGES_ENV_VAR = "ORCHESTRATOR_PROFILE_STAGES"
+# Signal name (e.g. "USR2") that starts/stops the sampling profiler
+PROFILE_SIGNAL_ENV_VAR = "ORCHESTRATOR_PROFILE_SIGNAL"
+# Where signal-triggered profiles are written (default: working directory)
+PROFILE_DIR_ENV_VAR = "ORCHESTRATOR_PROFILE_DIR"
+
+
+# ============================================================================
+# Stage Timers
+# ============================================================================
+
+class StageTimers:
+    """
+    Per-stage latency histograms
+
+    record() only appends the elapsed nanoseconds to a per-stage queue;
+    samples are folded into a QuantileSketch (in microseconds, so sub-µs
+    stages like score_model stay above the sketch's zero bucket) once
+    FOLD_AT are pending or when a report is taken.
+    """
+
+    FOLD_AT = 4096
+
+    def __init__(self):
+        self.enabled = False
+        self._pending: Dict[str, deque] = {}
+        self._sketches: Dict[str, QuantileSketch] = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def record(self, stage: str, elapsed_ns: int):
+        """Record one pass through `stage`"""
+        pending = self._pending.get(stage)
+        if pending is None:
+            pending = self._pending.setdefault(stage, deque())
+        pending.append(elapsed_ns)
+        if len(pending) >= self.FOLD_AT:
+            self._fold(stage)
+
+    def _fold(self, stage: str):
+        with self._lock:
+            pending = self._pending[stage]
+            sketch = self._sketches.get(stage)
+            if sketch is None:
+                sketch = self._sketches[stage] = QuantileSketch()
+            while pending:
+                sketch.add(pending.popleft() / 1e3)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and p50/p95/p99/max in ms per stage"""
+        for stage in list(self._pending):
+            self._fold(stage)
+
+        report = {}
+        with self._lock:
+            for stage, sketch in sorted(self._sketches.items()):
+                report[stage] = {
+                    "count": sketch.count,
+                    "total_ms": sketch.total / 1e3,
+                    "mean_ms": sketch.mean / 1e3,
+                    "p50_ms": sketch.quantile(0.5) / 1e3,
+                    "p95_ms": sketch.quantile(0.95) / 1e3,
+                    "p99_ms": sketch.quantile(0.99) / 1e3,
+                    "max_ms": sketch.max / 1e3,
+                }
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._sketches.clear()
+
+
+# Process-wide: stages run in the orchestrators and in the API clients
+stage_timers = StageTimers()
+
+
+# ============================================================================
+# Sampling Profiler
+# ============================================================================
+
+class SamplingProfiler:
+    """
+    Samples the Python stack of every thread on a fixed interval
+
+    Stacks are aggregated as collapsed lines ("thread;outer;...;inner count"),
+    the input format of flamegraph.pl, inferno and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005, output: Optional[Union[str, Path]] = None):
+        self.interval = interval
+        self.output = Path(output) if output else None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stop sampling and write the output file, if one was given"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            if self.output is not None:
+                self.write(self.output)
+        return self.stacks
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed())
+        logger.info("✓ Profile written: %s (%d samples)", path, self.samples)
+
+
+_signal_profiler: Optional[SamplingProfiler] = None
+
+
+def install_signal_toggle(signum: int = signal.SIGUSR2,
+                          directory: Union[str, Path] = ".",
+                          interval: float = 0.005) -> bool:
+    """
+    Start/stop a sampling profiler each time `signum` is received
+
+    Each stop writes orchestrator-<pid>-<time>.folded into `directory`. Must be
+    called from the main thread; returns False if the handler can't be set.
+    """
+    directory = Path(directory)
+
+    def _toggle(received, frame):
+        global _signal_profiler
+        if _signal_profiler is not None and _signal_profiler.running:
+            # Join and write off the signal handler
+            threading.Thread(target=_signal_profiler.stop, name="profile-writer").start()
+            return
+        output = directory / f"orchestrator-{os.getpid()}-{int(time.time())}.folded"
+        _signal_profiler = SamplingProfiler(interval, output)
+        _signal_profiler.start()
+        logger.info("Sampling profiler started, send %s again to write %s", signal.Signals(received).name, output)
+
+    try:
+        signal.signal(signum, _toggle)
+    except ValueError as e:
+        logger.warning("Profiler signal handler not installed: %s", e)
+        return False
+    return True
+
+
+def configure_profiling():
+    """Apply $ORCHESTRATOR_PROFILE_STAGES and $ORCHESTRATOR_PROFILE_SIGNAL"""
+    if os.getenv(PROFILE_STAGES_ENV_VAR) == "1":
+        stage_timers.enable()
+
+    name = os.getenv(PROFILE_SIGNAL_ENV_VAR)
+    if name:
+        signum = getattr(signal, name if name.startswith("SIG") else f"SIG{name}", None)
+        if signum is None:
+            logger.warning("Unknown profiler signal: %s", name)
+        else:
+            install_signal_toggle(signum, os.getenv(PROFILE_DIR_ENV_VAR, "."))
@@ -2,14 +2,31 @@
 """
 RAM Monitoring Module for Model Orchestrator
 Provides real-time RAM usage tracking and model capacity recommendations
+
+On Linux, memory is read straight from /proc and the cgroup filesystem, so a
+container sees its own limit rather than the host's RAM. macOS uses sysctl
+and vm_stat.
 """
 
+import time
+import atexit
+import threading
 import subprocess
 import json
+from collections import deque
+from pathlib import Path
 from typing import Dict, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from enum import Enum
 
+GB = 1024 ** 3
+
+# Seconds between background RAM samples in LocalModelManager ("0" disables)
+RAM_SAMPLE_INTERVAL_ENV_VAR = "ORCHESTRATOR_RAM_SAMPLE_INTERVAL"
+
+# cgroup v1 reports "no limit" as a page-aligned LONG_MAX
+_CGROUP_V1_UNLIMITED = 1 << 62
+
 
 class RAMTier(Enum):
     """System RAM tier classification"""
@@ -18,6 +35,22 @@ class RAMTier(Enum):
     TIER_64GB = "64GB+"
 
 
+@dataclass
+class MemoryPressure:
+    """Linux PSI memory stall percentages (share of wall time)"""
+    some_avg10: float = 0.0
+    some_avg60: float = 0.0
+    some_avg300: float = 0.0
+    full_avg10: float = 0.0
+    full_avg60: float = 0.0
+    full_avg300: float = 0.0
+    some_total_us: int = 0
+    full_total_us: int = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
 @dataclass
 class RAMStatus:
     """Current RAM status"""
@@ -27,6 +60,7 @@ class RAMStatus:
     available_gb: float
     utilization_percent: float
     tier: RAMTier
+    pressure: Optional[MemoryPressure] = None
 
     def to_dict(self) -> Dict:
         return {
@@ -36,9 +70,20 @@ class RAMStatus:
             "available_gb": round(self.available_gb, 2),
             "utilization_percent": round(self.utilization_percent, 1),
             "tier": self.tier.value,
+            "pressure": self.pressure.to_dict() if self.pressure is not None else None,
         }
 
 
+@dataclass
+class MemorySample:
+    """Raw memory reading from a backend, in bytes"""
+    total: int
+    free: int
+    available: int
+    used: Optional[int] = None  # Defaults to total - available
+    pressure: Optional[MemoryPressure] = None
+
+
 @dataclass
 class ModelCapacity:
     """Model loading capacity recommendations"""
@@ -48,16 +93,177 @@ class ModelCapacity:
     total_ram_budget_gb: float
 
 
-class RAMMonitor:
-    """Monitor system RAM and provide model capacity recommendations"""
+# ============================================================================
+# Backends
+# ============================================================================
+
+def _read_int(path: Path) -> Optional[int]:
+    try:
+        return int(path.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_keyed(path: Path) -> Dict[str, int]:
+    """Parse "key value" lines (memory.stat) or "Key: value kB" (meminfo)"""
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2:
+                    try:
+                        value = int(parts[1])
+                    except ValueError:
+                        continue
+                    if len(parts) > 2 and parts[2] == "kB":
+                        value *= 1024
+                    values[parts[0].rstrip(":")] = value
+    except OSError:
+        pass
+    return values
+
+
+def _read_pressure(path: Path) -> Optional[MemoryPressure]:
+    """Parse a PSI file: "some avg10=0.00 avg60=0.00 avg300=0.00 total=0" """
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    pressure = MemoryPressure()
+    for line in lines:
+        kind, _, fields = line.partition(" ")
+        if kind not in ("some", "full"):
+            continue
+        for field in fields.split():
+            key, _, value = field.partition("=")
+            if key == "total":
+                setattr(pressure, f"{kind}_total_us", int(value))
+            elif key in ("avg10", "avg60", "avg300"):
+                setattr(pressure, f"{kind}_{key}", float(value))
+    return pressure
+
+
+class LinuxMemoryBackend:
+    """
+    Reads /proc/meminfo, the process's cgroup (v1 or v2) and PSI
+
+    Total is the smaller of MemTotal and the cgroup limit. Available is the
+    smaller of MemAvailable and the limit minus the cgroup's non-reclaimable
+    usage (usage less inactive page cache). Cgroup paths are resolved once;
+    each sample is a handful of small file reads.
+    """
+
+    def __init__(self, proc_root: str = "/proc", cgroup_root: str = "/sys/fs/cgroup"):
+        self.proc_root = Path(proc_root)
+        self.cgroup_root = Path(cgroup_root)
+        self.cgroup_version: Optional[int] = None
+        self.cgroup_dirs: list = []  # Innermost first; v2 limits apply from every ancestor
+        self._resolve_cgroup()
+
+    @staticmethod
+    def available() -> bool:
+        return Path("/proc/meminfo").exists()
+
+    def _resolve_cgroup(self):
+        try:
+            entries = (self.proc_root / "self" / "cgroup").read_text().splitlines()
+        except OSError:
+            return
+
+        v1_path = v2_path = None
+        for entry in entries:
+            _, controllers, path = entry.split(":", 2)
+            if "memory" in controllers.split(","):
+                v1_path = path
+            elif controllers == "":
+                v2_path = path
+
+        if v1_path is not None:
+            # Containers usually mount their own cgroup at the memory root
+            for base in (self.cgroup_root / "memory" / v1_path.lstrip("/"), self.cgroup_root / "memory"):
+                if (base / "memory.usage_in_bytes").exists():
+                    self.cgroup_version = 1
+                    self.cgroup_dirs = [base]
+                    return
+
+        if v2_path is not None and (self.cgroup_root / "cgroup.controllers").exists():
+            leaf = self.cgroup_root / v2_path.lstrip("/")
+            if not leaf.exists():
+                leaf = self.cgroup_root
+            dirs = [leaf, *leaf.parents]
+            self.cgroup_version = 2
+            self.cgroup_dirs = [d for d in dirs if d == self.cgroup_root or self.cgroup_root in d.parents]
+
+    def _cgroup_budget(self) -> Tuple[Optional[int], Optional[int]]:
+        """Return (limit, non-reclaimable usage) in bytes, or None where unlimited/unknown"""
+        if not self.cgroup_dirs:
+            return None, None
+
+        leaf = self.cgroup_dirs[0]
+        if self.cgroup_version == 1:
+            limit = _read_int(leaf / "memory.limit_in_bytes")
+            if limit is not None and limit >= _CGROUP_V1_UNLIMITED:
+                limit = None
+            usage_file, inactive_key = "memory.usage_in_bytes", "total_inactive_file"
+        else:
+            # "max" (unlimited) fails int() and is skipped
+            limits = [_read_int(d / "memory.max") for d in self.cgroup_dirs]
+            limits = [l for l in limits if l is not None]
+            limit = min(limits) if limits else None
+            usage_file, inactive_key = "memory.current", "inactive_file"
+
+        # Unlimited: the host numbers already apply, skip the memory.stat parse
+        if limit is None:
+            return None, None
+
+        usage = _read_int(leaf / usage_file)
+        if usage is not None:
+            inactive = _read_keyed(leaf / "memory.stat").get(inactive_key, 0)
+            usage = max(usage - inactive, 0)
+        return limit, usage
+
+    def read_pressure(self) -> Optional[MemoryPressure]:
+        """Cgroup PSI when the cgroup exposes it, else system-wide"""
+        if self.cgroup_version == 2:
+            pressure = _read_pressure(self.cgroup_dirs[0] / "memory.pressure")
+            if pressure is not None:
+                return pressure
+        return _read_pressure(self.proc_root / "pressure" / "memory")
+
+    def total_bytes(self) -> int:
+        total = _read_keyed(self.proc_root / "meminfo").get("MemTotal", 0)
+        limit, _ = self._cgroup_budget()
+        return min(total, limit) if limit is not None and total else total
+
+    def sample(self) -> MemorySample:
+        meminfo = _read_keyed(self.proc_root / "meminfo")
+        total = meminfo["MemTotal"]
+        free = meminfo.get("MemFree", 0)
+        available = meminfo.get("MemAvailable", free)
+
+        limit, usage = self._cgroup_budget()
+        if limit is not None and limit < total:
+            total = limit
+            free = min(free, limit)
+            if usage is not None:
+                available = min(available, max(limit - usage, 0))
+            available = min(available, limit)
+
+        return MemorySample(total=total, free=free, available=available,
+                            pressure=self.read_pressure())
+
+
+class MacMemoryBackend:
+    """sysctl hw.memsize and vm_stat page counts"""
 
     def __init__(self):
-        self.total_ram = self._get_total_ram()
-        self.tier = self._determine_tier()
+        self._total: Optional[int] = None
 
-    def _get_total_ram(self) -> float:
-        """Get total system RAM in GB"""
-        try:
+    def total_bytes(self) -> int:
+        if self._total is None:
             result = subprocess.run(
                 ["sysctl", "hw.memsize"],
                 capture_output=True,
@@ -65,8 +271,170 @@ class RAMMonitor:
                 check=True
             )
             # Parse: hw.memsize: 38654705664
-            memsize = int(result.stdout.split(':')[1].strip())
-            return memsize / (1024 ** 3)  # Convert to GB
+            self._total = int(result.stdout.split(':')[1].strip())
+        return self._total
+
+    def sample(self) -> MemorySample:
+        result = subprocess.run(
+            ["vm_stat"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+
+        # Parse vm_stat output
+        lines = result.stdout.split("\n")
+        pages = {}
+
+        for line in lines:
+            if "Pages" in line and ":" in line:
+                parts = line.split()
+                if len(parts) >= 2:
+                    key = parts[1].rstrip(":")
+                    value = parts[2].rstrip(".")
+                    try:
+                        pages[key] = int(value)
+                    except ValueError:
+                        pass
+
+        # Calculate RAM usage (page size = 4096 bytes)
+        page_size = 4096
+        active = pages.get("active", 0)
+        wired = pages.get("wired", 0)
+        free = pages.get("free", 0)
+        inactive = pages.get("inactive", 0)
+
+        return MemorySample(
+            total=self.total_bytes(),
+            free=free * page_size,
+            available=(free + inactive) * page_size,
+            used=(active + wired) * page_size,
+        )
+
+
+def default_backend():
+    """Linux backend when /proc/meminfo exists, else macOS"""
+    if LinuxMemoryBackend.available():
+        return LinuxMemoryBackend()
+    return MacMemoryBackend()
+
+
+# ============================================================================
+# Background Sampler
+# ============================================================================
+
+class RAMSampler:
+    """
+    Refreshes RAM status on a background thread into a ring buffer
+
+    `latest` is replaced wholesale on each sample, so readers get the most
+    recent RAMStatus with a single attribute load. The buffer keeps the last
+    `history` samples for trend queries.
+    """
+
+    INTERVAL = 1.0
+    HISTORY = 60
+
+    def __init__(self, monitor: "RAMMonitor", interval: float = INTERVAL, history: int = HISTORY):
+        self.monitor = monitor
+        self.interval = interval
+        self.history: deque = deque(maxlen=history)  # (monotonic time, RAMStatus)
+        self.latest: RAMStatus = self.sample_now()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample_now(self) -> RAMStatus:
+        """Take a sample immediately (also called by the thread)"""
+        status = self.monitor.get_current_status()
+        self.history.append((time.monotonic(), status))
+        self.latest = status
+        return status
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample_now()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ram-sampler", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.stop)
+
+    def available_slope(self, window: Optional[float] = None) -> float:
+        """
+        Least-squares trend of available RAM in GB/s (negative = shrinking)
+
+        Args:
+            window: Only use samples from the last `window` seconds
+        """
+        samples = list(self.history)
+        if window is not None and samples:
+            cutoff = samples[-1][0] - window
+            samples = [(t, st) for t, st in samples if t >= cutoff]
+        if len(samples) < 2:
+            return 0.0
+
+        n = len(samples)
+        mean_t = sum(t for t, _ in samples) / n
+        mean_a = sum(st.available_gb for _, st in samples) / n
+        var_t = sum((t - mean_t) ** 2 for t, _ in samples)
+        if var_t == 0:
+            return 0.0
+        return sum((t - mean_t) * (st.available_gb - mean_a) for t, st in samples) / var_t
+
+
+# ============================================================================
+# RAM Monitor
+# ============================================================================
+
+class RAMMonitor:
+    """Monitor system RAM and provide model capacity recommendations"""
+
+    # Kept free for the OS and other processes
+    SYSTEM_RESERVE_GB = 8.0
+
+    def __init__(self, backend=None):
+        self.backend = backend or default_backend()
+        self.total_ram = self._get_total_ram()
+        self.tier = self._determine_tier()
+        self.sampler: Optional[RAMSampler] = None
+
+    def start_sampler(self, interval: float = RAMSampler.INTERVAL, history: int = RAMSampler.HISTORY) -> RAMSampler:
+        """Sample in the background; capacity checks then read the latest snapshot"""
+        if self.sampler is None:
+            self.sampler = RAMSampler(self, interval, history)
+        self.sampler.start()
+        return self.sampler
+
+    def stop_sampler(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
+
+    def get_status(self) -> RAMStatus:
+        """Latest background sample, or a fresh reading if no sampler runs"""
+        sampler = self.sampler
+        if sampler is not None:
+            return sampler.latest
+        return self.get_current_status()
+
+    def _get_total_ram(self) -> float:
+        """Get total system (or cgroup) RAM in GB"""
+        try:
+            return self.backend.total_bytes() / GB
         except Exception:
             return 0.0
 
@@ -82,47 +450,20 @@ class RAMMonitor:
     def get_current_status(self) -> RAMStatus:
         """Get current RAM usage status"""
         try:
-            result = subprocess.run(
-                ["vm_stat"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-            # Parse vm_stat output
-            lines = result.stdout.split("\n")
-            pages = {}
-
-            for line in lines:
-                if "Pages" in line and ":" in line:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        key = parts[1].rstrip(":")
-                        value = parts[2].rstrip(".")
-                        try:
-                            pages[key] = int(value)
-                        except ValueError:
-                            pass
-
-            # Calculate RAM usage (page size = 4096 bytes)
-            page_size = 4096
-            active = pages.get("active", 0)
-            wired = pages.get("wired", 0)
-            free = pages.get("free", 0)
-            inactive = pages.get("inactive", 0)
-
-            used_gb = (active + wired) * page_size / (1024 ** 3)
-            free_gb = free * page_size / (1024 ** 3)
-            available_gb = (free + inactive) * page_size / (1024 ** 3)
-            utilization = (used_gb / self.total_ram) * 100 if self.total_ram > 0 else 0
+            sample = self.backend.sample()
+            total_gb = sample.total / GB
+            available_gb = sample.available / GB
+            used_gb = sample.used / GB if sample.used is not None else total_gb - available_gb
+            utilization = (used_gb / total_gb) * 100 if total_gb > 0 else 0
 
             return RAMStatus(
-                total_gb=self.total_ram,
+                total_gb=total_gb,
                 used_gb=used_gb,
-                free_gb=free_gb,
+                free_gb=sample.free / GB,
                 available_gb=available_gb,
                 utilization_percent=utilization,
-                tier=self.tier
+                tier=self.tier,
+                pressure=sample.pressure
             )
 
         except Exception as e:
@@ -138,8 +479,6 @@ class RAMMonitor:
 
     def get_model_capacity(self) -> ModelCapacity:
         """Get recommended model capacity for current tier"""
-        status = self.get_current_status()
-
         if self.tier == RAMTier.TIER_64GB:
             return ModelCapacity(
                 tier=self.tier,
@@ -197,10 +536,10 @@ class RAMMonitor:
         Returns:
             Tuple of (can_load, reason)
         """
-        status = self.get_current_status()
+        status = self.get_status()
 
         # Reserve 8GB for system
-        available_for_models = status.available_gb - 8.0
+        available_for_models = status.available_gb - self.SYSTEM_RESERVE_GB
 
         if available_for_models < model_size_gb:
             return False, f"Insufficient RAM: {available_for_models:.1f}GB available, {model_size_gb:.1f}GB needed"
@@ -210,6 +549,18 @@ class RAMMonitor:
 
         return True, "RAM available"
 
+    def get_model_budget_gb(self, reclaimable_gb: float = 0.0) -> float:
+        """
+        RAM that local models may occupy in total
+
+        Args:
+            reclaimable_gb: Memory already held by loaded models, which
+                would be freed if they were swapped for others
+        """
+        status = self.get_status()
+        budget = status.available_gb + reclaimable_gb - self.SYSTEM_RESERVE_GB
+        return max(0.0, min(budget, self.get_model_capacity().total_ram_budget_gb))
+
     def get_recommended_keep_alive_models(self) -> list:
         """Get recommended models for keep-alive based on tier and usage"""
         if self.tier == RAMTier.TIER_64GB:
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Shared fakes for the local model tests
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ollama_state import LoadedModel, GB
+from warm_set import DemandTracker, LoadTimes
+
+# Model sizes in GB known to every fake
+SIZES = {"small:1b": 1.0, "code:7b": 4.0, "chat:8b": 5.0, "big:32b": 19.0}
+
+
+class FakeState:
+    """OllamaState stand-in with settable models and counted /api/show calls and invalidations"""
+
+    def __init__(self, installed=None, loaded=None, show=None):
+        self.shows = 0
+        self.invalidated = 0
+        self._show = show
+        self._installed = dict(installed or {})
+        self._loaded = dict(loaded or {})
+
+    def set_loaded(self, names):
+        self._loaded = {name: LoadedModel(name, "", int(SIZES[name] * GB), 0, None) for name in names}
+
+    def installed(self):
+        return self._installed
+
+    def loaded(self):
+        return self._loaded
+
+    def show(self, model):
+        self.shows += 1
+        return self._show
+
+    def invalidate(self):
+        self.invalidated += 1
+
+
+class FakeKeepAlive:
+    """KeepAliveService stand-in recording set changes, preloads and unloads"""
+
+    def __init__(self, models=(), loaded=None):
+        self.models = list(models)
+        self.loaded = loaded if loaded is not None else set()
+        self.load_ms = {}
+        self.preloads = []
+        self.unloaded = []
+        # Clear to hold preloads open
+        self.release = asyncio.Event()
+        self.release.set()
+
+    def set_models(self, models):
+        self.models = list(models)
+
+    async def preload(self, model, keep_alive):
+        self.preloads.append(model)
+        await self.release.wait()
+        self.loaded.add(model)
+        return True
+
+    async def unload(self, model):
+        self.unloaded.append(model)
+        self.loaded.discard(model)
+        return True
+
+
+class FakeManager:
+    """LocalModelManager stand-in over SIZES with a mutable loaded set"""
+
+    def __init__(self, loaded=(), budget_gb=10.0, available_gb=16.0, pressure=None, slope=None):
+        self.loaded = set(loaded)
+        self.demand = DemandTracker(half_life=100)
+        self.load_times = LoadTimes()
+        self.ollama = FakeState()
+
+        status = SimpleNamespace(available_gb=available_gb, pressure=pressure)
+        sampler = None
+        if slope is not None:
+            sampler = SimpleNamespace(available_slope=lambda window: slope, sample_now=lambda: status)
+        self.ram_monitor = SimpleNamespace(
+            get_status=lambda: status,
+            get_model_budget_gb=lambda loaded_gb=0.0: budget_gb,
+            sampler=sampler,
+        )
+
+    def get_model_size(self, model):
+        return SIZES.get(model)
+
+    def is_resident(self, model):
+        return model in self.loaded
+
+    def get_loaded_models(self):
+        return list(self.loaded)
+
+    def get_loaded_model_details(self):
+        return {name: LoadedModel(name, "", int(SIZES[name] * GB), 0, None) for name in self.loaded}
+
+
+@pytest.fixture
+def model_sizes():
+    return SIZES
+
+
+@pytest.fixture
+def make_state():
+    return FakeState
+
+
+@pytest.fixture
+def make_keep_alive():
+    return FakeKeepAlive
+
+
+@pytest.fixture
+def make_manager():
+    return FakeManager
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Unit tests for local model admission control
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from admission import AdmissionController, AdmissionRejected, ModelGate
+
+
+async def _hold(controller, model, order, name, release, priority=0):
+    async with controller.slot(model, priority) as waited_ms:
+        order.append(name)
+        await release.wait()
+    return waited_ms
+
+
+# ============================================================================
+# Admission Tests
+# ============================================================================
+
+class TestAdmission:
+    """Test slots, queue order, rejection and wait estimates"""
+
+    def test_slots_from_env(self, monkeypatch):
+        """Test OLLAMA_NUM_PARALLEL sets the default slots, with per-model overrides"""
+        monkeypatch.setenv("OLLAMA_NUM_PARALLEL", "4")
+        controller = AdmissionController(model_slots={"big:32b": 1})
+
+        assert controller.gate("code:7b").slots == 4
+        assert controller.gate("big:32b").slots == 1
+        assert controller.expected_wait_ms("unused:1b") == 0
+
+    def test_expected_wait(self):
+        """Test the wait counts slot turnovers ahead of a new request"""
+        gate = ModelGate("code:7b", slots=2, max_queue=8)
+        gate.service_ms = 1000.0
+
+        gate.in_flight = 1
+        assert gate.expected_wait_ms() == 0
+        gate.in_flight = 2
+        assert gate.expected_wait_ms() == 1000
+        gate._waiters = [None] * 2
+        assert gate.expected_wait_ms() == 2000
+
+    @pytest.mark.asyncio
+    async def test_priority_then_fifo(self):
+        """Test queued requests get the slot lowest priority first, FIFO within a priority"""
+        controller = AdmissionController(slots=1, max_wait_ms=None)
+        order, release = [], asyncio.Event()
+
+        tasks = [asyncio.create_task(_hold(controller, "code:7b", order, "first", release))]
+        await asyncio.sleep(0)
+        for name, priority in (("low-a", 5), ("high", 0), ("low-b", 5)):
+            tasks.append(asyncio.create_task(_hold(controller, "code:7b", order, name, release, priority)))
+            await asyncio.sleep(0)
+
+        assert controller.queue_depth("code:7b") == 3
+        release.set()
+        waits = await asyncio.gather(*tasks)
+
+        assert order == ["first", "high", "low-a", "low-b"]
+        assert waits[0] == 0 and all(w > 0 for w in waits[1:])
+        assert controller.gate("code:7b").in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_full_or_slow(self):
+        """Test a full queue or a long expected wait is rejected instead of queued"""
+        controller = AdmissionController(slots=1, max_queue=1, max_wait_ms=None)
+        release = asyncio.Event()
+        held = asyncio.create_task(_hold(controller, "code:7b", [], "a", release))
+        queued = asyncio.create_task(_hold(controller, "code:7b", [], "b", release))
+        await asyncio.sleep(0)
+
+        assert not controller.would_admit("code:7b")
+        with pytest.raises(AdmissionRejected, match="queue full"):
+            async with controller.slot("code:7b"):
+                pass
+
+        release.set()
+        await asyncio.gather(held, queued)
+
+        gate = controller.gate("code:7b")
+        gate.in_flight, gate.service_ms = 1, 60000.0
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await gate.acquire(max_wait_ms=30000)
+        assert excinfo.value.expected_wait_ms == 60000
+        assert gate.stats["rejected"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test a cancelled waiter gives up its place and never holds a slot"""
+        controller = AdmissionController(slots=1, max_wait_ms=None)
+        release = asyncio.Event()
+        held = asyncio.create_task(_hold(controller, "code:7b", [], "a", release))
+        waiter = asyncio.create_task(_hold(controller, "code:7b", [], "b", release))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert controller.queue_depth("code:7b") == 0
+
+        release.set()
+        await held
+        assert controller.gate("code:7b").in_flight == 0
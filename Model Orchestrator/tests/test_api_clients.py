@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the unified API clients
+Runs clients against local aiohttp servers - no network or API keys needed
+"""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api_clients import APIResponse, BaseAPIClient, OllamaAPIClient, LocalModelClient, get_api_client
+from transports import AiohttpTransport, HTTPXTransport, get_transport, transport_for_provider
+from tracing import Tracer, JsonlSpanExporter
+from profiling import stage_timers
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+REQUESTS = web.AppKey("requests", list)
+
+# Ollama reports durations in nanoseconds
+OLLAMA_STATS = {
+    "total_duration": 3_000_000_000,
+    "load_duration": 2_000_000_000,
+    "prompt_eval_count": 12,
+    "prompt_eval_duration": 100_000_000,
+    "eval_count": 40,
+    "eval_duration": 500_000_000,
+}
+
+
+async def _ollama_chat_handler(request):
+    body = await request.json()
+    request.app[REQUESTS].append(body)
+
+    if body.get("stream"):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for word in ["Hello", " there"]:
+            chunk = {"model": body["model"], "message": {"role": "assistant", "content": word}, "done": False}
+            await response.write((json.dumps(chunk) + "\n").encode())
+        final = {"model": body["model"], "message": {"role": "assistant", "content": ""}, "done": True, **OLLAMA_STATS}
+        await response.write((json.dumps(final) + "\n").encode())
+        return response
+
+    return web.json_response({
+        "model": body["model"],
+        "message": {"role": "assistant", "content": "Hi!"},
+        "done": True,
+        **OLLAMA_STATS,
+    })
+
+
+async def _openai_error_handler(request):
+    return web.Response(status=404, text="not found")
+
+
+async def _flaky_chat_handler(request):
+    """Fails the first attempt so the client has to retry"""
+    request.app[REQUESTS].append(await request.json())
+    if len(request.app[REQUESTS]) == 1:
+        return web.Response(status=503, text="busy")
+    return web.json_response({
+        "choices": [{"message": {"content": "ok"}}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1},
+    })
+
+
+@pytest_asyncio.fixture
+async def ollama_server():
+    """Start a local mock of the Ollama API"""
+    app = web.Application()
+    app[REQUESTS] = []
+    app.router.add_post("/api/chat", _ollama_chat_handler)
+    app.router.add_post("/v1/chat/completions", _openai_error_handler)
+    app.router.add_post("/flaky/chat/completions", _flaky_chat_handler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    yield app, f"http://127.0.0.1:{port}"
+
+    await runner.cleanup()
+
+
+# ============================================================================
+# Ollama Client Tests
+# ============================================================================
+
+class TestOllamaAPIClient:
+    """Test the native Ollama /api/chat client"""
+
+    def test_factory_registration(self):
+        """Test the factory returns the native client for ollama"""
+        assert isinstance(get_api_client("ollama"), OllamaAPIClient)
+
+    def test_parse_timings(self):
+        """Test nanosecond stats convert to ms and throughput"""
+        timings = OllamaAPIClient.parse_timings(OLLAMA_STATS)
+
+        assert timings["load_ms"] == pytest.approx(2000.0)
+        assert timings["eval_ms"] == pytest.approx(500.0)
+        assert timings["tokens_per_second"] == pytest.approx(80.0)
+        assert timings["prompt_tokens_per_second"] == pytest.approx(120.0)
+
+    @pytest.mark.asyncio
+    async def test_chat_completion_reports_real_usage(self, ollama_server):
+        """Test token counts and load time come from Ollama stats"""
+        app, base_url = ollama_server
+
+        async with OllamaAPIClient(base_url, keep_alive="30m") as client:
+            response = await client.chat_completion(
+                model="llama3.1:8b",
+                messages=[{"role": "system", "content": "Be brief"}, {"role": "user", "content": "hi"}],
+                max_tokens=64,
+                num_ctx=8192,
+            )
+
+        assert response.content == "Hi!"
+        assert response.usage == {"input_tokens": 12, "output_tokens": 40}
+        assert response.timings["load_ms"] == pytest.approx(2000.0)
+
+        sent = app[REQUESTS][0]
+        assert sent["keep_alive"] == "30m"
+        assert sent["options"]["num_ctx"] == 8192
+        assert sent["options"]["num_predict"] == 64
+        assert len(sent["messages"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_num_ctx_reused_per_model(self, ollama_server):
+        """Test num_ctx sticks per model so Ollama does not reload it"""
+        app, base_url = ollama_server
+
+        async with OllamaAPIClient(base_url) as client:
+            await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "a"}], num_ctx=16384)
+            await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "b"}])
+
+        assert app[REQUESTS][1]["options"]["num_ctx"] == 16384
+
+    @pytest.mark.asyncio
+    async def test_streaming_ndjson(self, ollama_server):
+        """Test NDJSON streaming yields text and records final stats"""
+        _, base_url = ollama_server
+
+        async with OllamaAPIClient(base_url) as client:
+            parts = [part async for part in await client.chat_completion(
+                "llama3.1:8b", [{"role": "user", "content": "hi"}], stream=True
+            )]
+
+            assert "".join(parts) == "Hello there"
+            assert client.last_stream_response.usage["output_tokens"] == 40
+            assert client.last_stream_response.timings["tokens_per_second"] == pytest.approx(80.0)
+
+    @pytest.mark.asyncio
+    async def test_local_client_falls_back_to_native_chat(self, ollama_server, monkeypatch):
+        """Test the OpenAI-compatible client falls back with the full conversation"""
+        app, base_url = ollama_server
+
+        # Skip tenacity's backoff between the failing OpenAI-compatible attempts
+        monkeypatch.setattr(BaseAPIClient._send_request.retry, "sleep", _no_sleep)
+
+        async with LocalModelClient(f"{base_url}/v1") as client:
+            response = await client.chat_completion(
+                "llama3.1:8b",
+                [{"role": "user", "content": "first"}, {"role": "user", "content": "second"}],
+            )
+
+        assert response.usage["output_tokens"] == 40
+        assert len(app[REQUESTS][0]["messages"]) == 2
+
+
+# ============================================================================
+# Transport Tests
+# ============================================================================
+
+class TestTransports:
+    """Test pluggable transport selection and request paths"""
+
+    def test_get_transport_names(self):
+        """Test the factory maps names to backends"""
+        assert isinstance(get_transport("aiohttp"), AiohttpTransport)
+        assert get_transport("httpx").name == "httpx"
+        assert isinstance(get_transport("http2"), HTTPXTransport)
+
+        with pytest.raises(ValueError):
+            get_transport("carrier-pigeon")
+
+    def test_transport_selected_per_provider(self, monkeypatch):
+        """Test per-provider env vars override the global default"""
+        monkeypatch.setenv("ORCHESTRATOR_TRANSPORT", "httpx")
+        monkeypatch.setenv("ORCHESTRATOR_TRANSPORT_XAI", "http2")
+
+        assert transport_for_provider("openai") == "httpx"
+        assert transport_for_provider("xai") == "http2"
+        assert get_api_client("ollama").transport_name == "httpx"
+        assert get_api_client("ollama", transport="aiohttp").transport_name == "aiohttp"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("transport", ["aiohttp", "httpx"])
+    async def test_client_request_through_transport(self, ollama_server, transport):
+        """Test the same client works on each backend"""
+        _, base_url = ollama_server
+
+        async with OllamaAPIClient(base_url, transport=transport) as client:
+            response = await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "hi"}])
+            parts = [part async for part in await client.chat_completion(
+                "llama3.1:8b", [{"role": "user", "content": "hi"}], stream=True
+            )]
+
+        assert response.content == "Hi!"
+        assert "".join(parts) == "Hello there"
+
+
+# ============================================================================
+# APIResponse Tests
+# ============================================================================
+
+class TestAPIResponse:
+    """Test the lean slotted response format"""
+
+    def test_slotted_without_payload(self):
+        """Test responses carry no __dict__ and no payload by default"""
+        response = APIResponse("hi", "m", "local", {"input_tokens": 3, "output_tokens": 4}, 10)
+
+        assert not hasattr(response, "__dict__")
+        assert response.usage == {"input_tokens": 3, "output_tokens": 4}
+        assert response.raw_response is None
+
+    def test_raw_body_decoded_on_first_access(self):
+        """Test retained bytes are parsed lazily and cached"""
+        response = APIResponse("hi", "m", "local", {}, 10, raw_body=b'{"id": 1}')
+
+        assert response._raw_response is None
+        assert response.raw_response == {"id": 1}
+        assert response.raw_response is response.raw_response
+
+    @pytest.mark.asyncio
+    async def test_client_retains_raw_only_on_request(self, ollama_server):
+        """Test raw bodies are kept only when retain_raw is enabled"""
+        _, base_url = ollama_server
+
+        async with get_api_client("ollama", base_url=base_url) as client:
+            lean = await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "hi"}])
+            client.retain_raw = True
+            full = await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "hi"}])
+
+        assert lean.raw_body is None
+        assert full.raw_response["message"]["content"] == "Hi!"
+
+
+# ============================================================================
+# Request Timing Tests
+# ============================================================================
+
+class TestRequestTimings:
+    """Test the per-request timing breakdown attached to responses"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("transport", ["aiohttp", "httpx"])
+    async def test_stages_recorded(self, ollama_server, transport):
+        """Test a cold request reports connect, TTFB, body and decode time"""
+        _, base_url = ollama_server
+
+        async with OllamaAPIClient(base_url, transport=transport) as client:
+            response = await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "hi"}])
+
+        timings = response.timings
+        for stage in ("connect_ms", "ttfb_ms", "body_ms", "decode_ms", "retry_ms"):
+            assert timings[stage] >= 0
+        assert timings["attempts"] == 1
+        # Server-side Ollama stats are merged in
+        assert timings["load_ms"] == pytest.approx(2000.0)
+
+    @pytest.mark.asyncio
+    async def test_reused_connection_skips_connect(self, ollama_server):
+        """Test a pooled connection records no DNS or connect time"""
+        _, base_url = ollama_server
+
+        async with OllamaAPIClient(base_url) as client:
+            await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "a"}])
+            response = await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "b"}])
+
+        assert "connect_ms" not in response.timings
+        assert "dns_ms" not in response.timings
+
+    @pytest.mark.asyncio
+    async def test_retry_time_recorded(self, ollama_server, monkeypatch):
+        """Test failed attempts and backoff land in retry_ms"""
+        _, base_url = ollama_server
+
+        async def _short_sleep(seconds):
+            await asyncio.sleep(0.05)
+
+        monkeypatch.setattr(BaseAPIClient._send_request.retry, "sleep", _short_sleep)
+
+        async with LocalModelClient(f"{base_url}/flaky") as client:
+            response = await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "hi"}])
+
+        assert response.timings["attempts"] == 2
+        assert response.timings["retry_ms"] >= 40  # loop timers may fire slightly early
+        assert response.latency_ms >= response.timings["retry_ms"]
+
+    @pytest.mark.asyncio
+    async def test_attempts_traced(self, ollama_server, monkeypatch, tmp_path):
+        """Test each HTTP attempt becomes a child span of the active span"""
+        _, base_url = ollama_server
+        monkeypatch.setattr(BaseAPIClient._send_request.retry, "sleep", _no_sleep)
+        tracer = Tracer(JsonlSpanExporter(tmp_path / "trace.jsonl"))
+
+        async with LocalModelClient(f"{base_url}/flaky") as client:
+            with tracer.span("call_model", model="llama3.1:8b"):
+                await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "hi"}])
+        tracer.close()
+
+        spans = [json.loads(line) for line in (tmp_path / "trace.jsonl").read_text().splitlines()]
+        failed, succeeded, parent = spans
+        assert (failed["attributes"]["attempt"], failed["status"]) == (1, "error")
+        assert (succeeded["attributes"]["attempt"], succeeded["attributes"]["status"]) == (2, 200)
+        assert failed["parent_id"] == succeeded["parent_id"] == parent["span_id"]
+
+    @pytest.mark.asyncio
+    async def test_stage_timers(self, ollama_server):
+        """Test request and parse stages feed the stage profiler when enabled"""
+        _, base_url = ollama_server
+
+        stage_timers.enable()
+        try:
+            async with OllamaAPIClient(base_url) as client:
+                await client.chat_completion("llama3.1:8b", [{"role": "user", "content": "hi"}])
+            report = stage_timers.report()
+        finally:
+            stage_timers.disable()
+            stage_timers.reset()
+
+        assert report["make_request"]["count"] == 1
+        assert report["parse_response"]["count"] == 1
+        assert report["make_request"]["max_ms"] >= report["parse_response"]["max_ms"]
+
+
+async def _no_sleep(seconds):
+    return None
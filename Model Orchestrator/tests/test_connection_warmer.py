@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Unit tests for connection pre-warming
+Warms clients against a local aiohttp server that counts connections
+"""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api_clients import OllamaAPIClient
+from connection_warmer import ConnectionWarmer
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+CONNECTIONS = web.AppKey("connections", set)
+PROBES = web.AppKey("probes", list)
+
+
+async def _root_handler(request):
+    request.app[CONNECTIONS].add(id(request.transport))
+    request.app[PROBES].append(request.method)
+    return web.Response(text="Ollama is running")
+
+
+async def _chat_handler(request):
+    request.app[CONNECTIONS].add(id(request.transport))
+    body = await request.json()
+    return web.json_response({
+        "model": body["model"],
+        "message": {"role": "assistant", "content": "Hi!"},
+        "done": True,
+        "prompt_eval_count": 1,
+        "eval_count": 1,
+    })
+
+
+@pytest_asyncio.fixture
+async def counting_server():
+    """Local Ollama mock recording which connections served requests"""
+    app = web.Application()
+    app[CONNECTIONS] = set()
+    app[PROBES] = []
+    app.router.add_get("/", _root_handler)
+    app.router.add_post("/api/chat", _chat_handler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    yield app, f"http://127.0.0.1:{port}"
+
+    await runner.cleanup()
+
+
+# ============================================================================
+# ConnectionWarmer Tests
+# ============================================================================
+
+class TestConnectionWarmer:
+    """Test warm-up opens, holds and refreshes connections"""
+
+    @pytest.mark.asyncio
+    async def test_warm_opens_connections(self, counting_server):
+        """Test N concurrent probes open N connections"""
+        app, base_url = counting_server
+        client = OllamaAPIClient(base_url)
+
+        try:
+            stats = await ConnectionWarmer({"local": client}, connections_per_host=3).warm()
+        finally:
+            await client.close()
+
+        assert stats["local"]["connections"] == 3
+        assert stats["local"]["dns_ms"] >= 0
+        assert len(app[CONNECTIONS]) == 3
+
+    @pytest.mark.asyncio
+    async def test_first_request_reuses_warm_connection(self, counting_server):
+        """Test real traffic after warm-up opens no new connections"""
+        app, base_url = counting_server
+        client = OllamaAPIClient(base_url)
+
+        try:
+            await ConnectionWarmer({"local": client}, connections_per_host=2).warm()
+            await asyncio.gather(*[
+                client.chat_completion("llama3.1:8b", [{"role": "user", "content": "hi"}])
+                for _ in range(2)
+            ])
+        finally:
+            await client.close()
+
+        assert len(app[CONNECTIONS]) == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_before_idle_timeout(self, counting_server):
+        """Test the background task re-probes on its refresh interval"""
+        app, base_url = counting_server
+        client = OllamaAPIClient(base_url)
+        warmer = ConnectionWarmer({"local": client}, connections_per_host=1, refresh_interval=0.05)
+
+        try:
+            await warmer.warm()
+            warmer.start()
+            await asyncio.sleep(0.2)
+            await warmer.stop()
+        finally:
+            await client.close()
+
+        assert len(app[PROBES]) >= 3
+
+    def test_refresh_interval_follows_idle_timeout(self):
+        """Test the default refresh fires before the shortest idle timeout"""
+        warmer = ConnectionWarmer({"local": OllamaAPIClient("http://127.0.0.1:1")})
+        assert warmer._get_refresh_interval() == pytest.approx(0.75 * 30.0)
+
+    @pytest.mark.asyncio
+    async def test_unreachable_host_does_not_raise(self):
+        """Test warm-up failures are reported, not raised"""
+        client = OllamaAPIClient("http://127.0.0.1:1")
+
+        try:
+            stats = await ConnectionWarmer({"local": client}).warm()
+        finally:
+            await client.close()
+
+        assert stats["local"]["connections"] == 0
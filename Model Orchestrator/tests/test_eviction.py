@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit tests for memory-pressure eviction
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import eviction
+from eviction import EvictionController
+from ram_monitor import MemoryPressure
+
+LOADED = ["small:1b", "chat:8b", "big:32b"]
+
+
+@pytest.fixture(autouse=True)
+def discrete_memory(monkeypatch):
+    """Count only system-RAM resident bytes, as on Linux"""
+    monkeypatch.setattr(eviction, "UNIFIED_MEMORY", False)
+
+
+# ============================================================================
+# Eviction Controller Tests
+# ============================================================================
+
+class TestEvictionController:
+    """Test pressure detection, ranking and unloading"""
+
+    def test_pressure_signals(self):
+        """Test low memory, a falling trend and PSI stalls each count as pressure"""
+        controller = EvictionController(SimpleNamespace(), None, min_available_gb=4, psi_threshold=10, horizon=10)
+        calm = MemoryPressure(some_avg10=1.0)
+
+        assert controller.pressure(SimpleNamespace(available_gb=8, pressure=calm)) is None
+        assert "available 3.0GB" in controller.pressure(SimpleNamespace(available_gb=3, pressure=None))
+        assert "projected" in controller.pressure(SimpleNamespace(available_gb=8, pressure=None), slope=-0.5)
+        assert "PSI" in controller.pressure(SimpleNamespace(available_gb=8, pressure=MemoryPressure(some_avg10=25.0)))
+
+    def test_rank_by_demand_per_gb(self, make_manager, make_keep_alive):
+        """Test idle large models rank first and busy small ones last"""
+        manager = make_manager(LOADED, available_gb=8)
+        for _ in range(5):
+            manager.demand.record("small:1b", 0)
+        manager.demand.record("big:32b", 0)
+        controller = EvictionController(manager, make_keep_alive())
+
+        assert [name for name, _ in controller.rank(now=0)] == ["chat:8b", "big:32b", "small:1b"]
+        assert controller.choose_victims(available_gb=3) == [("chat:8b", 5.0)]
+        assert [n for n, _ in controller.choose_victims(available_gb=-10)] == ["chat:8b", "big:32b"]
+
+    @pytest.mark.asyncio
+    async def test_check_unloads_and_notifies(self, make_manager, make_keep_alive):
+        """Test eviction unloads, unpins, invalidates state and calls listeners once per cooldown"""
+        manager = make_manager(LOADED, available_gb=2.0)
+        keep_alive = make_keep_alive(["big:32b", "small:1b"])
+        notified = []
+        controller = EvictionController(manager, keep_alive, on_evict=notified.append)
+
+        # No demand recorded, so the largest model goes first
+        assert await controller.check() == ["big:32b"]
+        assert keep_alive.unloaded == ["big:32b"]
+        assert keep_alive.models == ["small:1b"]
+        assert manager.ollama.invalidated == 1
+        assert notified == [["big:32b"]]
+
+        assert await controller.check() == []  # Cooldown
+
+    @pytest.mark.asyncio
+    async def test_no_pressure_no_eviction(self, make_manager, make_keep_alive):
+        """Test nothing is unloaded with plenty of memory and a flat trend"""
+        manager = make_manager(LOADED, available_gb=20.0, pressure=MemoryPressure(), slope=0.0)
+        keep_alive = make_keep_alive(["chat:8b"])
+
+        assert await EvictionController(manager, keep_alive).check() == []
+        assert keep_alive.unloaded == []
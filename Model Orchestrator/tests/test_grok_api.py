@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the async Grok API client
+Runs GrokAPI against a local aiohttp server - no network or API key needed
+"""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grok_api import GrokAPI
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+RESPONSE_DELAY = 0.2
+REQUESTS = web.AppKey("requests", list)
+
+
+async def _chat_handler(request):
+    body = await request.json()
+    request.app[REQUESTS].append(body)
+
+    if body.get("stream"):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for word in ["Hello", " world"]:
+            chunk = {"choices": [{"delta": {"content": word}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    await asyncio.sleep(RESPONSE_DELAY)
+    return web.json_response({
+        "choices": [{"message": {"content": f"echo {body['model']}"}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+    })
+
+
+async def _image_handler(request):
+    body = await request.json()
+    request.app[REQUESTS].append(body)
+    return web.json_response({"data": [{"url": "http://example.test/image.png"}]})
+
+
+@pytest_asyncio.fixture
+async def grok_server():
+    """Start a local mock of the xAI API"""
+    app = web.Application()
+    app[REQUESTS] = []
+    app.router.add_post("/v1/chat/completions", _chat_handler)
+    app.router.add_post("/v1/images/generations", _image_handler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    yield app, f"http://127.0.0.1:{port}/v1"
+
+    await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def grok_client(grok_server):
+    """GrokAPI pointed at the local mock server"""
+    _, base_url = grok_server
+    client = GrokAPI(api_key="test-key")
+    client.base_url = base_url
+    yield client
+    await client.close()
+
+
+# ============================================================================
+# GrokAPI Tests
+# ============================================================================
+
+class TestGrokAPI:
+    """Test async GrokAPI request paths"""
+
+    def test_alias_resolution_from_config(self):
+        """Test aliases are loaded from grok-models-config.yaml"""
+        client = GrokAPI(api_key="test-key")
+        assert client.resolve_model("grok-code") == "grok-code-fast-1"
+        assert client.resolve_model("grok-3") == "grok-3"
+        assert client.get_model_info("grok4-fast")["id"] == "grok-4-fast-reasoning"
+
+    @pytest.mark.asyncio
+    async def test_chat_completion_resolves_alias(self, grok_server, grok_client):
+        """Test chat requests send the resolved model ID"""
+        app, _ = grok_server
+        response = await grok_client.chat_completion(
+            "grok", [{"role": "user", "content": "hi"}], max_tokens=None
+        )
+
+        assert response["choices"][0]["message"]["content"] == "echo grok-3"
+        assert app[REQUESTS][0]["model"] == "grok-3"
+        assert "max_tokens" not in app[REQUESTS][0]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_overlap(self, grok_client):
+        """Test concurrent calls share the event loop instead of serializing"""
+        num_calls = 5
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*[
+            grok_client.chat_completion("grok-3", [{"role": "user", "content": str(i)}])
+            for i in range(num_calls)
+        ])
+        elapsed = time.perf_counter() - start_time
+
+        assert len(results) == num_calls
+        assert elapsed < RESPONSE_DELAY * num_calls / 2
+
+    @pytest.mark.asyncio
+    async def test_session_is_pooled(self, grok_client):
+        """Test requests reuse one session"""
+        await grok_client.chat_completion("grok-3", [{"role": "user", "content": "a"}])
+        session = grok_client.session
+        await grok_client.chat_completion("grok-3", [{"role": "user", "content": "b"}])
+
+        assert grok_client.session is session
+
+    @pytest.mark.asyncio
+    async def test_stream_completion(self, grok_client):
+        """Test streaming is an async generator of parsed chunks"""
+        chunks = []
+        async for chunk in grok_client.stream_completion("grok-3", [{"role": "user", "content": "hi"}]):
+            chunks.append(chunk["choices"][0]["delta"]["content"])
+
+        assert "".join(chunks) == "Hello world"
+
+    @pytest.mark.asyncio
+    async def test_vision_completion_embeds_image(self, grok_server, grok_client, tmp_path):
+        """Test vision requests attach the image to the last user message"""
+        app, _ = grok_server
+        image = tmp_path / "image.jpg"
+        image.write_bytes(b"\xff\xd8\xff")
+
+        await grok_client.vision_completion(
+            "grok-vision", [{"role": "user", "content": "describe"}], str(image)
+        )
+
+        sent = app[REQUESTS][0]
+        assert sent["model"] == "grok-2-vision-1212"
+        assert sent["messages"][0]["content"][1]["type"] == "image_url"
+
+    @pytest.mark.asyncio
+    async def test_image_generation(self, grok_server, grok_client):
+        """Test image generation resolves aliases"""
+        app, _ = grok_server
+        response = await grok_client.image_generation("a cat", model_id="grok-image")
+
+        assert response["data"][0]["url"].endswith("image.png")
+        assert app[REQUESTS][0]["model"] == "grok-2-image-1212"
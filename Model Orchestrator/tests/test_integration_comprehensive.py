@@ -450,7 +450,7 @@ class TestDatabaseFileSystemIntegration:
         """Test persisting cost tracking data"""
         # Track some usage
         orchestrator_with_mocks.track_usage("codellama:34b", 1000, 500, 250)
-        orchestrator_with_mocks.track_usage("qwen2.5:32b", 2000, 1000, 300)
+        orchestrator_with_mocks.track_usage("qwen2.5-32b-instruct", 2000, 1000, 300)
 
         # Save to file
         cost_file = Path(temp_dir) / "cost_tracking.json"
@@ -465,14 +465,15 @@ class TestDatabaseFileSystemIntegration:
             loaded_data = json.load(f)
 
         assert "codellama:34b" in loaded_data
-        assert "qwen2.5:32b" in loaded_data
+        assert "qwen2.5-32b-instruct" in loaded_data
 
     def test_performance_history_persistence(self, orchestrator_with_mocks, temp_dir):
         """Test persisting performance history"""
         # Add performance data
+        model_ids = list(orchestrator_with_mocks.registry.models)[:5]
         for i in range(50):
             orchestrator_with_mocks.track_usage(
-                f"model-{i % 5}",
+                model_ids[i % 5],
                 1000 + i * 10,
                 500 + i * 5,
                 200 + i
@@ -765,9 +766,10 @@ class TestPerformanceIntegration:
     def test_cost_calculation_performance(self, orchestrator_with_mocks):
         """Test cost calculation scales well"""
         # Add 1000 usage entries
+        model_ids = list(orchestrator_with_mocks.registry.models)[:10]
         for i in range(1000):
             orchestrator_with_mocks.track_usage(
-                f"model-{i % 10}",
+                model_ids[i % 10],
                 1000,
                 500,
                 200
@@ -786,7 +788,7 @@ class TestPerformanceIntegration:
         # Add 2000 performance entries
         for i in range(2000):
             orchestrator_with_mocks.track_usage(
-                "test-model",
+                "codellama:34b",
                 1000,
                 500,
                 200
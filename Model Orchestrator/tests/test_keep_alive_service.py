@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the async keep-alive service
+Runs against a local aiohttp mock of Ollama's keep_alive behaviour
+"""
+
+import sys
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from keep_alive_service import KeepAliveService
+
+GENERATES = web.AppKey("generates", list)
+EXPIRY = web.AppKey("expiry", dict)
+
+
+async def _generate_handler(request):
+    """Zero-token request: load or unload and reset the expiry"""
+    body = await request.json()
+    request.app[GENERATES].append(body)
+    if body["keep_alive"] == 0:
+        request.app[EXPIRY].pop(body["model"], None)
+    else:
+        request.app[EXPIRY][body["model"]] = time.time() + body["keep_alive"]
+    return web.json_response({"model": body["model"], "response": "", "done": True, "done_reason": "load"})
+
+
+async def _ps_handler(request):
+    return web.json_response({"models": [
+        {"name": name, "expires_at": datetime.fromtimestamp(expires, timezone.utc).isoformat()}
+        for name, expires in request.app[EXPIRY].items()
+    ]})
+
+
+@pytest_asyncio.fixture
+async def ollama_server():
+    """Start a local mock of the Ollama API"""
+    app = web.Application()
+    app[GENERATES] = []
+    app[EXPIRY] = {}
+    app.router.add_post("/api/generate", _generate_handler)
+    app.router.add_get("/api/ps", _ps_handler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    yield app, f"http://127.0.0.1:{port}"
+
+    await runner.cleanup()
+
+
+# ============================================================================
+# Keep-Alive Service Tests
+# ============================================================================
+
+class TestKeepAliveService:
+    """Test pinning, refresh skipping and status output"""
+
+    @pytest.mark.asyncio
+    async def test_pins_without_prompt(self, ollama_server, tmp_path):
+        """Test cold models are pinned with prompt-less requests and the status file is written"""
+        app, url = ollama_server
+        status_file = tmp_path / "status.json"
+        service = KeepAliveService(["llama3.1:8b", "magicoder:7b"], url, keep_alive=600,
+                                   status_file=str(status_file))
+        try:
+            delay = await service.tick()
+        finally:
+            await service.stop()
+
+        assert app[GENERATES] == [
+            {"model": "llama3.1:8b", "keep_alive": 600},
+            {"model": "magicoder:7b", "keep_alive": 600},
+        ]
+        assert delay == pytest.approx(service.MAX_INTERVAL)
+        assert set(service.load_ms) == {"llama3.1:8b", "magicoder:7b"}
+        assert json.loads(status_file.read_text())["magicoder:7b"]["status"] == "active"
+
+    @pytest.mark.asyncio
+    async def test_skips_fresh_and_touched(self, ollama_server):
+        """Test only models near expiry and untouched by traffic are refreshed"""
+        app, url = ollama_server
+        now = time.time()
+        app[EXPIRY].update({"fresh:1b": now + 500, "due:1b": now + 30, "busy:1b": now + 30})
+        service = KeepAliveService(["fresh:1b", "due:1b", "busy:1b"], url, refresh_margin=120)
+        service.touch("busy:1b")
+        try:
+            delay = await service.tick()
+        finally:
+            await service.stop()
+
+        assert [body["model"] for body in app[GENERATES]] == ["due:1b"]
+        assert service.stats["skipped"] == 2
+        assert "due:1b" not in service.load_ms  # Already resident, so not a load
+        assert delay == service.MIN_INTERVAL  # busy:1b is due again soon
+
+    @pytest.mark.asyncio
+    async def test_unload_and_unreachable(self, ollama_server):
+        """Test keep_alive 0 unloads, preloads use their own expiry, and a dead server backs off"""
+        app, url = ollama_server
+        service = KeepAliveService(["llama3.1:8b"], url)
+        await service.tick()
+        assert await service.unload("llama3.1:8b")
+        assert app[EXPIRY] == {}
+
+        # Preloads carry their own short keep_alive and stay out of the pinned set
+        assert await service.preload("magicoder:7b", 60)
+        assert app[GENERATES][-1] == {"model": "magicoder:7b", "keep_alive": 60}
+        assert service.models == ["llama3.1:8b"] and "magicoder:7b" not in service.status
+        await service.stop()
+
+        dead = KeepAliveService(["llama3.1:8b"], "http://127.0.0.1:9")
+        try:
+            assert await dead.tick() == dead.MIN_INTERVAL
+        finally:
+            await dead.stop()
+        assert dead.stats["errors"] == 1
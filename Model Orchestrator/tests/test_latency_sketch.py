@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Unit tests for streaming latency sketches
+"""
+
+import sys
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from latency_sketch import QuantileSketch, WindowedSketch, LatencyTracker, derive_request_metrics
+
+
+NOW = 1_700_000_000.0
+
+
+# ============================================================================
+# QuantileSketch Tests
+# ============================================================================
+
+class TestQuantileSketch:
+    """Test accuracy, merging and serialization"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test p50/p95/p99 stay within the configured relative error"""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(6, 1) for _ in range(20000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.95, 0.99):
+            exact = np.quantile(values, q)
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.03)
+        assert len(sketch.counts) < 1000
+
+    def test_merge_matches_single_sketch(self):
+        """Test merging partial sketches equals sketching everything at once"""
+        values = [float(v) for v in range(1, 1001)]
+        whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for value in values:
+            whole.add(value)
+            (left if value % 2 else right).add(value)
+        left.merge(right)
+
+        assert left.counts == whole.counts
+        assert left.quantile(0.99) == whole.quantile(0.99)
+
+    def test_round_trip(self):
+        """Test sketches survive JSON serialization"""
+        sketch = QuantileSketch()
+        for value in (0.0, 12.5, 250.0, 9000.0):
+            sketch.add(value)
+
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+        assert restored.counts == sketch.counts
+        assert restored.zero_count == 1
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+    def test_merge_rejects_mismatched_accuracy(self):
+        """Test sketches with different bucket widths cannot merge"""
+        with pytest.raises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+# ============================================================================
+# Window and Tracker Tests
+# ============================================================================
+
+class TestLatencyTracker:
+    """Test rolling windows, grouping and cross-process merging"""
+
+    def test_windows_expire_old_values(self):
+        """Test values age out of shorter windows first"""
+        windowed = WindowedSketch()
+        windowed.add(100.0, NOW - 600)
+        windowed.add(200.0, NOW - 120)
+        windowed.add(300.0, NOW - 5)
+
+        assert windowed.window("1m", NOW).count == 1
+        assert windowed.window("5m", NOW).count == 2
+        assert windowed.window("1h", NOW).count == 3
+
+    def test_group_by(self):
+        """Test reports per key, model and provider"""
+        tracker = LatencyTracker()
+        tracker.record("gpt-4o", "openai", "code_generation", 400, timestamp=NOW)
+        tracker.record("gpt-4o", "openai", "reasoning", 600, timestamp=NOW)
+        tracker.record("llama3.1:8b", "local", "code_generation", 900, ttft_ms=120,
+                       tokens_per_second=35, timestamp=NOW)
+
+        by_key = tracker.report("1m", now=NOW)
+        by_model = tracker.report("1m", group_by="model", now=NOW)
+
+        assert set(by_key) == {"gpt-4o|openai|code_generation", "gpt-4o|openai|reasoning",
+                               "llama3.1:8b|local|code_generation"}
+        assert by_model["gpt-4o"]["requests"] == 2
+        assert by_model["gpt-4o"]["latency_ms_p99"] == pytest.approx(600, rel=0.02)
+        assert "ttft_ms_p50" not in by_model["gpt-4o"]
+        assert by_model["llama3.1:8b"]["ttft_ms_p50"] == pytest.approx(120, rel=0.02)
+        assert tracker.report("1m", group_by="provider", now=NOW)["local"]["requests"] == 1
+
+    def test_merge_exports_across_workers(self):
+        """Test exports from separate trackers merge into one report"""
+        workers = [LatencyTracker() for _ in range(3)]
+        for i, tracker in enumerate(workers):
+            for value in range(100):
+                tracker.record("gpt-4o", "openai", None, 100 * (i + 1) + value, timestamp=NOW)
+
+        merged = LatencyTracker.merge_exports(
+            json.loads(json.dumps(tracker.export("5m", "model", now=NOW))) for tracker in workers
+        )
+        report = LatencyTracker.summarize(merged)
+
+        assert report["gpt-4o"]["requests"] == 300
+        assert report["gpt-4o"]["latency_ms_p50"] == pytest.approx(250, rel=0.05)
+
+    def test_derive_request_metrics(self):
+        """Test TTFT and throughput come from server timings when available"""
+        assert derive_request_metrics(1000, 50, {"load_ms": 30.0, "prompt_eval_ms": 70.0,
+                                                 "tokens_per_second": 42.0}) == (100.0, 42.0)
+        assert derive_request_metrics(500, 100, {"ttft_ms": 80.0}) == (80.0, 200.0)
+        assert derive_request_metrics(500, 0, None) == (None, None)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Unit tests for local model routing
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from local_model_manager import LocalModelManager
+
+
+class FakeFootprints:
+    def __init__(self, sizes):
+        self.sizes = sizes
+
+    def footprint_gb(self, model, num_ctx=None, parallel=None):
+        return self.sizes.get(model)
+
+
+@pytest.fixture
+def manager(monkeypatch, make_state, model_sizes):
+    """Manager over fake Ollama state with plenty of RAM"""
+    manager = LocalModelManager(ram_sample_interval=0, ollama_state=make_state(),
+                                footprints=FakeFootprints(model_sizes))
+    monkeypatch.setattr(manager, "can_load_model", lambda model: (model_sizes.get(model, 99) < 10, ""))
+    return manager
+
+
+# ============================================================================
+# Cold-Start Routing Tests
+# ============================================================================
+
+class TestColdStartRouting:
+    """Test expected cold-start latency drives local model choice"""
+
+    def test_expected_cold_start(self, manager):
+        """Test resident models cost nothing, measured loads beat the size estimate"""
+        manager.ollama.set_loaded(["code:7b"])
+        assert manager.expected_cold_start_ms("code:7b") == 0
+        assert manager.expected_cold_start_ms("small:1b") == pytest.approx(1000.0)
+        assert manager.expected_cold_start_ms("mystery:1b") is None
+
+        manager.record_load("small:1b", 5000.0)
+        assert manager.expected_cold_start_ms("small:1b") == pytest.approx(5000.0)
+        assert manager.ollama.invalidated == 1
+
+        manager.record_load("code:7b", 20.0)  # Already resident: not a cold load
+        assert manager.ollama.invalidated == 1
+
+    def test_resident_beats_smaller_cold(self, manager):
+        """Test a loaded model wins over a smaller one that would have to load"""
+        manager.ollama.set_loaded(["code:7b"])
+        assert manager.select_best_model("code_generation", ["small:1b", "code:7b"]) == "code:7b"
+
+        manager.ollama.set_loaded([])
+        assert manager.select_best_model("code_generation", ["code:7b", "small:1b"]) == "small:1b"
+
+    def test_measured_load_time_ranks_cold_models(self, manager):
+        """Test a slow measured load pushes a model behind a larger fast-loading one"""
+        manager.record_load("small:1b", 9000.0)
+        assert manager.select_best_model("code_generation", ["small:1b", "code:7b"]) == "code:7b"
+        assert manager.demand.last_seen("code:7b") is not None
+
+    def test_unloadable_last(self, manager):
+        """Test a model that does not fit RAM is chosen only when nothing else is"""
+        assert manager.select_best_model("reasoning", ["big:32b", "code:7b"]) == "code:7b"
+        assert manager.select_best_model("reasoning", ["big:32b"]) == "big:32b"
+        assert manager.select_best_model("reasoning", ["mystery:1b"]) is None
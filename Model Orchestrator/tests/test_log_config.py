@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit tests for queued logging
+"""
+
+import io
+import sys
+import json
+import logging
+import subprocess
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from log_config import configure_logging, stop_logging, JsonFormatter
+
+
+@pytest.fixture
+def root_level():
+    """Restore the root logger level changed by configure_logging"""
+    level = logging.getLogger().level
+    yield
+    stop_logging()
+    logging.getLogger().setLevel(level)
+
+
+class _FormattedOn:
+    """Log argument that remembers which thread formatted it"""
+
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self):
+        self.thread = threading.current_thread().name
+        return "arg"
+
+
+# ============================================================================
+# Queued Logging Tests
+# ============================================================================
+
+class TestQueuedLogging:
+    """Test the queue handler, listener and formatters"""
+
+    def test_formatting_happens_on_listener(self, root_level):
+        """Test %-style args are interpolated off the calling thread"""
+        stream = io.StringIO()
+        configure_logging(logging.INFO, stream=stream)
+        arg = _FormattedOn()
+
+        logging.getLogger("orchestrator.test").info("Selected model: %s", arg)
+        stop_logging()
+
+        assert "orchestrator.test - INFO - Selected model: arg" in stream.getvalue()
+        assert arg.thread not in (None, threading.current_thread().name)
+
+    def test_json_lines_with_extras(self, root_level):
+        """Test JSON output carries the message, level and extra fields"""
+        stream = io.StringIO()
+        configure_logging("debug", json_format=True, stream=stream)
+
+        logger = logging.getLogger("orchestrator.test")
+        logger.debug("Selected: %s (score: %.2f)", "gpt-4o", 0.91, extra={"model": "gpt-4o", "score": 0.91})
+        try:
+            raise RuntimeError("connection refused")
+        except RuntimeError:
+            logger.exception("API call failed")
+        stop_logging()
+
+        selected, failed = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert selected["message"] == "Selected: gpt-4o (score: 0.91)"
+        assert (selected["level"], selected["model"], selected["score"]) == ("DEBUG", "gpt-4o", 0.91)
+        assert "RuntimeError: connection refused" in failed["exc_info"]
+
+    def test_level_gate(self, root_level):
+        """Test records below the configured level never reach the queue"""
+        stream = io.StringIO()
+        configure_logging(logging.WARNING, stream=stream)
+
+        logging.getLogger("orchestrator.test").info("dropped")
+        stop_logging()
+
+        assert stream.getvalue() == ""
+        assert JsonFormatter().format(logging.makeLogRecord({"msg": "x"}))
+
+    def test_import_does_not_configure_logging(self):
+        """Test importing the orchestrator leaves the root logger untouched"""
+        code = (
+            "import logging, importlib.util, sys; sys.path.insert(0, '.'); "
+            "spec = importlib.util.spec_from_file_location('m', 'model-orchestrator-consolidated.py'); "
+            "spec.loader.exec_module(importlib.util.module_from_spec(spec)); "
+            "print(len(logging.getLogger().handlers), logging.getLogger().level)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.split() == ["0", str(logging.WARNING)]
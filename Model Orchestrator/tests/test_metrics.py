@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the OpenMetrics exporter
+"""
+
+import sys
+import urllib.request
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics import MetricsRegistry, OrchestratorMetrics, CONTENT_TYPE
+
+
+# ============================================================================
+# Registry Tests
+# ============================================================================
+
+class TestMetricsRegistry:
+    """Test metric families and the exposition format"""
+
+    def test_counter_and_gauge(self):
+        """Test counters get the _total suffix and labels are escaped"""
+        registry = MetricsRegistry()
+        counter = registry.counter("calls", "Calls made", ("model",))
+        gauge = registry.gauge("depth", "Queue depth")
+
+        counter.labels('say "hi"').inc()
+        counter.labels('say "hi"').inc(2)
+        gauge.set(4)
+
+        text = registry.render()
+        assert "# TYPE calls counter" in text
+        assert 'calls_total{model="say \\"hi\\""} 3' in text
+        assert "depth 4" in text
+        assert text.endswith("# EOF\n")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, count and sum"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "latency_seconds_count 4" in text
+        assert "latency_seconds_sum 4.25" in text
+
+    def test_reregistering_returns_same_family(self):
+        """Test registering the same metric twice is idempotent, conflicts raise"""
+        registry = MetricsRegistry()
+        assert registry.counter("calls", "Calls") is registry.counter("calls", "Calls")
+        with pytest.raises(ValueError):
+            registry.gauge("calls", "Calls")
+
+    def test_failing_collector_is_skipped(self):
+        """Test a broken collector does not break the scrape"""
+        registry = MetricsRegistry()
+        registry.register_collector("broken", "Broken", lambda: 1 / 0)
+        registry.register_collector("ok", "Works", lambda: [("ok", {"k": "v"}, 1)])
+
+        text = registry.render()
+        assert "broken" not in text
+        assert 'ok{k="v"} 1' in text
+
+
+# ============================================================================
+# OrchestratorMetrics Tests
+# ============================================================================
+
+class TestOrchestratorMetrics:
+    """Test request observation, collectors and the HTTP endpoint"""
+
+    def test_observe_request(self):
+        """Test one call updates requests, latency, tokens, cost and retries"""
+        metrics = OrchestratorMetrics()
+        metrics.observe_request("gpt-4o", "openai", 100, 40, 0.002, 350, True,
+                                {"attempts": 3, "queue_ms": 20.0})
+        metrics.observe_error("gpt-4o", "openai")
+
+        text = metrics.registry.render()
+        assert 'orchestrator_requests_total{model="gpt-4o",provider="openai",outcome="success"} 1' in text
+        assert 'orchestrator_requests_total{model="gpt-4o",provider="openai",outcome="error"} 1' in text
+        assert 'orchestrator_tokens_total{model="gpt-4o",provider="openai",direction="output"} 40' in text
+        assert 'orchestrator_retries_total{model="gpt-4o",provider="openai"} 2' in text
+        assert 'orchestrator_request_latency_seconds_bucket{model="gpt-4o",provider="openai",le="0.5"} 1' in text
+
+    def test_local_model_collectors(self):
+        """Test LocalModelManager RAM and loaded state are read at scrape time"""
+        manager = SimpleNamespace(
+            get_model_sizes=lambda: {"llama3.1:8b": 4.9, "qwen2.5:32b": 19.0},
+            ram_monitor=SimpleNamespace(get_status=lambda: SimpleNamespace(
+                total_gb=32.0, used_gb=12.0, available_gb=20.0)),
+            get_loaded_models=lambda: ["llama3.1:8b"],
+        )
+        metrics = OrchestratorMetrics()
+        metrics.watch_local_models(manager)
+        metrics.watch_queue("usage_log", lambda: 7)
+
+        text = metrics.registry.render()
+        assert 'local_model_loaded{model="llama3.1:8b"} 1' in text
+        assert 'local_model_loaded{model="qwen2.5:32b"} 0' in text
+        assert f'local_ram_bytes{{state="available"}} {20 * 1024 ** 3}' in text
+        assert "orchestrator_usage_log_queue_depth 7" in text
+
+    def test_admission_collectors(self):
+        """Test per-model admission queue state is read at scrape time"""
+        from admission import AdmissionController
+
+        controller = AdmissionController(slots=2)
+        controller.gate("code:7b").in_flight = 2
+        metrics = OrchestratorMetrics()
+        metrics.watch_admission(controller)
+
+        text = metrics.registry.render()
+        assert 'local_admission_in_flight{model="code:7b"} 2' in text
+        assert 'local_admission_queue_depth{model="code:7b"} 0' in text
+        assert 'local_admission_expected_wait_seconds{model="code:7b"} 5' in text
+
+    def test_http_endpoint(self):
+        """Test /metrics serves the registry with the OpenMetrics content type"""
+        metrics = OrchestratorMetrics()
+        metrics.observe_request("llama3.1:8b", "local", 10, 5, 0.0, 120)
+        server = metrics.serve(port=0)
+
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.stop()
+
+        assert content_type == CONTENT_TYPE
+        assert 'orchestrator_requests_total{model="llama3.1:8b",provider="local",outcome="success"} 1' in body
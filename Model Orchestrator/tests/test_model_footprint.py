@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Unit tests for model size discovery and footprint estimates
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ollama_state import InstalledModel, LoadedModel, GB
+from model_footprint import ModelFootprints, ModelProfile
+from local_model_manager import LocalModelManager
+
+# Trimmed /api/show for llama3.1:8b Q4_K_M
+SHOW = {
+    "details": {"quantization_level": "Q4_K_M", "parameter_size": "8.0B"},
+    "model_info": {
+        "general.architecture": "llama",
+        "general.parameter_count": 8030261248,
+        "llama.block_count": 32,
+        "llama.attention.head_count": 32,
+        "llama.attention.head_count_kv": 8,
+        "llama.embedding_length": 4096,
+        "llama.context_length": 131072,
+    },
+}
+
+
+@pytest.fixture
+def fake_state(make_state):
+    """Ollama state with one installed model"""
+    def make(show=SHOW, loaded=None):
+        installed = {"llama3.1:8b": InstalledModel("llama3.1:8b", "sha256:aaa", 4 * GB)}
+        return make_state(installed, loaded, show)
+    return make
+
+
+# ============================================================================
+# Footprint Tests
+# ============================================================================
+
+class TestModelFootprints:
+    """Test profile parsing, the memory model and the digest cache"""
+
+    def test_kv_cache_growth(self, tmp_path, fake_state):
+        """Test footprint grows with context and parallel slots"""
+        footprints = ModelFootprints(fake_state(), tmp_path / "profiles.json", kv_cache_type="f16")
+        profile = footprints.profile("llama3.1:8b")
+
+        assert (profile.kv_heads_x_layers, profile.head_dim) == (256, 128)
+        assert profile.kv_bytes_per_token() == 128 * 1024
+
+        base = 4 * 1.1
+        assert footprints.footprint_gb("llama3.1:8b", num_ctx=8192, parallel=1) == pytest.approx(base + 1)
+        assert footprints.footprint_gb("llama3.1:8b", num_ctx=8192, parallel=4) == pytest.approx(base + 4)
+        assert profile.footprint_bytes(10 ** 7) == profile.footprint_bytes(131072)  # Capped at trained context
+        assert profile.kv_bytes_per_token("q8_0") < profile.kv_bytes_per_token("f16")
+
+    def test_profile_from_show(self):
+        """Test /api/show parsing, including per-layer KV head counts"""
+        profile = ModelProfile.from_show("llama3.1:8b", "sha256:aaa", 4 * GB, SHOW)
+        assert (profile.architecture, profile.quantization_level) == ("llama", "Q4_K_M")
+        assert (profile.context_length, profile.parameter_count) == (131072, 8030261248)
+
+        show = {"model_info": {
+            "general.architecture": "gemma3",
+            "gemma3.attention.head_count": [8, 8, 16],
+            "gemma3.attention.head_count_kv": [4, 4, 8],
+            "gemma3.attention.key_length": 256,
+        }}
+        profile = ModelProfile.from_show("gemma3:4b", "sha256:bbb", 3 * GB, show)
+        assert (profile.kv_heads_x_layers, profile.head_dim) == (16, 256)
+        assert ModelProfile.from_show("x", "", 0, {}).kv_bytes_per_token() == 0
+
+    def test_persistent_cache_by_digest(self, tmp_path, fake_state):
+        """Test /api/show runs once per digest, across instances"""
+        path = tmp_path / "profiles.json"
+        state = fake_state()
+        ModelFootprints(state, path).profile("llama3.1:8b")
+        ModelFootprints(state, path).profile("llama3.1:8b")
+        assert state.shows == 1
+
+        state._installed["llama3.1:8b"].digest = "sha256:new"
+        ModelFootprints(state, path).profile("llama3.1:8b")
+        assert state.shows == 2
+
+    def test_unknown_shape_uses_weights(self, tmp_path, fake_state):
+        """Test a failed /api/show still yields a weights-only estimate, uncached"""
+        state = fake_state(show=None)
+        footprints = ModelFootprints(state, tmp_path / "profiles.json")
+
+        assert footprints.footprint_gb("llama3.1:8b") == pytest.approx(4 * 1.1)
+        assert footprints.footprint_gb("not-installed:1b") is None
+        assert not (tmp_path / "profiles.json").exists()
+
+    def test_failed_show_cached_briefly(self, tmp_path, fake_state):
+        """Test a failed /api/show is not retried until the failure TTL passes"""
+        state = fake_state(show=None)
+        footprints = ModelFootprints(state, tmp_path / "profiles.json", failure_ttl=60)
+        footprints.profile("llama3.1:8b")
+        footprints.profile("llama3.1:8b")
+        assert state.shows == 1
+
+        footprints.failure_ttl = 0
+        state._show = SHOW
+        assert footprints.profile("llama3.1:8b").kv_heads_x_layers == 256
+        assert state.shows == 2 and footprints._failed == {}
+
+    def test_manager_sizes(self, tmp_path, fake_state):
+        """Test the manager prefers measured, then estimated, then static sizes"""
+        loaded = {"llama3.1:8b": LoadedModel("llama3.1:8b", "sha256:aaa", 6 * GB, 6 * GB, None)}
+        state = fake_state(loaded=loaded)
+        manager = LocalModelManager(ram_sample_interval=0, ollama_state=state,
+                                    footprints=ModelFootprints(state, tmp_path / "p.json", num_ctx=2048))
+
+        assert manager.get_model_size("llama3.1:8b") == 6
+        assert manager.get_model_size("llama3.1:8b", num_ctx=8192) == pytest.approx(4 * 1.1 + 1)
+        assert manager.get_model_size("qwen2.5:32b") == LocalModelManager.MODEL_SIZES["qwen2.5:32b"]
+        assert manager.get_model_size("mystery:1b") is None
+        assert "llama3.1:8b" in manager.get_model_sizes()
+        assert manager.can_load_model("mystery:1b") == (False, "Unknown model: mystery:1b")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the cached Ollama model state
+"""
+
+import sys
+import json
+import asyncio
+import time
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ollama_state import OllamaState, format_loaded_table, GB
+from model_footprint import ModelFootprints
+from local_model_manager import LocalModelManager
+
+TAGS = {"models": [
+    {"name": "llama3.1:8b", "digest": "sha256:aaa", "size": 4920753328,
+     "details": {"family": "llama", "parameter_size": "8.0B", "quantization_level": "Q4_K_M"}},
+    {"name": "deepseek-coder:1.3b", "digest": "sha256:bbb", "size": 776080839, "details": {}},
+]}
+
+PS = {"models": [
+    {"name": "llama3.1:8b", "digest": "sha256:aaa", "size": 6 * GB, "size_vram": 4 * GB,
+     "expires_at": "2030-01-01T00:05:00.123456789Z", "context_length": 8192},
+]}
+
+
+class FakeOllama:
+    """Serves canned /api/tags and /api/ps and counts requests"""
+
+    def __init__(self):
+        self.hits = Counter()
+        self.ps = PS
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.hits[self.path] += 1
+                body = json.dumps({"/api/tags": TAGS, "/api/ps": fake.ps}[self.path]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                fake.hits[self.path] += 1
+                self.rfile.read(int(self.headers["Content-Length"]))
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def ollama():
+    fake = FakeOllama()
+    yield fake
+    fake.close()
+
+
+# ============================================================================
+# OllamaState Tests
+# ============================================================================
+
+class TestOllamaState:
+    """Test parsing, TTL caching and invalidation"""
+
+    def test_parses_tags_and_ps(self, ollama):
+        """Test installed and loaded models carry sizes, VRAM share and expiry"""
+        state = OllamaState(ollama.url)
+
+        installed = state.installed()
+        loaded = state.loaded()["llama3.1:8b"]
+
+        assert list(installed) == ["llama3.1:8b", "deepseek-coder:1.3b"]
+        assert installed["llama3.1:8b"].quantization_level == "Q4_K_M"
+        assert (loaded.size_gb, loaded.vram_gb, loaded.ram_gb) == (6, 4, 2)
+        assert loaded.expires_at == pytest.approx(1893456300.123456)
+        assert loaded.context_length == 8192
+        assert "llama3.1:8b" in format_loaded_table(state.loaded())
+
+    def test_ttl_and_invalidation(self, ollama):
+        """Test reads within the TTL reuse one fetch until invalidated"""
+        state = OllamaState(ollama.url, ps_ttl=60)
+
+        for _ in range(20):
+            assert state.is_loaded("llama3.1:8b")
+        assert ollama.hits["/api/ps"] == 1
+
+        ollama.ps = {"models": []}
+        state.invalidate()
+        assert not state.is_loaded("llama3.1:8b")
+        assert ollama.hits["/api/ps"] == 2
+        assert ollama.hits["/api/tags"] == 0
+
+    def test_unreachable_keeps_last_known(self, ollama):
+        """Test a dead server returns the last lists and marks the state unreachable"""
+        state = OllamaState(ollama.url, ps_ttl=0, timeout=0.5)
+        assert state.loaded()
+        ollama.close()
+
+        assert "llama3.1:8b" in state.loaded()
+        assert state.reachable is False
+        assert OllamaState(ollama.url, timeout=0.5).installed() == {}
+
+    def test_manager_reads_cache(self, ollama, tmp_path):
+        """Test LocalModelManager lookups hit the API once per TTL"""
+        state = OllamaState(ollama.url, ps_ttl=60)
+        manager = LocalModelManager(ram_sample_interval=0, ollama_state=state,
+                                    footprints=ModelFootprints(state, tmp_path / "profiles.json"))
+
+        assert manager.get_loaded_models() == ["llama3.1:8b"]
+        assert manager.get_model_info("llama3.1:8b").is_loaded
+        manager.select_best_model("general", ["llama3.1:8b", "llama3.2:3b"])
+        assert manager.get_status_summary()["loaded_details"]["llama3.1:8b"]["ram_gb"] == 2
+
+        assert ollama.hits["/api/ps"] == 1
+        assert ollama.hits["/api/tags"] == 1
+
+    @pytest.mark.asyncio
+    async def test_loop_reads_never_fetch(self, ollama):
+        """Test reads on the event loop return the snapshot and refresh it in the background"""
+        state = OllamaState(ollama.url, ps_ttl=60)
+
+        assert state.loaded() == {}  # Nothing fetched yet, and nothing fetched inline
+        assert ollama.hits["/api/ps"] == 0
+        await state._refresh_task
+        assert "llama3.1:8b" in state.loaded()
+        assert ollama.hits["/api/ps"] == 1
+
+        ollama.ps = {"models": []}
+        state.invalidate()
+        assert "llama3.1:8b" in state.loaded()  # Old snapshot until the refresh lands
+        await state._refresh_task
+        assert state.loaded() == {}
+        assert ollama.hits["/api/ps"] == 2
+        assert ollama.hits["/api/tags"] == 1
+        await state.stop()
+
+    @pytest.mark.asyncio
+    async def test_footprints_profile_off_loop(self, ollama, tmp_path):
+        """Test a size lookup on the event loop leaves /api/show to a worker thread"""
+        state = OllamaState(ollama.url)
+        await state.refresh(installed=True)
+        footprints = ModelFootprints(state, tmp_path / "profiles.json")
+
+        assert footprints.footprint_gb("llama3.1:8b") == pytest.approx(4920753328 / GB * 1.1)
+        deadline = time.monotonic() + 5
+        while footprints._fetching and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+
+        footprints.footprint_gb("llama3.1:8b")  # /api/show failed: not retried within the TTL
+        assert ollama.hits["/api/show"] == 1
+        await state.stop()
@@ -16,8 +16,11 @@ Test Categories:
 
 import pytest
 import asyncio
+import json
 import os
 import sys
+import time
+import socket
 from pathlib import Path
 from typing import Dict, List
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
@@ -46,6 +49,12 @@ ModelCapabilities = mod.ModelCapabilities
 TaskRequirements = mod.TaskRequirements
 APIResponse = mod.APIResponse
 
+from tracing import Tracer, JsonlSpanExporter
+from profiling import stage_timers
+from ollama_state import OllamaState
+from model_footprint import ModelFootprints
+from local_model_manager import LocalModelManager
+
 
 # ============================================================================
 # Fixtures
@@ -145,6 +154,32 @@ class TestModelRegistry:
         assert len(available) > 0
         assert "codellama:34b" in available
 
+    def test_capabilities_are_immutable(self, model_registry):
+        """Test catalog fields are frozen while availability stays mutable"""
+        model = model_registry.get_model("codellama:34b")
+
+        with pytest.raises(AttributeError):
+            model.speed = 1.0
+        with pytest.raises(AttributeError):
+            model.extra = True
+
+        model.available = False
+        assert model.available is False
+
+    def test_task_affinity_array(self):
+        """Test affinities are indexed by TaskType ordinal with a 0.5 default"""
+        model = ModelCapabilities(
+            provider=ModelProvider.LOCAL,
+            model_id="test-model",
+            context_window=4096,
+            task_scores={TaskType.DEBUGGING: 0.9}
+        )
+
+        assert len(model.task_affinity) == len(TaskType)
+        assert model.task_affinity[TaskType.DEBUGGING.ordinal] == 0.9
+        assert model.task_affinity[TaskType.VISION.ordinal] == 0.5
+        assert model.task_scores == {TaskType.DEBUGGING: 0.9}
+
     def test_model_capabilities_structure(self, model_registry):
         """Test that all models have required capabilities"""
         for model_id, model in model_registry.models.items():
@@ -196,6 +231,14 @@ class TestTaskAnalyzer:
         req = task_analyzer.analyze("Call the API function to get data")
         assert req.requires_function_calling is True
 
+    def test_requirements_are_frozen(self, task_analyzer):
+        """Test requirements are an immutable lightweight struct"""
+        requirements = task_analyzer.analyze("Fix this bug")
+
+        with pytest.raises(AttributeError):
+            requirements.task_type = TaskType.VISION
+        assert requirements.preferred_providers == ()
+
     def test_empty_prompt(self, task_analyzer):
         """Test handling of empty prompt"""
         req = task_analyzer.analyze("")
@@ -422,6 +465,189 @@ class TestModelSelection:
 
         assert model_id != "blocked-model"
 
+    def test_cold_start_penalty(self, orchestrator, mock_guide):
+        """Test a cold local model loses to a warm one, and only when latency matters"""
+        cold = {"codellama:34b": 20000.0, "magicoder:7b": 0.0}
+        loads = []
+        orchestrator.local_model_manager = Mock(
+            expected_cold_start_ms=lambda model: cold.get(model, 0.0),
+            record_load=lambda model, ms: loads.append((model, ms)),
+        )
+
+        # Guide's first pick is skipped while it would need a 20s load
+        model_id, _ = orchestrator.select_model("Write code", strategy="balanced")
+        assert model_id == "magicoder:7b"
+        model_id, _ = orchestrator.select_model("Write code", strategy="cost_optimize")
+        assert model_id == "codellama:34b"
+
+        # Scoring halves a model's score at a load of one latency budget
+        assert orchestrator._apply_local_delay({"codellama:34b": 0.8, "magicoder:7b": 0.7}, 20000.0) == {
+            "codellama:34b": pytest.approx(0.4), "magicoder:7b": 0.7}
+
+        orchestrator.track_usage("codellama:34b", 10, 10, 25000, timings={"load_ms": 19000.0})
+        orchestrator.track_usage("grok-code-fast-1", 10, 10, 500, timings={"load_ms": 0.0})
+        assert loads == [("codellama:34b", 19000.0)]
+
+    def test_local_route_and_preloader_signal(self, orchestrator):
+        """Test the preloader sees every routed task type and local routes ignore residency"""
+        orchestrator.local_model_manager = Mock(expected_cold_start_ms=lambda model: 0.0)
+        orchestrator.preloader = Mock()
+
+        orchestrator.select_model("Debug this error", use_guide=False)
+        orchestrator.preloader.observe.assert_called_once_with(TaskType.DEBUGGING)
+
+        local = {m.model_id for m in orchestrator.registry.get_models_by_provider(ModelProvider.LOCAL)}
+        assert orchestrator.local_model_for_task("code_generation") in local
+        assert orchestrator.local_model_for_task("not_a_task") is None
+
+        orchestrator.track_usage("magicoder:7b", 10, 10, 300)
+        orchestrator.local_model_manager.demand.record.assert_called_once_with("magicoder:7b")
+
+    @pytest.mark.asyncio
+    async def test_local_traffic_touches_keep_alive(self, orchestrator):
+        """Test local requests tell the keep-alive service a model is in use"""
+        keep_alive = Mock(stop=AsyncMock())
+        assert orchestrator.enable_keep_alive(keep_alive) is keep_alive
+        keep_alive.start.assert_called_once_with()
+
+        orchestrator.track_usage("magicoder:7b", 10, 10, 300)
+        orchestrator.track_usage("grok-code-fast-1", 10, 10, 300)
+        keep_alive.touch.assert_called_once_with("magicoder:7b")
+
+        await orchestrator.close()
+        keep_alive.stop.assert_awaited_once()
+        assert orchestrator.keep_alive is None
+
+    @pytest.mark.asyncio
+    async def test_warm_set_enabled(self, orchestrator):
+        """Test the warm set planner runs on the orchestrator's local model manager"""
+        with pytest.raises(ValueError):
+            orchestrator.enable_warm_set(Mock(models=[]))
+
+        orchestrator.local_model_manager = Mock()
+        keep_alive = Mock(models=["magicoder:7b"])
+        planner = orchestrator.enable_warm_set(keep_alive, interval=60)
+        assert orchestrator.enable_warm_set(keep_alive) is planner
+        assert planner.manager is orchestrator.local_model_manager
+        assert planner.keep_alive is keep_alive and planner.interval == 60
+        assert planner._periodic.running
+
+        await orchestrator.close()
+        assert orchestrator.warm_set is None and not planner._periodic.running
+
+    @pytest.mark.asyncio
+    async def test_eviction_enabled(self, orchestrator):
+        """Test eviction runs on the local model manager and drops evicted preloads"""
+        orchestrator.local_model_manager = Mock()
+        orchestrator.preloader = Mock(preloaded={"magicoder:7b": 0.0, "codellama:34b": 0.0}, stop=AsyncMock())
+        controller = orchestrator.enable_eviction(Mock(models=[]), min_available_gb=2.0)
+        assert orchestrator.enable_eviction(Mock()) is controller
+        assert controller.manager is orchestrator.local_model_manager
+        assert controller.min_available_gb == 2.0
+
+        for listener in controller.listeners:
+            listener(["codellama:34b"])
+        assert orchestrator.preloader.preloaded == {"magicoder:7b": 0.0}
+
+        await orchestrator.close()
+        assert orchestrator.eviction is None and not controller._periodic.running
+
+    @pytest.mark.asyncio
+    async def test_admission_queue_spills(self, orchestrator, mock_api_client):
+        """Test a local model with a full queue scores lower and spills calls to another model"""
+        orchestrator.api_clients = {"local": mock_api_client, "xai": mock_api_client}
+        admission = orchestrator.enable_admission(slots=1, max_queue=0)
+        gate = admission.gate("codellama:34b")
+        gate.in_flight = 1
+
+        scores = orchestrator._apply_local_delay({"codellama:34b": 0.8, "grok-code-fast-1": 0.7}, 5000.0)
+        assert scores["codellama:34b"] == pytest.approx(0.4)
+
+        response = await orchestrator.call_model("codellama:34b", "Write code", task_type=TaskType.CODE_GENERATION)
+        called = mock_api_client.chat_completion.call_args.kwargs["model"]
+        assert called != "codellama:34b"
+        assert response.content == "Test response"
+        assert gate.stats["rejected"] == 1
+
+        with pytest.raises(mod.AdmissionRejected):
+            await orchestrator.call_model("codellama:34b", "Write code", spill=False)
+
+    @pytest.mark.asyncio
+    async def test_spill_never_waits_on_ollama(self, orchestrator, mock_api_client, tmp_path):
+        """Test choosing a spill target on the event loop reads cached local state only"""
+        hung = socket.socket()  # Accepts connections, never answers
+        hung.bind(("127.0.0.1", 0))
+        hung.listen(8)
+        state = OllamaState(f"http://127.0.0.1:{hung.getsockname()[1]}", timeout=2)
+        orchestrator.local_model_manager = LocalModelManager(
+            ram_sample_interval=0, ollama_state=state, footprints=ModelFootprints(state, tmp_path / "p.json"))
+        orchestrator.api_clients = {"local": mock_api_client, "xai": mock_api_client}
+        orchestrator.enable_admission(slots=1, max_queue=0).gate("codellama:34b").in_flight = 1
+
+        start = time.perf_counter()
+        response = await orchestrator.call_model("codellama:34b", "Write code", task_type=TaskType.CODE_GENERATION)
+        assert time.perf_counter() - start < 1.0  # A blocking /api/ps read would take the 2s timeout
+        assert response.content == "Test response"
+
+        await state.stop()
+        hung.close()
+
+    @pytest.mark.asyncio
+    async def test_admission_wait_in_timings(self, orchestrator, mock_api_client):
+        """Test a queued local call holds a slot and reports its queue wait"""
+        orchestrator.api_clients = {"local": mock_api_client}
+        admission = orchestrator.enable_admission(slots=1)
+
+        async def slow_completion(**kwargs):
+            await asyncio.sleep(0.01)
+            return APIResponse(content="ok", model="magicoder:7b", provider="local",
+                               usage={"input_tokens": 1, "output_tokens": 1}, latency_ms=10)
+        mock_api_client.chat_completion.side_effect = slow_completion
+
+        first, second = await asyncio.gather(
+            orchestrator.call_model("magicoder:7b", "a"), orchestrator.call_model("magicoder:7b", "b"))
+        assert first.timings is None
+        assert second.timings["admission_ms"] > 0
+        assert admission.gate("magicoder:7b").in_flight == 0
+
+    def test_selection_and_call_traced(self, orchestrator, tmp_path):
+        """Test select_model and call_model emit nested spans with attributes"""
+        orchestrator.tracer = Tracer(JsonlSpanExporter(tmp_path / "trace.jsonl"))
+        orchestrator.api_clients["local"].chat_completion.side_effect = RuntimeError("connection refused")
+
+        with orchestrator.tracer.span("request"):
+            model_id, _ = orchestrator.select_model("Write a Python function", use_guide=False)
+            with pytest.raises(RuntimeError):
+                asyncio.run(orchestrator.call_model("codellama:34b", "test"))
+        asyncio.run(orchestrator.close())
+
+        spans = {}
+        for line in (tmp_path / "trace.jsonl").read_text().splitlines():
+            span = json.loads(line)
+            spans[span["name"]] = span
+        assert spans["analyze_task"]["parent_id"] == spans["select_model"]["span_id"]
+        assert spans["select_model"]["attributes"]["model"] == model_id
+        assert spans["score_models"]["attributes"]["candidates"] > 0
+        assert spans["call_model"]["status"] == "error"
+        assert spans["call_model"]["parent_id"] == spans["request"]["span_id"]
+
+    def test_stage_report(self, orchestrator):
+        """Test selection stages are timed only while stage profiling is on"""
+        orchestrator.select_model("Write a Python function", use_guide=False)
+        assert orchestrator.get_stage_report() == {}
+
+        stage_timers.enable()
+        try:
+            orchestrator.select_model("Write a Python function", use_guide=False)
+            report = orchestrator.get_stage_report()
+        finally:
+            stage_timers.disable()
+            stage_timers.reset()
+
+        assert report["select_model"]["count"] == 1
+        assert report["analyze_task"]["count"] == 1
+        assert report["score_model"]["count"] == sum(m.available for m in orchestrator.registry.models.values())
+
 
 # ============================================================================
 # Cost Tracking Tests
@@ -456,6 +682,13 @@ class TestCostTracking:
         assert entry["latency_ms"] == 250
         assert entry["success"] is True
 
+    def test_unregistered_model_not_tracked(self, orchestrator):
+        """Test usage for models missing from the registry is dropped"""
+        orchestrator.track_usage("nonexistent-model-xyz", 1000, 500, 250)
+
+        assert len(orchestrator.performance_history) == 0
+        assert "nonexistent-model-xyz" not in orchestrator.cost_tracker
+
     def test_cost_report_generation(self, orchestrator):
         """Test cost report generation"""
         # Track some usage
@@ -488,6 +721,76 @@ class TestCostTracking:
         # Should only keep last 1000
         assert len(orchestrator.performance_history) == 1000
 
+    def test_cost_report_counts_beyond_history(self, orchestrator):
+        """Test the cost report keeps lifetime totals and a task type breakdown"""
+        for i in range(1100):
+            orchestrator.track_usage("codellama:34b", 100, 50, 200, task_type=TaskType.CODE_GENERATION)
+
+        report = orchestrator.get_cost_report()
+
+        assert report["usage_count"]["codellama:34b"] == 1100
+        assert "code_generation" in report["by_task_type"]
+        assert orchestrator.cost_tracker["codellama:34b"] == pytest.approx(report["by_model"]["codellama:34b"])
+
+    def test_usage_survives_restart(self, model_registry, mock_guide, tmp_path):
+        """Test usage written to the durable log is replayed by a new orchestrator"""
+        usage_log_path = tmp_path / "usage.db"
+
+        first = ModelOrchestrator(registry=model_registry, guide=mock_guide,
+                                  api_client_factory=lambda provider: AsyncMock(),
+                                  usage_log_path=usage_log_path)
+        first.track_usage("codellama:34b", 1000, 500, 250)
+        first.track_usage("magicoder:7b", 2000, 1000, 150)
+        asyncio.run(first.close())
+
+        second = ModelOrchestrator(registry=model_registry, guide=mock_guide,
+                                   api_client_factory=lambda provider: AsyncMock(),
+                                   usage_log_path=usage_log_path)
+        asyncio.run(second.close())
+
+        assert second.get_cost_report()["usage_count"] == {"codellama:34b": 1, "magicoder:7b": 1}
+        assert second.cost_tracker == first.cost_tracker
+        assert [entry["model_id"] for entry in second.performance_history] == ["codellama:34b", "magicoder:7b"]
+
+    def test_latency_report(self, orchestrator):
+        """Test latency percentiles per model include Ollama TTFT and throughput"""
+        for latency_ms in (200, 300, 400):
+            orchestrator.track_usage("codellama:34b", 100, 50, latency_ms, task_type=TaskType.CODE_GENERATION,
+                                     timings={"load_ms": 10.0, "prompt_eval_ms": 40.0, "tokens_per_second": 25.0})
+
+        report = orchestrator.get_latency_report("1m", group_by="model")["codellama:34b"]
+
+        assert report["requests"] == 3
+        assert report["latency_ms_p50"] == pytest.approx(300, rel=0.02)
+        assert report["ttft_ms_p50"] == pytest.approx(50, rel=0.02)
+        assert report["tokens_per_second_p50"] == pytest.approx(25, rel=0.02)
+        assert "codellama:34b|local|code_generation" in orchestrator.get_latency_report("1m")
+
+    def test_metrics_export(self, orchestrator):
+        """Test tracked usage reaches the OpenMetrics registry once enabled"""
+        orchestrator.track_usage("codellama:34b", 100, 50, 250)
+        metrics = orchestrator.enable_metrics()
+        orchestrator.track_usage("codellama:34b", 100, 50, 250, timings={"attempts": 2})
+
+        text = metrics.registry.render()
+
+        assert 'orchestrator_requests_total{model="codellama:34b",provider="local",outcome="success"} 1' in text
+        assert 'orchestrator_retries_total{model="codellama:34b",provider="local"} 1' in text
+
+    def test_timing_breakdown_aggregation(self, orchestrator):
+        """Test per-stage timings split into network and server time"""
+        orchestrator.track_usage("codellama:34b", 100, 50, 300,
+                                 timings={"dns_ms": 10.0, "connect_ms": 20.0, "ttfb_ms": 200.0, "retry_ms": 0.0})
+        orchestrator.track_usage("codellama:34b", 100, 50, 500,
+                                 timings={"dns_ms": 0.0, "connect_ms": 0.0, "ttfb_ms": 400.0, "retry_ms": 60.0})
+
+        report = orchestrator.get_timing_report()["codellama:34b"]
+
+        assert report["requests"] == 2
+        assert report["ttfb_ms"] == pytest.approx(300.0)
+        assert report["network_ms"] == pytest.approx(45.0)
+        assert report["server_ms"] == pytest.approx(300.0)
+
 
 # ============================================================================
 # Error Handling Tests
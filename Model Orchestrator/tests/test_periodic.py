@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Unit tests for periodic background tasks
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from periodic import PeriodicTask
+
+
+# ============================================================================
+# Periodic Task Tests
+# ============================================================================
+
+class TestPeriodicTask:
+    """Test scheduling, error handling and stopping"""
+
+    @pytest.mark.asyncio
+    async def test_step_errors_do_not_stop_loop(self):
+        """Test a failing step is logged and the next one still runs"""
+        runs = []
+
+        async def step():
+            runs.append(len(runs))
+            if len(runs) == 1:
+                raise RuntimeError("Ollama unreachable")
+
+        task = PeriodicTask(step, lambda: 0, "Test step", run_first=True)
+        task.start()
+        task.start()  # Already running: no second loop
+        while len(runs) < 3:
+            await asyncio.sleep(0)
+
+        await task.stop()
+        assert not task.running
+        assert runs[:3] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_interval_read_each_round(self):
+        """Test a step can push back the next run by changing the interval"""
+        runs = []
+        interval = {"s": 0.0}
+
+        async def step():
+            runs.append(1)
+            interval["s"] = 3600.0
+
+        task = PeriodicTask(step, lambda: interval["s"], "Test step")
+        task.start()
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert runs == [1]
+        assert task.running
+        await task.stop()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Unit tests for predictive preloading
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from preloader import Preloader
+
+ROUTES = {"code_generation": "code:7b", "debugging": "code:7b", "conversation": "chat:8b", "reasoning": "big:32b"}
+
+
+@pytest.fixture
+def make_preloader(make_manager, make_keep_alive):
+    def make(budget_gb=10.0, keep_alive_models=()):
+        manager = make_manager(budget_gb=budget_gb)
+        keep_alive = make_keep_alive(keep_alive_models, loaded=manager.loaded)
+        return Preloader(manager, keep_alive, route=ROUTES.get, window=60, horizon=60)
+    return make
+
+
+async def _settle(preloader):
+    await asyncio.gather(*preloader._inflight.values())
+
+
+# ============================================================================
+# Preloader Tests
+# ============================================================================
+
+class TestPreloader:
+    """Test prediction, the RAM budget and cancelling stale preloads"""
+
+    def test_predict_from_mix_and_queue(self, make_preloader):
+        """Test recent task types and queued work add up per routed model"""
+        preloader = make_preloader()
+        preloader.observe("code_generation", now=0)
+        preloader.observe("debugging", now=50)
+        preloader.enqueue("conversation", 3)
+
+        assert preloader.predict(now=55) == {"code:7b": 2.0, "chat:8b": 3.0}
+        assert preloader.predict(now=100) == {"code:7b": 1.0, "chat:8b": 3.0}  # First one left the window
+
+        preloader.dequeue("conversation", 3)
+        assert "chat:8b" not in preloader.predict(now=100)
+
+    def test_plan_within_budget(self, make_preloader):
+        """Test the most wanted models are chosen while they fit, pinned models are skipped"""
+        preloader = make_preloader(budget_gb=10.0, keep_alive_models=["chat:8b"])
+        preloader.enqueue("reasoning", 5)
+        preloader.enqueue("conversation", 4)
+        preloader.enqueue("code_generation", 2)
+
+        assert preloader.plan() == ["code:7b"]  # big:32b does not fit, chat:8b is pinned
+
+    def test_plan_from_snapshots(self, make_preloader):
+        """Test planning uses the in-flight and pinned snapshots it is handed"""
+        preloader = make_preloader(budget_gb=10.0)
+        preloader.enqueue("reasoning", 5)
+        preloader.enqueue("code_generation", 2)
+        preloader.enqueue("conversation")
+
+        # chat:8b's load holds 5GB of headroom, code:7b is pinned, big:32b does not fit
+        assert preloader.plan(inflight=["chat:8b"], pinned=["code:7b"]) == ["chat:8b"]
+        assert preloader.plan(predicted={"code:7b": 1.0}, inflight=[], pinned=[]) == ["code:7b"]
+
+    @pytest.mark.asyncio
+    async def test_preload_then_unload_unused(self, make_preloader):
+        """Test a predicted model is loaded once and unloaded when no longer predicted and unused"""
+        preloader = make_preloader()
+        preloader.enqueue("code_generation", 2)
+
+        assert await preloader.evaluate() == ["code:7b"]
+        await _settle(preloader)
+        assert await preloader.evaluate() == []
+        assert preloader.keep_alive.preloads == ["code:7b"]
+
+        preloader.dequeue("code_generation", 2)
+        await preloader.evaluate()
+        assert preloader.keep_alive.unloaded == ["code:7b"]
+        assert preloader.preloaded == {}
+
+    @pytest.mark.asyncio
+    async def test_used_preload_is_kept(self, make_preloader):
+        """Test a preload that served traffic is left to expire on its own"""
+        preloader = make_preloader()
+        preloader.enqueue("conversation")
+        await preloader.evaluate()
+        await _settle(preloader)
+
+        preloader.manager.demand.record("chat:8b")
+        preloader.dequeue("conversation")
+        await preloader.evaluate()
+        assert preloader.keep_alive.unloaded == []
+        assert preloader.preloaded == {}
+
+    @pytest.mark.asyncio
+    async def test_inflight_preload_cancelled(self, make_preloader):
+        """Test a preload still loading is cancelled once its work is gone"""
+        preloader = make_preloader()
+        preloader.keep_alive.release.clear()
+        preloader.enqueue("code_generation")
+        await preloader.evaluate()
+        await asyncio.sleep(0)
+        task = preloader._inflight["code:7b"]
+
+        preloader.dequeue("code_generation")
+        await preloader.evaluate()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert task.cancelled()
+        assert preloader.stats["cancelled"] == 1
+        assert preloader.keep_alive.unloaded == []  # Never became resident
+        await preloader.stop()
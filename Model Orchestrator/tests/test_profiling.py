@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Unit tests for stage timers and the sampling profiler
+"""
+
+import os
+import sys
+import time
+import signal
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from profiling import StageTimers, SamplingProfiler, install_signal_toggle
+
+
+def _busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+# ============================================================================
+# StageTimers Tests
+# ============================================================================
+
+class TestStageTimers:
+    """Test per-stage histograms"""
+
+    def test_report(self):
+        """Test stage quantiles are reported in ms, including sub-microsecond stages"""
+        timers = StageTimers()
+        for _ in range(99):
+            timers.record("analyze_task", 20_000)
+        timers.record("analyze_task", 2_000_000)
+        timers.record("score_model", 800)
+
+        report = timers.report()
+
+        assert report["analyze_task"]["count"] == 100
+        assert report["analyze_task"]["p50_ms"] == pytest.approx(0.02, rel=0.02)
+        assert report["analyze_task"]["max_ms"] == pytest.approx(2.0)
+        assert report["score_model"]["p50_ms"] == pytest.approx(0.0008, rel=0.02)
+
+    def test_folds_in_batches(self):
+        """Test pending samples fold into the sketch without being lost"""
+        timers = StageTimers()
+        for i in range(StageTimers.FOLD_AT + 10):
+            timers.record("make_request", 1_000_000 + i)
+
+        assert len(timers._pending["make_request"]) == 10
+        assert timers.report()["make_request"]["count"] == StageTimers.FOLD_AT + 10
+
+        timers.reset()
+        assert timers.report() == {}
+
+
+# ============================================================================
+# Sampling Profiler Tests
+# ============================================================================
+
+class TestSamplingProfiler:
+    """Test collapsed-stack capture"""
+
+    def test_collapsed_stacks(self, tmp_path):
+        """Test samples of a busy thread land in the collapsed output"""
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+        worker.start()
+
+        profiler = SamplingProfiler(interval=0.001, output=tmp_path / "profile.folded")
+        profiler.start()
+        time.sleep(0.2)
+        profiler.stop()
+        stop.set()
+        worker.join()
+
+        lines = (tmp_path / "profile.folded").read_text().splitlines()
+        busy = [line for line in lines if line.startswith("busy-worker;")]
+        assert profiler.samples > 0
+        assert any("_busy_loop (test_profiling.py:" in line for line in busy)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    @pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="requires SIGUSR2")
+    def test_signal_toggle(self, tmp_path):
+        """Test a signal starts the profiler and a second one writes the profile"""
+        previous = signal.getsignal(signal.SIGUSR2)
+        try:
+            assert install_signal_toggle(signal.SIGUSR2, tmp_path, interval=0.001)
+            os.kill(os.getpid(), signal.SIGUSR2)
+            time.sleep(0.05)
+            os.kill(os.getpid(), signal.SIGUSR2)
+
+            deadline = time.time() + 5
+            while not list(tmp_path.glob("*.folded")) and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+
+        (profile,) = tmp_path.glob(f"orchestrator-{os.getpid()}-*.folded")
+        assert "MainThread;" in profile.read_text()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the RAM monitor backends and sampler
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ram_monitor import RAMMonitor, RAMTier, LinuxMemoryBackend, MemorySample, GB
+
+MEMINFO = """\
+MemTotal:       65536000 kB
+MemFree:         8192000 kB
+MemAvailable:   40960000 kB
+Buffers:          102400 kB
+"""
+
+PSI = """\
+some avg10=1.50 avg60=0.75 avg300=0.10 total=123456
+full avg10=0.50 avg60=0.25 avg300=0.00 total=4567
+"""
+
+
+def _write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def proc(tmp_path):
+    root = tmp_path / "proc"
+    _write(root / "meminfo", MEMINFO)
+    _write(root / "pressure" / "memory", PSI)
+    return root
+
+
+# ============================================================================
+# Linux Backend Tests
+# ============================================================================
+
+class TestLinuxMemoryBackend:
+    """Test /proc and cgroup parsing against fake trees"""
+
+    def test_host_meminfo(self, proc, tmp_path):
+        """Test MemAvailable drives availability when there is no cgroup"""
+        monitor = RAMMonitor(LinuxMemoryBackend(proc, tmp_path / "cgroup"))
+        status = monitor.get_current_status()
+
+        assert monitor.tier == RAMTier.TIER_32GB
+        assert status.total_gb == pytest.approx(65536000 * 1024 / GB)
+        assert status.available_gb == pytest.approx(40960000 * 1024 / GB)
+        assert status.used_gb == pytest.approx(status.total_gb - status.available_gb)
+        assert status.pressure.some_avg10 == 1.5
+        assert status.pressure.full_total_us == 4567
+        assert status.to_dict()["pressure"]["some_avg60"] == 0.75
+
+    def test_cgroup_v2_limit(self, proc, tmp_path):
+        """Test the tightest ancestor memory.max caps total and available"""
+        cgroup = tmp_path / "cgroup"
+        leaf = cgroup / "system.slice" / "ollama.service"
+        _write(proc / "self" / "cgroup", "0::/system.slice/ollama.service\n")
+        _write(cgroup / "cgroup.controllers", "cpu memory\n")
+        _write(cgroup / "system.slice" / "memory.max", f"{16 * GB}\n")
+        _write(leaf / "memory.max", "max\n")
+        _write(leaf / "memory.current", f"{10 * GB}\n")
+        _write(leaf / "memory.stat", f"anon {8 * GB}\ninactive_file {2 * GB}\n")
+        _write(leaf / "memory.pressure", "some avg10=9.00 avg60=0.00 avg300=0.00 total=1\n")
+
+        backend = LinuxMemoryBackend(proc, cgroup)
+        status = RAMMonitor(backend).get_current_status()
+
+        assert backend.cgroup_version == 2
+        assert status.total_gb == pytest.approx(16)
+        assert status.available_gb == pytest.approx(8)  # 16 - (10 - 2 reclaimable)
+        assert status.pressure.some_avg10 == 9.0
+
+    def test_cgroup_v1_limit(self, proc, tmp_path):
+        """Test v1 limits apply and the unlimited sentinel is ignored"""
+        cgroup = tmp_path / "cgroup"
+        leaf = cgroup / "memory" / "docker" / "abc"
+        _write(proc / "self" / "cgroup", "4:memory:/docker/abc\n0::/\n")
+        _write(leaf / "memory.limit_in_bytes", f"{4 * GB}\n")
+        _write(leaf / "memory.usage_in_bytes", f"{3 * GB}\n")
+        _write(leaf / "memory.stat", f"cache {GB}\ntotal_inactive_file {GB}\n")
+
+        status = RAMMonitor(LinuxMemoryBackend(proc, cgroup)).get_current_status()
+        assert status.total_gb == pytest.approx(4)
+        assert status.available_gb == pytest.approx(2)
+        assert status.pressure.some_avg10 == 1.5  # Falls back to /proc/pressure
+
+        _write(leaf / "memory.limit_in_bytes", "9223372036854771712\n")
+        status = RAMMonitor(LinuxMemoryBackend(proc, cgroup)).get_current_status()
+        assert status.total_gb == pytest.approx(65536000 * 1024 / GB)
+
+    def test_missing_pressure(self, proc, tmp_path):
+        """Test kernels without PSI report no pressure rather than failing"""
+        (proc / "pressure" / "memory").unlink()
+        status = RAMMonitor(LinuxMemoryBackend(proc, tmp_path / "cgroup")).get_current_status()
+
+        assert status.pressure is None
+        assert status.available_gb > 0
+
+    @pytest.mark.skipif(not LinuxMemoryBackend.available(), reason="requires /proc/meminfo")
+    def test_real_host(self):
+        """Test the default backend reads this machine without subprocesses"""
+        monitor = RAMMonitor()
+        status = monitor.get_current_status()
+
+        assert isinstance(monitor.backend, LinuxMemoryBackend)
+        assert monitor.total_ram > 0
+        assert 0 < status.available_gb <= status.total_gb
+
+
+class _StepBackend:
+    """Backend whose available memory drops by 1 GB per sample"""
+
+    def __init__(self):
+        self.available = 32 * GB
+        self.reads = 0
+
+    def total_bytes(self) -> int:
+        return 64 * GB
+
+    def sample(self):
+        self.reads += 1
+        self.available -= GB
+        return MemorySample(total=64 * GB, free=0, available=self.available)
+
+
+# ============================================================================
+# Sampler Tests
+# ============================================================================
+
+class TestRAMSampler:
+    """Test the background sampler and snapshot reads"""
+
+    def test_checks_read_snapshot(self):
+        """Test capacity checks reuse the latest sample instead of reading memory"""
+        backend = _StepBackend()
+        monitor = RAMMonitor(backend)
+        sampler = monitor.start_sampler(interval=3600)
+        try:
+            reads = backend.reads
+            for _ in range(10):
+                assert monitor.can_load_model(4.9)[0]
+            monitor.get_model_capacity()
+            assert backend.reads == reads
+            assert monitor.get_status() is sampler.latest
+            assert monitor.get_model_budget_gb() == pytest.approx(sampler.latest.available_gb - 8)
+            assert monitor.get_model_budget_gb(reclaimable_gb=100) == 60.0  # 64GB tier cap
+        finally:
+            monitor.stop_sampler()
+
+        assert monitor.sampler is None
+        assert not sampler.running
+
+    def test_ring_buffer_and_slope(self):
+        """Test history is bounded and the trend follows available memory"""
+        monitor = RAMMonitor(_StepBackend())
+        sampler = monitor.start_sampler(interval=0.01, history=5)
+        try:
+            deadline = time.time() + 5
+            while len(sampler.history) < 5 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            monitor.stop_sampler()
+
+        assert len(sampler.history) == 5
+        assert sampler.available_slope() < 0
+        assert sampler.available_slope(window=0) == 0.0
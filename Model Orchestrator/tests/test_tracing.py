@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit tests for request tracing
+"""
+
+import sys
+import json
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tracing import (Tracer, JsonlSpanExporter, OtlpFileSpanExporter, NOOP_SPAN,
+                     child_span, current_span, open_tracer, TRACE_FILE_ENV_VAR)
+
+
+def _read_spans(path: Path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+# ============================================================================
+# Tracer Tests
+# ============================================================================
+
+class TestTracer:
+    """Test nesting, sampling and the disabled fast path"""
+
+    def test_disabled_tracer_hands_out_noop(self, monkeypatch):
+        """Test tracing is off without a trace file"""
+        monkeypatch.delenv(TRACE_FILE_ENV_VAR, raising=False)
+        tracer = open_tracer()
+
+        with tracer.span("select_model", strategy="balanced") as span:
+            span.set_attribute("model", "gpt-4o")
+            assert current_span() is None
+
+        assert span is NOOP_SPAN
+        assert child_span("http_request") is NOOP_SPAN
+
+    def test_parent_child_across_tasks(self, tmp_path):
+        """Test spans nest, including spans started inside gathered tasks"""
+        path = tmp_path / "trace.jsonl"
+        tracer = Tracer(JsonlSpanExporter(path))
+
+        async def call(model_id):
+            with child_span("call_model", model=model_id) as span:
+                span.set_attribute("output_tokens", 10)
+
+        async def consensus():
+            with tracer.span("consensus_call", num_models=2):
+                await asyncio.gather(call("gpt-4o"), call("grok-4"))
+
+        asyncio.run(consensus())
+        tracer.close()
+
+        spans = {span["name"] + span["attributes"].get("model", ""): span for span in _read_spans(path)}
+        root = spans["consensus_call"]
+        assert root["parent_id"] is None
+        for child in ("call_modelgpt-4o", "call_modelgrok-4"):
+            assert spans[child]["parent_id"] == root["span_id"]
+            assert spans[child]["trace_id"] == root["trace_id"]
+            assert spans[child]["attributes"]["output_tokens"] == 10
+
+    def test_error_status(self, tmp_path):
+        """Test an exception marks the span as failed and still propagates"""
+        path = tmp_path / "trace.jsonl"
+        tracer = Tracer(JsonlSpanExporter(path))
+
+        with pytest.raises(ValueError):
+            with tracer.span("call_model"):
+                raise ValueError("No API client for provider: xai")
+        tracer.close()
+
+        (span,) = _read_spans(path)
+        assert span["status"] == "error"
+        assert span["error"] == "ValueError: No API client for provider: xai"
+
+    def test_unsampled_trace_drops_children(self, tmp_path):
+        """Test the sampling decision at the root covers the whole trace"""
+        path = tmp_path / "trace.jsonl"
+        tracer = Tracer(JsonlSpanExporter(path), sample_rate=1e-12)
+
+        with tracer.span("route_request"):
+            with tracer.span("select_model") as span:
+                assert span is NOOP_SPAN
+                assert child_span("http_request") is NOOP_SPAN
+        tracer.close()
+
+        assert not path.exists()
+
+    def test_batches_written_off_caller_thread(self, tmp_path):
+        """Test a full batch is written by the writer thread, not the code ending the span"""
+        path = tmp_path / "trace.jsonl"
+        exporter = JsonlSpanExporter(path, batch_size=2, flush_interval=60)
+        writers = []
+        encode = exporter.encode
+        exporter.encode = lambda spans: writers.append(threading.current_thread()) or encode(spans)
+        tracer = Tracer(exporter)
+
+        for name in ("select_model", "call_model"):
+            with tracer.span(name):
+                pass
+        deadline = time.monotonic() + 5
+        while exporter.exported < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert exporter.exported == 2
+        assert writers and threading.current_thread() not in writers
+        tracer.close()
+        assert len(_read_spans(path)) == 2
+
+    def test_otlp_file_format(self, tmp_path):
+        """Test OTLP/JSON export carries ids, typed attributes and status"""
+        path = tmp_path / "trace.otlp.jsonl"
+        tracer = open_tracer(path, format="otlp")
+
+        with tracer.span("route_request", strategy="balanced"):
+            with tracer.span("call_model", model="gpt-4o", attempt=1, stream=False, cost=0.25):
+                pass
+        tracer.close()
+
+        (request,) = _read_spans(path)
+        spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        child, root = spans
+        assert child["parentSpanId"] == root["spanId"]
+        assert "parentSpanId" not in root
+        assert child["status"] == {"code": 1}
+        assert {"key": "attempt", "value": {"intValue": "1"}} in child["attributes"]
+        assert {"key": "stream", "value": {"boolValue": False}} in child["attributes"]
+        assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
+
+    def test_otlp_error_status_and_service(self, tmp_path):
+        """Test OTLP export names the service and marks failed spans with code 2"""
+        path = tmp_path / "trace.otlp.jsonl"
+        tracer = Tracer(OtlpFileSpanExporter(path, service_name="router"))
+
+        with pytest.raises(ValueError):
+            with tracer.span("call_model"):
+                raise ValueError("No API client for provider: xai")
+        tracer.close()
+
+        (request,) = _read_spans(path)
+        resource = request["resourceSpans"][0]
+        assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "router"}}]
+        (span,) = resource["scopeSpans"][0]["spans"]
+        assert span["status"] == {"code": 2, "message": "ValueError: No API client for provider: xai"}
+
+    def test_unknown_format_rejected(self, tmp_path):
+        """Test a bad export format fails at startup, not per span"""
+        with pytest.raises(ValueError):
+            open_tracer(tmp_path / "trace.txt", format="zipkin")
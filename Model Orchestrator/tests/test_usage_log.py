@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the durable usage log
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from usage_store import UsageStore, UsageAggregates
+from usage_log import UsageLog, open_usage_log, USAGE_LOG_ENV_VAR
+
+
+def _append(log, count, start=1_700_000_000.0, model_id="gpt-4o", provider="openai"):
+    for i in range(count):
+        log.append(start + i, model_id, provider, "code_generation", 100, 50, 0.01, 200 + i, i % 4 != 0)
+
+
+# ============================================================================
+# UsageLog Tests
+# ============================================================================
+
+class TestUsageLog:
+    """Test batching, flushing and replay"""
+
+    def test_append_is_queued_until_flush(self, tmp_path):
+        """Test append only queues; flush writes one batch"""
+        log = UsageLog(tmp_path / "usage.db")
+        _append(log, 10)
+
+        assert len(log) == 0
+        assert log.flush() == 10
+        assert len(log) == 10
+        log.close()
+
+    def test_background_writer_flushes_batches(self, tmp_path):
+        """Test the writer thread drains the queue once a batch is pending"""
+        log = UsageLog(tmp_path / "usage.db", flush_interval=60, batch_size=50)
+        log.start()
+        _append(log, 50)
+
+        deadline = time.time() + 5
+        while log.written < 50 and time.time() < deadline:
+            time.sleep(0.01)
+        log.close()
+
+        assert log.written == 50
+
+    def test_close_flushes_pending(self, tmp_path):
+        """Test records queued before close survive a reopen"""
+        path = tmp_path / "usage.db"
+        log = UsageLog(path, flush_interval=60)
+        log.start()
+        _append(log, 7)
+        log.close()
+
+        reopened = UsageLog(path)
+        assert len(reopened) == 7
+        reopened.close()
+
+    def test_overflow_drops_oldest(self, tmp_path):
+        """Test a full queue drops records instead of blocking"""
+        log = UsageLog(tmp_path / "usage.db", max_pending=5)
+        _append(log, 8)
+
+        assert log.dropped == 3
+        assert log.flush() == 5
+        log.close()
+
+    def test_replay_rebuilds_state(self, tmp_path):
+        """Test replay restores aggregates, time buckets and the newest ring entries"""
+        log = UsageLog(tmp_path / "usage.db")
+        now = time.time()
+        _append(log, 20, start=now - 100)
+        _append(log, 5, start=now - 10, model_id="llama3.1:8b", provider="local")
+        log.flush()
+
+        aggregates = UsageAggregates()
+        store = UsageStore(capacity=10)
+        log.replay_into(aggregates, store, now=now)
+        log.close()
+
+        report = aggregates.report()
+        assert report["usage_count"] == {"gpt-4o": 20, "llama3.1:8b": 5}
+        assert report["total_cost"] == pytest.approx(0.25)
+        assert report["by_provider"]["local"] == pytest.approx(0.05)
+        assert report["by_task_type"]["code_generation"] == pytest.approx(0.25)
+        assert aggregates.breakdown("model")["gpt-4o"]["failures"] == 5
+        assert sum(bucket["requests"] for bucket in aggregates.time_series("minute")) == 25
+
+        assert len(store) == 10
+        assert [r["model_id"] for r in store.records()][-5:] == ["llama3.1:8b"] * 5
+
+    def test_open_from_environment(self, tmp_path, monkeypatch):
+        """Test the log is opt-in via ORCHESTRATOR_USAGE_LOG"""
+        monkeypatch.delenv(USAGE_LOG_ENV_VAR, raising=False)
+        assert open_usage_log() is None
+
+        monkeypatch.setenv(USAGE_LOG_ENV_VAR, str(tmp_path / "env.db"))
+        log = open_usage_log()
+        assert log.path == tmp_path / "env.db"
+        log.close()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the columnar usage ring buffer and running aggregates
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from usage_store import UsageStore, UsageAggregates
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def store():
+    """Small store with a mix of models, providers and ages"""
+    store = UsageStore(capacity=8)
+    now = time.time()
+    store.append("gpt-4o", 100, 50, 0.01, 200, True, provider="openai", timestamp=now - 120)
+    store.append("gpt-4o", 100, 50, 0.01, 400, False, provider="openai", timestamp=now - 30)
+    store.append("llama3.1:8b", 200, 80, 0.0, 900, True, provider="local", timestamp=now - 10)
+    store.append("claude-sonnet-4", 300, 90, 0.02, 600, True, provider="anthropic", timestamp=now - 5)
+    return store
+
+
+# ============================================================================
+# UsageStore Tests
+# ============================================================================
+
+class TestUsageStore:
+    """Test ring buffer semantics and vectorized windows"""
+
+    def test_append_and_records(self, store):
+        """Test records come back oldest first in the history-entry format"""
+        records = store.records()
+
+        assert len(store) == 4
+        assert [r["model_id"] for r in records] == ["gpt-4o", "gpt-4o", "llama3.1:8b", "claude-sonnet-4"]
+        assert records[1] == {**records[1], "input_tokens": 100, "latency_ms": 400.0, "success": False}
+        assert isinstance(records[0]["timestamp"], str)
+
+    def test_wraps_at_capacity(self):
+        """Test the oldest entries are overwritten once full"""
+        store = UsageStore(capacity=3)
+        for i in range(7):
+            store.append(f"model-{i}", i, i, 0.0, i)
+
+        assert len(store) == 3
+        assert [r["model_id"] for r in store.records()] == ["model-4", "model-5", "model-6"]
+        assert store.usage_counts() == {"model-4": 1, "model-5": 1, "model-6": 1}
+
+    def test_time_window(self, store):
+        """Test aggregation over the last N seconds"""
+        window = store.aggregate(seconds=60)
+
+        assert window["requests"] == 3
+        assert window["input_tokens"] == 600
+        assert window["mean_latency_ms"] == pytest.approx(633.33, abs=0.01)
+        assert window["success_rate"] == pytest.approx(2 / 3)
+
+    def test_model_and_provider_filters(self, store):
+        """Test windows restricted to one model or provider"""
+        assert store.aggregate(model_id="gpt-4o")["cost"] == pytest.approx(0.02)
+        assert store.aggregate(provider="local")["requests"] == 1
+        assert store.aggregate(model_id="missing")["requests"] == 0
+
+    def test_grouped_reports(self, store):
+        """Test per-model and per-provider breakdowns"""
+        by_model = store.by_model()
+        by_provider = store.by_provider(seconds=60)
+
+        assert by_model["gpt-4o"]["requests"] == 2
+        assert by_model["gpt-4o"]["mean_latency_ms"] == pytest.approx(300)
+        assert set(by_provider) == {"openai", "local", "anthropic"}
+        assert by_provider["openai"]["requests"] == 1
+
+    def test_empty_store(self):
+        """Test reports on an empty store"""
+        store = UsageStore()
+
+        assert store.records() == []
+        assert store.by_model() == {}
+        assert store.aggregate()["requests"] == 0
+
+    def test_reads_during_writes(self):
+        """Test readers in other threads see a consistent, full buffer while models are interned"""
+        store = UsageStore(capacity=64)
+        for _ in range(64):
+            store.append("seed", 1, 1, 0.001, 100, provider="seed")
+        done = threading.Event()
+        errors = []
+
+        def writer():
+            for i in range(5000):
+                store.append(f"model-{i}", 1, 1, 0.001, 100, provider=f"provider-{i % 7}")
+            done.set()
+
+        def reader():
+            while not done.is_set():
+                try:
+                    assert sum(r["requests"] for r in store.by_provider().values()) == 64
+                    assert sum(store.usage_counts().values()) == 64
+                    assert len(store.records()) == 64
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+
+# ============================================================================
+# UsageAggregates Tests
+# ============================================================================
+
+class TestUsageAggregates:
+    """Test write-time aggregates and the cost report built from them"""
+
+    def test_report(self):
+        """Test report totals per model, provider and task type"""
+        aggregates = UsageAggregates()
+        aggregates.record("gpt-4o", "openai", 100, 50, 0.5, 200, task_type="code_generation")
+        aggregates.record("gpt-4o", "openai", 100, 50, 0.5, 300, success=False)
+        aggregates.record("llama3.1:8b", "local", 100, 50, 0.0, 900, task_type="code_generation")
+
+        report = aggregates.report()
+
+        assert report["total_cost"] == pytest.approx(1.0)
+        assert report["by_model"] == {"gpt-4o": 1.0, "llama3.1:8b": 0.0}
+        assert report["by_provider"] == {"openai": 1.0, "local": 0.0}
+        assert report["by_task_type"] == {"code_generation": 0.5}
+        assert report["usage_count"] == {"gpt-4o": 2, "llama3.1:8b": 1}
+
+        breakdown = aggregates.breakdown("model")["gpt-4o"]
+        assert breakdown["failures"] == 1
+        assert breakdown["mean_latency_ms"] == pytest.approx(250)
+
+    def test_time_buckets(self):
+        """Test minute buckets split by timestamp and drop the oldest past retention"""
+        aggregates = UsageAggregates()
+        start = 1_700_000_040.0
+        for minute in range(125):
+            aggregates.record("gpt-4o", "openai", 1, 1, 0.1, 100, timestamp=start + minute * 60)
+            aggregates.record("gpt-4o", "openai", 1, 1, 0.1, 100, timestamp=start + minute * 60 + 1)
+
+        minutes = aggregates.time_series("minute")
+        hours = aggregates.time_series("hour")
+
+        assert len(minutes) == 120
+        assert all(bucket["requests"] == 2 for bucket in minutes)
+        assert sum(bucket["requests"] for bucket in hours) == 250
+
+    def test_concurrent_writers(self):
+        """Test totals are exact under concurrent writes from many threads"""
+        aggregates = UsageAggregates()
+
+        def writer():
+            for _ in range(2000):
+                aggregates.record("gpt-4o", "openai", 1, 1, 0.25, 100)
+
+        threads = [threading.Thread(target=writer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report = aggregates.report()
+        assert report["usage_count"]["gpt-4o"] == 16000
+        assert report["total_cost"] == pytest.approx(4000)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the demand-driven warm set
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from warm_set import DemandTracker, LoadTimes, WarmSetPlanner, knapsack
+
+
+@pytest.fixture
+def make_planner(make_manager):
+    def make(keep_alive, budget_gb=10.0, **kwargs):
+        return WarmSetPlanner(make_manager(), keep_alive, budget_gb=budget_gb, **kwargs)
+    return make
+
+
+def _requests(demand, model, count, now=0.0):
+    for _ in range(count):
+        demand.record(model, now)
+
+
+# ============================================================================
+# Warm Set Tests
+# ============================================================================
+
+class TestWarmSet:
+    """Test demand decay, the knapsack and hysteresis"""
+
+    def test_demand_decays(self):
+        """Test the rate halves every half-life"""
+        demand = DemandTracker(half_life=100)
+        _requests(demand, "chat:8b", 10)
+
+        assert demand.rate("chat:8b", 100) == pytest.approx(demand.rate("chat:8b", 0) / 2)
+        assert demand.rate("unknown", 0) == 0
+
+    def test_knapsack(self):
+        """Test the optimum beats greedy-by-value and respects the budget"""
+        items = {"a": (10.0, 6.0), "b": (7.0, 5.0), "c": (7.0, 5.0)}
+
+        assert sorted(knapsack(items, 10.0)) == ["b", "c"]
+        assert knapsack(items, 4.0) == []
+        assert knapsack({"x": (1.0, 2.1)}, 2.25) == ["x"]
+
+    def test_load_times(self):
+        """Test warm loads are ignored, cold loads smoothed and unknown models estimated"""
+        load_times = LoadTimes(alpha=0.5)
+
+        assert not load_times.record("code:7b", 12.0)
+        assert load_times.record("code:7b", 4000.0)
+        assert load_times.record("code:7b", 2000.0)
+        assert load_times.expected_ms("code:7b", 4.0) == pytest.approx(3000.0)
+        assert load_times.expected_ms("chat:8b", 5.0) == pytest.approx(5.0 * LoadTimes.LOAD_MS_PER_GB)
+
+    def test_value_is_rate_times_cold_start(self, make_planner, make_keep_alive):
+        """Test a rarely used slow-loading model can beat a busy fast one"""
+        keep_alive = make_keep_alive()
+        keep_alive.load_ms = {"small:1b": 500, "code:7b": 20_000}
+        planner = make_planner(keep_alive, budget_gb=4.0)
+        _requests(planner.demand, "small:1b", 10)
+        _requests(planner.demand, "code:7b", 2)
+
+        assert planner.plan(0) == ["code:7b"]
+
+        # Request-measured loads take precedence over keep-alive pins
+        planner.manager.load_times.record("code:7b", 300)
+        assert planner.plan(0) == ["small:1b"]
+
+    def test_hysteresis_and_dwell(self, make_planner, make_keep_alive):
+        """Test a slightly better newcomer does not evict an incumbent, a much better one does"""
+        keep_alive = make_keep_alive(["code:7b"])
+        planner = make_planner(keep_alive, budget_gb=5.0, hysteresis=0.5, min_dwell=100)
+        _requests(planner.demand, "code:7b", 10)
+        _requests(planner.demand, "chat:8b", 9)  # 9 x 5s vs 10 x 4s x 1.5
+
+        assert not planner.apply(planner.plan(0), now=0)
+
+        _requests(planner.demand, "chat:8b", 30)
+        assert planner.apply(planner.plan(0), now=0)
+        assert keep_alive.models == ["chat:8b"]
+
+        # Newly added, so it stays through its dwell time whatever demand does
+        _requests(planner.demand, "code:7b", 500, now=50)
+        assert planner.plan(50) == ["chat:8b"]
+        assert planner.plan(200) == ["code:7b"]
+
+    def test_no_demand_keeps_current_set(self, make_planner, make_keep_alive):
+        """Test the configured models stay until there is demand data"""
+        planner = make_planner(make_keep_alive(["small:1b", "code:7b"]))
+        assert planner.plan(0) == ["small:1b", "code:7b"]
+
+    def test_plan_from_snapshots(self, make_planner, make_keep_alive):
+        """Test planning uses the rate, set and dwell snapshots it is handed"""
+        keep_alive = make_keep_alive(["code:7b"])
+        planner = make_planner(keep_alive, budget_gb=5.0, min_dwell=100)
+
+        # Live state has no demand; the snapshot decides
+        assert planner.plan(0, rates={"chat:8b": 1.0}, current=[], added_at={}) == ["chat:8b"]
+        assert planner.plan(50, rates={"chat:8b": 1.0}, current=["code:7b"],
+                            added_at={"code:7b": 0.0}) == ["code:7b"]
+        assert keep_alive.models == ["code:7b"]
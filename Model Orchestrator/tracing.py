@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Request tracing for Model Orchestrator
+Lightweight parent/child spans carried in a context variable (so they follow
+asyncio tasks), head sampling per trace and batched export to JSONL or
+OTLP/JSON files. A disabled tracer hands out one shared no-op span.
+"""
+
+import os
+import json
+import time
+import atexit
+import random
+import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
+
+logger = logging.getLogger(__name__)
+
+# Set to a file path to record spans; format is "jsonl" (default) or "otlp"
+TRACE_FILE_ENV_VAR = "ORCHESTRATOR_TRACE_FILE"
+TRACE_FORMAT_ENV_VAR = "ORCHESTRATOR_TRACE_FORMAT"
+TRACE_SAMPLE_RATE_ENV_VAR = "ORCHESTRATOR_TRACE_SAMPLE_RATE"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("orchestrator_span", default=None)
+
+
+# ============================================================================
+# Spans
+# ============================================================================
+
+class _NoopSpan:
+    """Span handed out when tracing is off or the trace was not sampled"""
+
+    __slots__ = ()
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+    def add_event(self, name: str, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    """Root of a trace that lost the sampling draw; marks its children unsampled too"""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "start_ns",
+                 "duration_ns", "attributes", "events", "error", "_start", "_token")
+    recording = True
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: int, parent_id: Optional[int],
+                 attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.events: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.start_ns = 0
+        self.duration_ns = 0
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ns = time.perf_counter_ns() - self._start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer._finish(self)
+        return False
+
+    @property
+    def end_ns(self) -> int:
+        return self.start_ns + self.duration_ns
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": f"{self.trace_id:032x}",
+            "span_id": f"{self.span_id:016x}",
+            "parent_id": f"{self.parent_id:016x}" if self.parent_id is not None else None,
+            "name": self.name,
+            "start_time_ns": self.start_ns,
+            "duration_ms": self.duration_ns / 1e6,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+def current_span() -> Optional[Span]:
+    """The span active in this task, if any"""
+    return _current_span.get()
+
+
+def child_span(name: str, **attributes):
+    """
+    Child of the active span, for code with no tracer of its own (API clients)
+
+    Returns the no-op span when there is no active, sampled span.
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.recording:
+        return NOOP_SPAN
+    return Span(parent.tracer, name, parent.trace_id, parent.span_id, attributes)
+
+
+# ============================================================================
+# Exporters
+# ============================================================================
+
+class SpanExporter:
+    """
+    Buffers finished spans and appends them to a file in batches
+
+    export() only queues the span. A writer thread, started with the first
+    span, writes a batch every `flush_interval` seconds or as soon as
+    `batch_size` spans are pending, so ending a span never waits on disk.
+    """
+
+    BATCH_SIZE = 256
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path: Union[str, Path], batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.exported = 0
+        self._buffer: deque = deque()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, span: Span):
+        """Queue one finished span for the writer thread (never blocks on I/O)"""
+        if self._thread is None and not self._closed.is_set():
+            self._start()
+        self._buffer.append(span)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self):
+        with self._flush_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer_loop, name="span-writer", daemon=True)
+                self._thread.start()
+
+    def _writer_loop(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything queued so far"""
+        with self._flush_lock:
+            batch = []
+            buffer = self._buffer
+            while buffer:
+                batch.append(buffer.popleft())
+            if not batch:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(self.encode(batch))
+                self.exported += len(batch)
+            except OSError as e:
+                logger.error("Trace export failed, %d spans lost: %s", len(batch), e)
+
+    def close(self):
+        """Stop the writer thread and write out what is left"""
+        self._closed.set()
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def encode(self, spans: List[Span]) -> str:
+        raise NotImplementedError
+
+
+class JsonlSpanExporter(SpanExporter):
+    """One JSON object per span per line"""
+
+    def encode(self, spans: List[Span]) -> str:
+        return "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+
+
+class OtlpFileSpanExporter(SpanExporter):
+    """
+    OTLP/JSON trace export, one ExportTraceServiceRequest per line
+
+    Same layout as the OpenTelemetry Collector file exporter, so the file can
+    be replayed by the collector's otlpjsonfile receiver.
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: int = SpanExporter.BATCH_SIZE,
+                 flush_interval: float = SpanExporter.FLUSH_INTERVAL,
+                 service_name: str = "model-orchestrator"):
+        super().__init__(path, batch_size, flush_interval)
+        self.service_name = service_name
+
+    @staticmethod
+    def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        encoded = []
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                encoded.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                encoded.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                encoded.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                encoded.append({"key": key, "value": {"stringValue": str(value)}})
+        return encoded
+
+    def _span(self, span: Span) -> Dict[str, Any]:
+        encoded = {
+            "traceId": f"{span.trace_id:032x}",
+            "spanId": f"{span.span_id:016x}",
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": self._attributes(span.attributes),
+            "events": [
+                {"timeUnixNano": str(event["time_ns"]), "name": event["name"],
+                 "attributes": self._attributes(event["attributes"])}
+                for event in span.events
+            ],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id is not None:
+            encoded["parentSpanId"] = f"{span.parent_id:016x}"
+        return encoded
+
+    def encode(self, spans: List[Span]) -> str:
+        request = {"resourceSpans": [{
+            "resource": {"attributes": self._attributes({"service.name": self.service_name})},
+            "scopeSpans": [{
+                "scope": {"name": "model-orchestrator"},
+                "spans": [self._span(span) for span in spans],
+            }],
+        }]}
+        return json.dumps(request) + "\n"
+
+
+EXPORTERS = {"jsonl": JsonlSpanExporter, "otlp": OtlpFileSpanExporter}
+
+
+# ============================================================================
+# Tracer
+# ============================================================================
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to an exporter
+
+    The sampling decision is made once per trace, at its root span; children
+    of an unsampled root are no-ops. Without an exporter every span() call
+    returns the shared no-op span.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.enabled = exporter is not None and sample_rate > 0
+        if exporter is not None:
+            atexit.register(self.close)
+
+    def span(self, name: str, **attributes):
+        """Context manager timing one operation, nested under the active span"""
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = _current_span.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return _UnsampledSpan()
+            return Span(self, name, random.getrandbits(128), None, attributes)
+        if not parent.recording:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def _finish(self, span: Span):
+        self.exporter.export(span)
+
+    def flush(self):
+        if self.exporter is not None:
+            self.exporter.flush()
+
+    def close(self):
+        """Write out buffered spans and stop exporting"""
+        if self.exporter is not None:
+            self.enabled = False
+            self.exporter.close()
+            atexit.unregister(self.close)
+
+
+def open_tracer(path: Optional[Union[str, Path]] = None,
+                format: Optional[str] = None,
+                sample_rate: Optional[float] = None) -> Tracer:
+    """Tracer exporting to `path` (or $ORCHESTRATOR_TRACE_FILE); disabled if unset"""
+    path = path or os.getenv(TRACE_FILE_ENV_VAR)
+    if not path:
+        return Tracer()
+
+    format = format or os.getenv(TRACE_FORMAT_ENV_VAR, "jsonl")
+    if format not in EXPORTERS:
+        raise ValueError(f"Unknown trace format: {format} (expected one of {', '.join(EXPORTERS)})")
+    if sample_rate is None:
+        sample_rate = float(os.getenv(TRACE_SAMPLE_RATE_ENV_VAR, "1.0"))
+
+    tracer = Tracer(EXPORTERS[format](path), sample_rate)
+    logger.info("✓ Tracing to %s (%s, sample rate %g)", path, format, sample_rate)
+    return tracer
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Pluggable HTTP transports for API clients
+aiohttp (HTTP/1.1, default) and httpx (HTTP/2 multiplexing) backends
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Any, AsyncIterator
+
+import aiohttp
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+    HTTP2_AVAILABLE = httpx is not None
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Environment variables for transport selection, e.g.
+#   ORCHESTRATOR_TRANSPORT=aiohttp            (default for all providers)
+#   ORCHESTRATOR_TRANSPORT_XAI=http2          (override for one provider)
+TRANSPORT_ENV_VAR = "ORCHESTRATOR_TRANSPORT"
+DEFAULT_TRANSPORT = "aiohttp"
+
+
+# Per-request timing keys (milliseconds) written by the transports:
+#   queue_ms    waiting for a free pooled connection (aiohttp)
+#   dns_ms      host resolution (aiohttp; httpx folds it into connect_ms)
+#   connect_ms  TCP connect, plus the TLS handshake on aiohttp
+#   tls_ms      TLS handshake (httpx only - aiohttp has no separate hook)
+#   ttfb_ms     request sent -> response headers received
+#   body_ms     response body transfer
+# BaseAPIClient adds decode_ms, retry_ms and attempts.
+
+# Timing stages attributable to the network rather than model generation
+NETWORK_TIMING_STAGES = ("queue_ms", "dns_ms", "connect_ms", "tls_ms", "body_ms", "retry_ms")
+
+
+def timing_report(timing_totals: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    Mean per-request stage timings by model from summed totals
+
+    `timing_totals` maps model -> {"requests": n, stage: total_ms, ...}.
+    network_ms sums NETWORK_TIMING_STAGES; server_ms is time to first byte.
+    """
+    report = {}
+    for model_id, totals in timing_totals.items():
+        requests = totals["requests"]
+        means = {stage: total / requests for stage, total in totals.items() if stage != "requests"}
+        means["requests"] = requests
+        means["network_ms"] = sum(means.get(stage, 0.0) for stage in NETWORK_TIMING_STAGES)
+        means["server_ms"] = means.get("ttfb_ms", 0.0)
+        report[model_id] = means
+    return report
+
+
+class TransportResponse:
+    """Fully read HTTP response returned by a transport"""
+
+    __slots__ = ("status", "body")
+
+    def __init__(self, status: int, body: bytes):
+        self.status = status
+        self.body = body
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class Transport(ABC):
+    """Base class for HTTP transports used by BaseAPIClient"""
+
+    name = "base"
+    idle_timeout = 30.0  # seconds an idle pooled connection is kept open
+
+    @abstractmethod
+    async def request(self,
+                      method: str,
+                      url: str,
+                      headers: Optional[Dict[str, str]] = None,
+                      json: Optional[Dict] = None,
+                      timings: Optional[Dict[str, float]] = None) -> TransportResponse:
+        """Send a request and read the whole body, recording stage timings if a dict is given"""
+
+    @abstractmethod
+    def stream_lines(self,
+                     method: str,
+                     url: str,
+                     headers: Optional[Dict[str, str]] = None,
+                     json: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Send a request and yield decoded, stripped body lines (SSE / NDJSON)"""
+
+    async def warm_up(self, url: str, connections: int = 1) -> int:
+        """
+        Open up to `connections` pooled keep-alive connections to url's host
+
+        Concurrent GET probes force separate connections (one for HTTP/2);
+        any HTTP status counts since only the connection matters. GET rather
+        than HEAD: bodyless HEAD replies without Content-Length are not pooled.
+        Returns the number of successful probes.
+        """
+        results = await asyncio.gather(
+            *[self.request("GET", url) for _ in range(connections)],
+            return_exceptions=True
+        )
+        return sum(1 for result in results if not isinstance(result, BaseException))
+
+    @abstractmethod
+    async def close(self):
+        """Release pooled connections"""
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def _add_timing(timings: Dict[str, float], key: str, ms: float):
+    timings[key] = timings.get(key, 0.0) + ms
+
+
+async def _on_request_start(session, ctx, params):
+    ctx.start = time.perf_counter()
+
+
+async def _on_queued_start(session, ctx, params):
+    ctx.queued = time.perf_counter()
+
+
+async def _on_queued_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        _add_timing(ctx.trace_request_ctx, "queue_ms", _elapsed_ms(ctx.queued))
+
+
+async def _on_dns_start(session, ctx, params):
+    ctx.dns = time.perf_counter()
+
+
+async def _on_dns_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        _add_timing(ctx.trace_request_ctx, "dns_ms", _elapsed_ms(ctx.dns))
+
+
+async def _on_create_start(session, ctx, params):
+    ctx.create = time.perf_counter()
+
+
+async def _on_create_end(session, ctx, params):
+    timings = ctx.trace_request_ctx
+    if timings is not None:
+        # Connection creation wraps DNS resolution; report the remainder as connect
+        _add_timing(timings, "connect_ms", _elapsed_ms(ctx.create) - timings.get("dns_ms", 0.0))
+
+
+async def _on_headers_sent(session, ctx, params):
+    ctx.sent = time.perf_counter()
+
+
+async def _on_request_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx["ttfb_ms"] = _elapsed_ms(getattr(ctx, "sent", ctx.start))
+
+
+def _build_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp tracing hooks writing into the per-request timings dict (trace_request_ctx)"""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_queued_start.append(_on_queued_start)
+    trace_config.on_connection_queued_end.append(_on_queued_end)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_connection_create_start.append(_on_create_start)
+    trace_config.on_connection_create_end.append(_on_create_end)
+    trace_config.on_request_headers_sent.append(_on_headers_sent)
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+
+class AiohttpTransport(Transport):
+    """HTTP/1.1 transport on a pooled aiohttp session"""
+
+    name = "aiohttp"
+
+    def __init__(self,
+                 limit: int = 100,
+                 limit_per_host: int = 0,
+                 keepalive_timeout: float = 30.0,
+                 ttl_dns_cache: int = 300,
+                 timeout: float = 300.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.idle_timeout = keepalive_timeout
+        # Long DNS cache so resolutions done during warm-up are reused
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session binds to the running event loop
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[_build_trace_config()],
+            )
+        return self.session
+
+    async def request(self, method, url, headers=None, json=None, timings=None) -> TransportResponse:
+        session = self._get_session()
+        async with session.request(method, url, headers=headers, json=json,
+                                   trace_request_ctx=timings) as response:
+            if timings is None:
+                return TransportResponse(response.status, await response.read())
+
+            body_start = time.perf_counter()
+            body = await response.read()
+            timings["body_ms"] = _elapsed_ms(body_start)
+            return TransportResponse(response.status, body)
+
+    async def stream_lines(self, method, url, headers=None, json=None) -> AsyncIterator[str]:
+        session = self._get_session()
+        async with session.request(method, url, headers=headers, json=json) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"API Error {response.status}: {error_text}")
+
+            async for line in response.content:
+                yield line.decode("utf-8").strip()
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+class HTTPXTransport(Transport):
+    """httpx transport; with http2=True concurrent requests multiplex over few connections"""
+
+    name = "httpx"
+
+    def __init__(self,
+                 http2: bool = True,
+                 http1: bool = True,
+                 max_connections: int = 10,
+                 max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0,
+                 timeout: float = 300.0):
+        if httpx is None:
+            raise ImportError("httpx is required for the httpx transport: pip install httpx")
+
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2 package not installed, httpx transport falling back to HTTP/1.1")
+            http2, http1 = False, True
+
+        self.http2 = http2
+        self.name = "http2" if http2 else "httpx"
+        # http1=False forces HTTP/2 prior knowledge (h2c) on plain-text URLs
+        self.http1 = http1
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.idle_timeout = keepalive_expiry
+        self.timeout = timeout
+        self.client: Optional["httpx.AsyncClient"] = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                http1=self.http1,
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+            )
+        return self.client
+
+    async def request(self, method, url, headers=None, json=None, timings=None) -> TransportResponse:
+        client = self._get_client()
+        if timings is None:
+            response = await client.request(method, url, headers=headers, json=json)
+            return TransportResponse(response.status_code, response.content)
+
+        extensions = {"trace": _httpx_tracer(timings)}
+        async with client.stream(method, url, headers=headers, json=json, extensions=extensions) as response:
+            body_start = time.perf_counter()
+            body = await response.aread()
+            timings["body_ms"] = _elapsed_ms(body_start)
+            return TransportResponse(response.status_code, body)
+
+    async def stream_lines(self, method, url, headers=None, json=None) -> AsyncIterator[str]:
+        async with self._get_client().stream(method, url, headers=headers, json=json) as response:
+            if response.status_code != 200:
+                error_text = (await response.aread()).decode("utf-8", errors="replace")
+                raise Exception(f"API Error {response.status_code}: {error_text}")
+
+            async for line in response.aiter_lines():
+                yield line.strip()
+
+    async def close(self):
+        if self.client and not self.client.is_closed:
+            await self.client.aclose()
+        self.client = None
+
+
+# httpcore trace events (".started"/".complete" pairs) mapped to timing keys
+_HTTPX_STAGES = {
+    "connection.connect_tcp": "connect_ms",
+    "connection.start_tls": "tls_ms",
+    "http11.receive_response_headers": "ttfb_ms",
+    "http2.receive_response_headers": "ttfb_ms",
+}
+
+
+def _httpx_tracer(timings: Dict[str, float]):
+    """httpx 'trace' extension callback writing stage durations into timings"""
+    started: Dict[str, float] = {}
+
+    async def trace(event_name: str, info: Dict):
+        stage, _, phase = event_name.rpartition(".")
+        if stage not in _HTTPX_STAGES:
+            return
+        if phase == "started":
+            started[stage] = time.perf_counter()
+        elif phase == "complete" and stage in started:
+            _add_timing(timings, _HTTPX_STAGES[stage], _elapsed_ms(started.pop(stage)))
+
+    return trace
+
+
+def get_transport(name: Optional[str] = None, **kwargs) -> Transport:
+    """Factory for transports: 'aiohttp', 'httpx' (HTTP/1.1) or 'http2'"""
+    name = (name or DEFAULT_TRANSPORT).lower()
+
+    if name == "aiohttp":
+        return AiohttpTransport(**kwargs)
+    if name == "httpx":
+        return HTTPXTransport(http2=False, **kwargs)
+    if name in ("http2", "h2"):
+        return HTTPXTransport(http2=True, **kwargs)
+
+    raise ValueError(f"Unknown transport: {name}")
+
+
+def transport_for_provider(provider: str) -> str:
+    """Resolve the configured transport name for a provider from the environment"""
+    provider_var = f"{TRANSPORT_ENV_VAR}_{provider.upper()}"
+    return os.getenv(provider_var) or os.getenv(TRANSPORT_ENV_VAR) or DEFAULT_TRANSPORT
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Durable usage log for Model Orchestrator
+Append-only SQLite (WAL mode) log of per-request usage. Records are queued in
+memory and written in batches by a background thread, so logging never blocks
+the request path; at startup the log is replayed to rebuild usage aggregates.
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Optional, Union
+
+from usage_store import UsageStore, UsageAggregates
+from latency_sketch import LatencyTracker, derive_request_metrics
+
+logger = logging.getLogger(__name__)
+
+# Set to a file path to persist usage across restarts
+USAGE_LOG_ENV_VAR = "ORCHESTRATOR_USAGE_LOG"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    model_id TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    task_type TEXT,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    latency_ms REAL NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_timestamp ON usage (timestamp);
+"""
+
+INSERT = """
+INSERT INTO usage (timestamp, model_id, provider, task_type, input_tokens,
+                   output_tokens, cost, latency_ms, success)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Column sums shared by every replay query
+TOTALS = ("COUNT(*), SUM(1 - success), SUM(input_tokens), SUM(output_tokens), "
+          "SUM(cost), SUM(latency_ms)")
+
+
+class UsageLog:
+    """
+    Append-only usage log with batched background flushing
+
+    append() only pushes onto an in-memory queue. A writer thread drains it
+    every `flush_interval` seconds, or as soon as `batch_size` records are
+    pending, inserting each batch in one transaction. If the writer falls
+    more than `max_pending` records behind, the oldest unwritten records are
+    dropped (and counted) rather than stalling callers.
+    """
+
+    FLUSH_INTERVAL = 1.0
+    BATCH_SIZE = 500
+    MAX_PENDING = 100_000
+
+    def __init__(self,
+                 path: Union[str, Path],
+                 flush_interval: float = FLUSH_INTERVAL,
+                 batch_size: int = BATCH_SIZE,
+                 max_pending: int = MAX_PENDING):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.written = 0
+
+        self._pending: deque = deque(maxlen=max_pending)
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # ------------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------------
+
+    def append(self,
+               timestamp: float,
+               model_id: str,
+               provider: str,
+               task_type: Optional[str],
+               input_tokens: int,
+               output_tokens: int,
+               cost: float,
+               latency_ms: float,
+               success: bool):
+        """Queue one record for the writer thread (never blocks on I/O)"""
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.dropped += 1
+        pending.append((timestamp, model_id, provider, task_type, input_tokens,
+                        output_tokens, cost, latency_ms, int(success)))
+        if len(pending) >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns records written"""
+        with self._flush_lock:
+            batch = []
+            pending = self._pending
+            while pending:
+                batch.append(pending.popleft())
+            if not batch:
+                return 0
+
+            try:
+                with self._conn:
+                    self._conn.executemany(INSERT, batch)
+            except sqlite3.Error as e:
+                logger.error("Usage log write failed, %d records lost: %s", len(batch), e)
+                self.dropped += len(batch)
+                return 0
+
+            self.written += len(batch)
+            return len(batch)
+
+    def _writer_loop(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self):
+        """Start the background writer thread (flushed again at interpreter exit)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._writer_loop, name="usage-log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def close(self):
+        """Stop the writer, flush what is left and close the database"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self._conn.close()
+        atexit.unregister(self.close)
+
+    @property
+    def pending(self) -> int:
+        """Records queued but not yet written"""
+        return len(self._pending)
+
+    # ------------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM usage").fetchone()[0]
+
+    def replay_into(self,
+                    aggregates: Optional[UsageAggregates] = None,
+                    store: Optional[UsageStore] = None,
+                    now: Optional[float] = None,
+                    latency: Optional[LatencyTracker] = None):
+        """
+        Rebuild in-memory state from the log
+
+        Aggregates are restored from GROUP BY queries (one row per key, not per
+        record), the ring buffer from the most recent `store.capacity` rows and
+        latency sketches from the last hour of rows.
+        """
+        now = time.time() if now is None else now
+        with self._flush_lock:
+            conn = self._conn
+
+            if aggregates is not None:
+                for kind, column in (("model", "model_id"), ("provider", "provider"), ("task_type", "task_type")):
+                    rows = conn.execute(
+                        f"SELECT {column}, {TOTALS} FROM usage WHERE {column} IS NOT NULL GROUP BY {column}"
+                    )
+                    for key, *totals in rows:
+                        aggregates.restore(kind, key, *totals)
+
+                for granularity, (width, retained) in UsageAggregates.BUCKETS.items():
+                    cutoff = (int(now // width) - retained + 1) * width
+                    rows = conn.execute(
+                        f"SELECT CAST(timestamp / ? AS INTEGER) * ?, {TOTALS} FROM usage "
+                        f"WHERE timestamp >= ? GROUP BY 1",
+                        (width, width, cutoff),
+                    )
+                    for start, *totals in rows:
+                        aggregates.restore(granularity, int(start), *totals)
+
+            if store is not None:
+                rows = conn.execute(
+                    "SELECT timestamp, model_id, provider, input_tokens, output_tokens, cost, latency_ms, success "
+                    "FROM (SELECT * FROM usage ORDER BY id DESC LIMIT ?) ORDER BY id",
+                    (store.capacity,),
+                )
+                for timestamp, model_id, provider, input_tokens, output_tokens, cost, latency_ms, success in rows:
+                    store.append(model_id, input_tokens, output_tokens, cost, latency_ms, bool(success),
+                                 provider=provider, timestamp=timestamp)
+
+            if latency is not None:
+                rows = conn.execute(
+                    "SELECT timestamp, model_id, provider, task_type, output_tokens, latency_ms "
+                    "FROM usage WHERE timestamp >= ? ORDER BY id",
+                    (now - 3600,),
+                )
+                for timestamp, model_id, provider, task_type, output_tokens, latency_ms in rows:
+                    _, tokens_per_second = derive_request_metrics(latency_ms, output_tokens)
+                    latency.record(model_id, provider, task_type, latency_ms,
+                                   tokens_per_second=tokens_per_second, timestamp=timestamp)
+
+
+def open_usage_log(path: Optional[Union[str, Path]] = None) -> Optional[UsageLog]:
+    """Open and start the usage log at `path` (or $ORCHESTRATOR_USAGE_LOG); None if unset"""
+    path = path or os.getenv(USAGE_LOG_ENV_VAR)
+    if not path:
+        return None
+
+    usage_log = UsageLog(path)
+    usage_log.start()
+    return usage_log
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Columnar usage store for Model Orchestrator
+Fixed-capacity ring buffer of per-request usage records held in NumPy columns,
+with O(1) append and vectorized aggregation windows, plus running aggregates
+maintained at write time for O(models) cost reports
+"""
+
+import time
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+
+class UsageStore:
+    """
+    Ring buffer of usage records (timestamp, model, tokens, cost, latency, success)
+
+    Each column is a preallocated NumPy array; appending overwrites the oldest
+    slot once the buffer is full, so memory stays constant. Model IDs and
+    providers are interned to small integer indices. Reads take the same lock
+    as append, so every report sees a consistent head, size and set of columns.
+    """
+
+    DEFAULT_CAPACITY = 1000
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self.timestamp = np.zeros(capacity, dtype=np.float64)
+        self.model_idx = np.zeros(capacity, dtype=np.int32)
+        self.input_tokens = np.zeros(capacity, dtype=np.int64)
+        self.output_tokens = np.zeros(capacity, dtype=np.int64)
+        self.cost = np.zeros(capacity, dtype=np.float64)
+        self.latency_ms = np.zeros(capacity, dtype=np.float64)
+        self.success = np.zeros(capacity, dtype=np.bool_)
+
+        self.model_ids: List[str] = []
+        self.providers: List[str] = []
+        self._model_index: Dict[str, int] = {}
+        self._provider_index: Dict[str, int] = {}
+        # Provider index per model index, grown alongside model_ids
+        self._model_provider: List[int] = []
+
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------------
+
+    def _intern_model(self, model_id: str, provider: str) -> int:
+        idx = self._model_index.get(model_id)
+        if idx is not None:
+            return idx
+
+        provider_idx = self._provider_index.get(provider)
+        if provider_idx is None:
+            provider_idx = self._provider_index[provider] = len(self.providers)
+            self.providers.append(provider)
+
+        idx = self._model_index[model_id] = len(self.model_ids)
+        self.model_ids.append(model_id)
+        self._model_provider.append(provider_idx)
+        return idx
+
+    def append(self,
+               model_id: str,
+               input_tokens: int,
+               output_tokens: int,
+               cost: float,
+               latency_ms: float,
+               success: bool = True,
+               provider: str = "unknown",
+               timestamp: Optional[float] = None):
+        """Record one request, overwriting the oldest entry when full"""
+        with self._lock:
+            slot = self._next
+            self.timestamp[slot] = time.time() if timestamp is None else timestamp
+            self.model_idx[slot] = self._intern_model(model_id, provider)
+            self.input_tokens[slot] = input_tokens
+            self.output_tokens[slot] = output_tokens
+            self.cost[slot] = cost
+            self.latency_ms[slot] = latency_ms
+            self.success[slot] = success
+
+            self._next = (slot + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+
+    def clear(self):
+        """Drop all records (interned model IDs are kept)"""
+        with self._lock:
+            self._next = 0
+            self._size = 0
+
+    # ------------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _order(self) -> np.ndarray:
+        """Slot indices from oldest to newest (caller holds the lock)"""
+        if self._size < self.capacity:
+            return np.arange(self._size)
+        return np.roll(np.arange(self.capacity), -self._next)
+
+    def _record(self, slot: int) -> Dict[str, Any]:
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp[slot]).isoformat(),
+            "model_id": self.model_ids[self.model_idx[slot]],
+            "input_tokens": int(self.input_tokens[slot]),
+            "output_tokens": int(self.output_tokens[slot]),
+            "cost": float(self.cost[slot]),
+            "latency_ms": float(self.latency_ms[slot]),
+            "success": bool(self.success[slot]),
+        }
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Materialize all records, oldest first, in the legacy history-entry format"""
+        with self._lock:
+            return [self._record(slot) for slot in self._order().tolist()]
+
+    def _mask(self,
+              seconds: Optional[float] = None,
+              model_id: Optional[str] = None,
+              provider: Optional[str] = None,
+              now: Optional[float] = None) -> np.ndarray:
+        """Boolean mask over the filled slots selecting a window (caller holds the lock)"""
+        size = self._size
+        mask = np.ones(size, dtype=np.bool_)
+
+        if seconds is not None:
+            cutoff = (time.time() if now is None else now) - seconds
+            mask &= self.timestamp[:size] >= cutoff
+        if model_id is not None:
+            idx = self._model_index.get(model_id, -1)
+            mask &= self.model_idx[:size] == idx
+        if provider is not None:
+            provider_idx = self._provider_index.get(provider, -1)
+            mask &= self._provider_map()[self.model_idx[:size]] == provider_idx
+        return mask
+
+    def _provider_map(self) -> np.ndarray:
+        return np.asarray(self._model_provider, dtype=np.int32)
+
+    def aggregate(self,
+                  seconds: Optional[float] = None,
+                  model_id: Optional[str] = None,
+                  provider: Optional[str] = None,
+                  now: Optional[float] = None) -> Dict[str, float]:
+        """Totals and latency stats over a window (last N seconds, model, provider)"""
+        with self._lock:
+            mask = self._mask(seconds, model_id, provider, now)
+            size = self._size
+            requests = int(mask.sum())
+
+            if not requests:
+                return {"requests": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0,
+                        "mean_latency_ms": 0.0, "p95_latency_ms": 0.0, "success_rate": 0.0}
+
+            latency = self.latency_ms[:size][mask]
+            return {
+                "requests": requests,
+                "input_tokens": int(self.input_tokens[:size][mask].sum()),
+                "output_tokens": int(self.output_tokens[:size][mask].sum()),
+                "cost": float(self.cost[:size][mask].sum()),
+                "mean_latency_ms": float(latency.mean()),
+                "p95_latency_ms": float(np.percentile(latency, 95)),
+                "success_rate": float(self.success[:size][mask].mean()),
+            }
+
+    def _grouped(self, keys: np.ndarray, mask: np.ndarray, groups: int) -> Dict[str, np.ndarray]:
+        size = self._size
+        keys = keys[mask]
+        requests = np.bincount(keys, minlength=groups)
+        return {
+            "requests": requests,
+            "input_tokens": np.bincount(keys, self.input_tokens[:size][mask], groups),
+            "output_tokens": np.bincount(keys, self.output_tokens[:size][mask], groups),
+            "cost": np.bincount(keys, self.cost[:size][mask], groups),
+            "latency_ms": np.bincount(keys, self.latency_ms[:size][mask], groups),
+            "successes": np.bincount(keys, self.success[:size][mask], groups),
+        }
+
+    @staticmethod
+    def _group_report(names: List[str], sums: Dict[str, np.ndarray]) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for idx in np.flatnonzero(sums["requests"]).tolist():
+            requests = int(sums["requests"][idx])
+            report[names[idx]] = {
+                "requests": requests,
+                "input_tokens": int(sums["input_tokens"][idx]),
+                "output_tokens": int(sums["output_tokens"][idx]),
+                "cost": float(sums["cost"][idx]),
+                "mean_latency_ms": float(sums["latency_ms"][idx] / requests),
+                "success_rate": float(sums["successes"][idx] / requests),
+            }
+        return report
+
+    def by_model(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Per-model aggregates over the window"""
+        with self._lock:
+            mask = self._mask(seconds, now=now)
+            sums = self._grouped(self.model_idx[:self._size], mask, len(self.model_ids))
+            names = list(self.model_ids)
+        return self._group_report(names, sums)
+
+    def by_provider(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Per-provider aggregates over the window"""
+        with self._lock:
+            mask = self._mask(seconds, now=now)
+            keys = self._provider_map()[self.model_idx[:self._size]]
+            sums = self._grouped(keys, mask, len(self.providers))
+            names = list(self.providers)
+        return self._group_report(names, sums)
+
+    def usage_counts(self) -> Dict[str, int]:
+        """Requests per model currently held in the buffer"""
+        with self._lock:
+            counts = np.bincount(self.model_idx[:self._size], minlength=len(self.model_ids))
+            names = list(self.model_ids)
+        return {names[idx]: int(counts[idx]) for idx in np.flatnonzero(counts).tolist()}
+
+
+# ============================================================================
+# Running Aggregates
+# ============================================================================
+
+class UsageCounter:
+    """Running totals for one aggregation key"""
+
+    __slots__ = ("requests", "failures", "input_tokens", "output_tokens", "cost", "latency_ms")
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost = 0.0
+        self.latency_ms = 0.0
+
+    def add(self, input_tokens: int, output_tokens: int, cost: float, latency_ms: float, success: bool):
+        self.requests += 1
+        self.failures += not success
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost += cost
+        self.latency_ms += latency_ms
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost": self.cost,
+            "mean_latency_ms": self.latency_ms / self.requests if self.requests else 0.0,
+        }
+
+
+class UsageAggregates:
+    """
+    Usage totals per model, provider, task type and time bucket, updated on write
+
+    record() is O(1) and reports are O(keys), independent of how many requests
+    have been seen. All access goes through one lock, so it is safe to share
+    across threads as well as coroutines.
+    """
+
+    # Bucket width in seconds and number of buckets retained
+    BUCKETS = {
+        "minute": (60, 120),
+        "hour": (3600, 48),
+        "day": (86400, 30),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total = UsageCounter()
+        self.by_model: Dict[str, UsageCounter] = {}
+        self.by_provider: Dict[str, UsageCounter] = {}
+        self.by_task_type: Dict[str, UsageCounter] = {}
+        # Plain model -> cost mapping, kept for callers reading cost_tracker
+        self.cost_by_model: Dict[str, float] = {}
+        self.buckets: Dict[str, Dict[int, UsageCounter]] = {name: {} for name in self.BUCKETS}
+
+    @staticmethod
+    def _counter(table: Dict[Any, UsageCounter], key: Any) -> UsageCounter:
+        counter = table.get(key)
+        if counter is None:
+            counter = table[key] = UsageCounter()
+        return counter
+
+    def _bucket(self, name: str, timestamp: float) -> UsageCounter:
+        width, retained = self.BUCKETS[name]
+        start = int(timestamp // width) * width
+        table = self.buckets[name]
+
+        counter = table.get(start)
+        if counter is None:
+            counter = table[start] = UsageCounter()
+            if len(table) > retained:
+                del table[min(table)]
+        return counter
+
+    def record(self,
+               model_id: str,
+               provider: str,
+               input_tokens: int,
+               output_tokens: int,
+               cost: float,
+               latency_ms: float,
+               success: bool = True,
+               task_type: Optional[str] = None,
+               timestamp: Optional[float] = None):
+        """Fold one request into every aggregate"""
+        timestamp = time.time() if timestamp is None else timestamp
+        values = (input_tokens, output_tokens, cost, latency_ms, success)
+
+        with self.lock:
+            self.total.add(*values)
+            self._counter(self.by_model, model_id).add(*values)
+            self._counter(self.by_provider, provider).add(*values)
+            if task_type is not None:
+                self._counter(self.by_task_type, task_type).add(*values)
+            for name in self.BUCKETS:
+                self._bucket(name, timestamp).add(*values)
+            self.cost_by_model[model_id] = self.cost_by_model.get(model_id, 0.0) + cost
+
+    def restore(self,
+                kind: str,
+                key: Any,
+                requests: int,
+                failures: int,
+                input_tokens: int,
+                output_tokens: int,
+                cost: float,
+                latency_ms: float):
+        """
+        Add pre-summed totals for one key, e.g. when replaying a usage log
+
+        kind is "model", "provider", "task_type" or a bucket granularity
+        (key is then the bucket start time). Model rows also feed the totals.
+        """
+        with self.lock:
+            if kind in self.BUCKETS:
+                table = self.buckets[kind]
+            else:
+                table = {"model": self.by_model, "provider": self.by_provider, "task_type": self.by_task_type}[kind]
+
+            counters = [self._counter(table, key)]
+            if kind == "model":
+                counters.append(self.total)
+                self.cost_by_model[key] = self.cost_by_model.get(key, 0.0) + cost
+
+            for counter in counters:
+                counter.requests += requests
+                counter.failures += failures
+                counter.input_tokens += input_tokens
+                counter.output_tokens += output_tokens
+                counter.cost += cost
+                counter.latency_ms += latency_ms
+
+    def report(self) -> Dict[str, Any]:
+        """Cost report in the orchestrator's get_cost_report format"""
+        with self.lock:
+            return {
+                "total_cost": self.total.cost,
+                "by_model": dict(self.cost_by_model),
+                "by_provider": {provider: c.cost for provider, c in self.by_provider.items()},
+                "by_task_type": {task_type: c.cost for task_type, c in self.by_task_type.items()},
+                "usage_count": {model_id: c.requests for model_id, c in self.by_model.items()},
+            }
+
+    def breakdown(self, key: str = "model") -> Dict[str, Dict[str, float]]:
+        """Full counters per model, provider or task_type"""
+        table = {"model": self.by_model, "provider": self.by_provider, "task_type": self.by_task_type}[key]
+        with self.lock:
+            return {name: counter.to_dict() for name, counter in table.items()}
+
+    def time_series(self, granularity: str = "minute") -> List[Dict[str, Any]]:
+        """Retained buckets for a granularity (minute, hour, day), oldest first"""
+        with self.lock:
+            return [
+                {"start": datetime.fromtimestamp(start).isoformat(), **counter.to_dict()}
+                for start, counter in sorted(self.buckets[granularity].items())
+            ]
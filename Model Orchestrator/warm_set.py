@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Demand-driven keep-alive set
+Chooses which local models to keep warm from observed demand instead of a
+fixed list, using measured cold-start times. Each model is worth (request rate x cold-start seconds saved)
+and costs its memory footprint; the set is the 0/1 knapsack optimum within
+the RAM budget, re-solved periodically with hysteresis.
+"""
+
+import math
+import time
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class DemandTracker:
+    """Exponentially decayed request rate per model"""
+
+    HALF_LIFE = 900.0
+
+    def __init__(self, half_life: float = HALF_LIFE):
+        self.half_life = half_life
+        self._counts: Dict[str, tuple] = {}  # model -> (decayed count, as of)
+        self._lock = threading.Lock()
+
+    def _decayed(self, model: str, now: float) -> float:
+        count, as_of = self._counts.get(model, (0.0, now))
+        return count * 0.5 ** ((now - as_of) / self.half_life)
+
+    def record(self, model: str, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._counts[model] = (self._decayed(model, now) + 1.0, now)
+
+    def rate(self, model: str, now: Optional[float] = None) -> float:
+        """Requests per second (steady-state estimate from the decayed count)"""
+        now = time.monotonic() if now is None else now
+        return self._decayed(model, now) * math.log(2) / self.half_life
+
+    def last_seen(self, model: str) -> Optional[float]:
+        """Monotonic time of the model's last request"""
+        entry = self._counts.get(model)
+        return entry[1] if entry else None
+
+    def rates(self, now: Optional[float] = None) -> Dict[str, float]:
+        now = time.monotonic() if now is None else now
+        return {model: self.rate(model, now) for model in list(self._counts)}
+
+
+class LoadTimes:
+    """
+    Measured cold-start time per model
+
+    Fed with Ollama's load_duration. Loads shorter than COLD_LOAD_MS mean the
+    model was already resident and are ignored; cold loads are smoothed with
+    an EWMA. Unmeasured models are estimated from their size.
+    """
+
+    ALPHA = 0.3
+    COLD_LOAD_MS = 250.0
+    # Cold-start estimate for models whose load was never measured
+    LOAD_MS_PER_GB = 1000.0
+
+    def __init__(self, alpha: float = ALPHA):
+        self.alpha = alpha
+        self._load_ms: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, load_ms: float) -> bool:
+        """Fold in one load; returns True if it was a cold load"""
+        if load_ms < self.COLD_LOAD_MS:
+            return False
+        with self._lock:
+            previous = self._load_ms.get(model)
+            self._load_ms[model] = load_ms if previous is None else previous + self.alpha * (load_ms - previous)
+        return True
+
+    def measured(self, model: str) -> Optional[float]:
+        return self._load_ms.get(model)
+
+    def expected_ms(self, model: str, size_gb: float) -> float:
+        """Measured load time, else the size-based estimate"""
+        load_ms = self._load_ms.get(model)
+        return load_ms if load_ms is not None else size_gb * self.LOAD_MS_PER_GB
+
+
+def knapsack(items: Dict[str, tuple], capacity: float, resolution: float = 0.25) -> List[str]:
+    """
+    0/1 knapsack over (value, weight_gb) items
+
+    Weights are rounded up to `resolution` GB so the result always fits.
+    """
+    slots = int(capacity / resolution)
+    names = [name for name, (value, weight) in items.items() if value > 0 and weight <= capacity]
+    weights = [math.ceil(items[name][1] / resolution) for name in names]
+
+    best = [0.0] * (slots + 1)
+    keep = [[False] * (slots + 1) for _ in names]
+    for i, name in enumerate(names):
+        value, w = items[name][0], weights[i]
+        for c in range(slots, w - 1, -1):
+            if best[c - w] + value > best[c]:
+                best[c] = best[c - w] + value
+                keep[i][c] = True
+
+    chosen, c = [], slots
+    for i in range(len(names) - 1, -1, -1):
+        if keep[i][c]:
+            chosen.append(names[i])
+            c -= weights[i]
+    return chosen[::-1]
+
+
+class WarmSetPlanner:
+    """
+    Periodically re-chooses the KeepAliveService's model set
+
+    Hysteresis has two parts. Models already in the set get their value
+    multiplied by (1 + hysteresis), so a newcomer must be clearly better to
+    displace one. A model also stays at least `min_dwell` seconds after it is
+    added. Dropped models are not unloaded; they expire on Ollama's timer.
+    """
+
+    INTERVAL = 300.0
+    HYSTERESIS = 0.25
+    MIN_DWELL = 600.0
+
+    def __init__(self,
+                 manager,
+                 keep_alive,
+                 demand: Optional[DemandTracker] = None,
+                 budget_gb: Optional[float] = None,
+                 interval: float = INTERVAL,
+                 hysteresis: float = HYSTERESIS,
+                 min_dwell: float = MIN_DWELL,
+                 cold_start_seconds: Optional[Callable[[str, float], float]] = None):
+        """
+        Args:
+            manager: LocalModelManager (model sizes and RAM budget)
+            keep_alive: KeepAliveService whose model set is managed
+            demand: Request rates (defaults to manager.demand)
+            budget_gb: Fixed budget instead of RAMMonitor.get_model_budget_gb()
+            cold_start_seconds: (model, size_gb) -> load time; defaults to
+                measured request loads, then the keep-alive service's pins,
+                then LoadTimes.LOAD_MS_PER_GB
+        """
+        self.manager = manager
+        self.keep_alive = keep_alive
+        self.demand = demand or manager.demand
+        self.budget_gb = budget_gb
+        self.interval = interval
+        self.hysteresis = hysteresis
+        self.min_dwell = min_dwell
+        self.cold_start_seconds = cold_start_seconds or self._cold_start_seconds
+
+        self.added_at: Dict[str, float] = {model: float("-inf") for model in keep_alive.models}
+        self._periodic = PeriodicTask(self.evaluate, lambda: self.interval, "Warm set evaluation")
+
+    def _cold_start_seconds(self, model: str, size_gb: float) -> float:
+        load_ms = self.manager.load_times.measured(model)
+        if load_ms is None:
+            load_ms = self.keep_alive.load_ms.get(model)
+        if load_ms is None:
+            load_ms = size_gb * LoadTimes.LOAD_MS_PER_GB
+        return load_ms / 1000
+
+    def _budget(self, sizes: Dict[str, float]) -> float:
+        if self.budget_gb is not None:
+            return self.budget_gb
+        loaded = self.manager.get_loaded_models()
+        return self.manager.ram_monitor.get_model_budget_gb(sum(sizes.get(m, 0.0) for m in loaded))
+
+    def plan(self,
+             now: Optional[float] = None,
+             rates: Optional[Dict[str, float]] = None,
+             current: Optional[List[str]] = None,
+             added_at: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        Best warm set for current demand (does not apply it)
+
+        `rates`, `current` and `added_at` are snapshots taken on the event
+        loop when planning runs in a worker thread; by default they are read
+        from the demand tracker, the keep-alive service and this planner.
+        """
+        now = time.monotonic() if now is None else now
+        rates = self.demand.rates(now) if rates is None else rates
+        current = list(self.keep_alive.models) if current is None else current
+        added_at = self.added_at if added_at is None else added_at
+
+        items = {}
+        for model, rate in rates.items():
+            size = self.manager.get_model_size(model)
+            if size is None or rate <= 0:
+                continue
+            value = rate * self.cold_start_seconds(model, size)
+            if model in current:
+                value *= 1 + self.hysteresis
+            items[model] = (value, size)
+
+        if not items:
+            return list(current)
+
+        sizes = {model: size for model, (_, size) in items.items()}
+        budget = self._budget(sizes)
+
+        # Models inside their dwell time stay; the rest of the budget is solved
+        dwelling = [m for m in current
+                    if now - added_at.get(m, float("-inf")) < self.min_dwell]
+        for model in dwelling:
+            budget -= sizes.get(model) or self.manager.get_model_size(model) or 0.0
+            items.pop(model, None)
+
+        return dwelling + knapsack(items, max(budget, 0.0))
+
+    def apply(self, models: List[str], now: Optional[float] = None) -> bool:
+        """Hand a new set to the keep-alive service; returns True if it changed"""
+        now = time.monotonic() if now is None else now
+        if set(models) == set(self.keep_alive.models):
+            return False
+
+        added = [m for m in models if m not in self.keep_alive.models]
+        dropped = [m for m in self.keep_alive.models if m not in models]
+        for model in added:
+            self.added_at[model] = now
+        for model in dropped:
+            self.added_at.pop(model, None)
+        self.keep_alive.set_models(models)
+        logger.info("✓ Warm set updated: +%s -%s", added, dropped)
+        return True
+
+    async def evaluate(self) -> bool:
+        """Plan and apply once"""
+        # Planning reads RAM and Ollama state, so it runs off the loop, on
+        # snapshots of the state the loop keeps changing
+        now = time.monotonic()
+        models = await asyncio.to_thread(
+            self.plan, now, self.demand.rates(now), list(self.keep_alive.models), dict(self.added_at))
+        return self.apply(models)
+
+    def start(self):
+        """Re-evaluate in the background (requires a running event loop)"""
+        self._periodic.start()
+
+    async def stop(self):
+        await self._periodic.stop()